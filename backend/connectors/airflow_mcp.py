@@ -43,7 +43,15 @@ logger = logging.getLogger(__name__)
 
 
 class AirflowMCP:
-    """Full-coverage connector for Apache Airflow 2.7.3 REST API."""
+    """
+    Full-coverage connector for Apache Airflow 2.7.3 REST API.
+
+    Thread-safety: safe to share. Every call is a self-contained request on one
+    requests.Session (auth + verify fixed at construction, no cookies relied on),
+    so CredentialManager caches one instance per credential version.
+    """
+
+    THREAD_SAFE = True
 
     def __init__(self, base_url: str, username: str, password: str,
                  credential_name: str = None, timeout: int = 30,
@@ -402,8 +410,11 @@ class AirflowMCP:
 
     # ── Context manager ───────────────────────────────────────────
 
+    def close(self):
+        self.session.close()
+
     def __enter__(self):
         return self
 
     def __exit__(self, *args):
-        self.session.close()
+        self.close()
@@ -1,15 +1,36 @@
 """
 FlowForge — Azure Blob Storage MCP Connector
+
+upload_file / download_file stream through the SDK's chunked transfer paths.
+Uploads above max_single_put_size are split into blocks of block_size that are
+staged max_concurrency at a time and committed with one Put Block List.
+Downloads use readinto(), which fetches max_chunk_get_size ranges in parallel
+and writes each one to disk as it lands. Memory stays at roughly
+chunk size × concurrency, however large the blob is. Both accept a
+progress_hook(current, total) that is called with cumulative byte counts.
+
+iter_blobs() pages lazily through List Blobs (results_per_page names per
+request, up to 5000). Suffix, regex and modified-since filters are applied as
+each page arrives, so taking the first N matches stops the listing there.
+count_blobs() walks the same stream keeping only running totals.
+
+open_stream() / upload_stream() let the transfer and verify nodes pipe bytes
+through without temp files. upload_stream() can stamp the Content-MD5 computed
+in flight, which Azure does not set for chunked uploads. That lets
+get_checksums() verify the blob later without reading it.
 """
 
 import logging
 import os
-from typing import List
+import re
+from datetime import datetime
+from itertools import islice
+from typing import Iterator, List
 
 logger = logging.getLogger(__name__)
 
 try:
-    from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+    from azure.storage.blob import BlobServiceClient, BlobClient, BlobProperties, ContainerClient, ContentSettings
     AZURE_AVAILABLE = True
 except ImportError:
     AZURE_AVAILABLE = False
@@ -17,7 +38,15 @@ except ImportError:
 
 
 class AzureConnector:
-    """MCP connector for Azure Blob Storage."""
+    """
+    MCP connector for Azure Blob Storage.
+
+    Thread-safety: safe to share. BlobServiceClient and the container/blob clients
+    derived from it are documented as thread-safe; the connector keeps no per-call
+    state, so CredentialManager caches one instance per credential version.
+    """
+
+    THREAD_SAFE = True
 
     def __init__(
         self,
@@ -46,17 +75,88 @@ class AzureConnector:
     def list_containers(self) -> List[str]:
         return [c["name"] for c in self._client.list_containers()]
 
-    def list_blobs(self, container: str, prefix: str = "") -> List[dict]:
-        cc = self._client.get_container_client(container)
-        blobs = []
-        for b in cc.list_blobs(name_starts_with=prefix):
-            blobs.append({"name": b.name, "size": b.size, "last_modified": str(b.last_modified)})
-        return blobs
+    def _iter_properties(
+        self,
+        container: str,
+        prefix: str = "",
+        suffix: str = None,
+        pattern: str = None,
+        modified_since: datetime = None,
+        page_size: int = 5000,
+    ) -> Iterator["BlobProperties"]:
+        regex = re.compile(pattern) if pattern else None
+        cc    = self._client.get_container_client(container)
+        for b in cc.list_blobs(name_starts_with=prefix or None,
+                               results_per_page=max(1, min(int(page_size), 5000))):
+            if suffix and not b.name.endswith(suffix):                   continue
+            if regex is not None and not regex.search(b.name):           continue
+            if modified_since and b.last_modified < modified_since:      continue
+            yield b
+
+    def iter_blobs(self, container: str, prefix: str = "", **filters) -> Iterator[dict]:
+        """
+        Lazily yield blobs in name order, one List Blobs call per page consumed.
 
-    def upload_file(self, container: str, blob_name: str, local_path: str) -> str:
-        blob = self._client.get_blob_client(container=container, blob=blob_name)
+          page_size       names requested per call (1–5000)
+          suffix          keep names ending with this string
+          pattern         keep names matching this regex (re.search)
+          modified_since  keep blobs with Last-Modified >= this (tz-aware) datetime
+        """
+        for b in self._iter_properties(container, prefix, **filters):
+            yield {"name": b.name, "size": b.size, "last_modified": str(b.last_modified),
+                   "etag": (b.etag or "").strip('"')}
+
+    def list_blobs(self, container: str, prefix: str = "", max_results: int = None, **filters) -> List[dict]:
+        """Blobs under prefix (see iter_blobs for filters) — stops listing once max_results is reached."""
+        if max_results and not filters:
+            filters["page_size"] = min(max_results, 5000)
+        return list(islice(self.iter_blobs(container, prefix, **filters), max_results))
+
+    def count_blobs(self, container: str, prefix: str = "", **filters) -> dict:
+        """Count / total bytes / oldest / newest of matching blobs, without building per-blob dicts."""
+        count, total, oldest, newest = 0, 0, None, None
+        for b in self._iter_properties(container, prefix, **filters):
+            count += 1
+            total += b.size or 0
+            lm = b.last_modified
+            if lm and (oldest is None or lm < oldest): oldest = lm
+            if lm and (newest is None or lm > newest): newest = lm
+        return {"count": count, "bytes": total,
+                "oldest": str(oldest) if oldest else None, "newest": str(newest) if newest else None}
+
+    def _blob_client(self, container: str, blob_name: str, **tuning) -> "BlobClient":
+        """
+        Blob client with per-call transfer tuning (max_block_size, max_single_put_size,
+        max_chunk_get_size, max_single_get_size). Untuned calls use the service
+        client's derived client; tuned ones get a client of their own built from
+        the blob URL, so the shared configuration is never modified.
+        """
+        blob   = self._client.get_blob_client(container=container, blob=blob_name)
+        tuning = {k: int(v) for k, v in tuning.items() if v}
+        if not tuning:
+            return blob
+        return BlobClient.from_blob_url(blob.url, credential=self._client.credential, **tuning)
+
+    def upload_file(
+        self,
+        container: str,
+        blob_name: str,
+        local_path: str,
+        block_size: int = None,
+        max_single_put_size: int = None,
+        max_concurrency: int = None,
+        progress_hook=None,
+    ) -> str:
+        """
+        Upload a local file as a block blob. Files above max_single_put_size
+        (SDK default 64 MB) are staged as block_size blocks (default 4 MB),
+        max_concurrency at a time. Returns the blob URI.
+        """
+        blob = self._blob_client(container, blob_name, max_block_size=block_size,
+                                 max_single_put_size=max_single_put_size)
         with open(local_path, "rb") as f:
-            blob.upload_blob(f, overwrite=True)
+            blob.upload_blob(f, overwrite=True, length=os.fstat(f.fileno()).st_size,
+                             max_concurrency=int(max_concurrency or 1), progress_hook=progress_hook)
         uri = f"https://{self._client.account_name}.blob.core.windows.net/{container}/{blob_name}"
         logger.info(f"Uploaded {local_path} → {uri}")
         return uri
@@ -66,13 +166,82 @@ class AzureConnector:
         blob.upload_blob(data, overwrite=True)
         return blob_name
 
-    def download_file(self, container: str, blob_name: str, local_path: str) -> str:
-        blob = self._client.get_blob_client(container=container, blob=blob_name)
+    def download_file(
+        self,
+        container: str,
+        blob_name: str,
+        local_path: str,
+        chunk_size: int = None,
+        max_concurrency: int = None,
+        progress_hook=None,
+    ) -> str:
+        """
+        Stream a blob to local_path in chunk_size ranges (SDK default 4 MB),
+        max_concurrency in flight. The blob never sits in memory whole. It is
+        written to "<path>.part" and renamed into place on success. A directory
+        path (trailing "/") keeps the blob's file name. Returns the file path.
+        """
+        if local_path.endswith("/") or os.path.isdir(local_path):
+            local_path = os.path.join(local_path, os.path.basename(blob_name))
         os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
-        with open(local_path, "wb") as f:
-            f.write(blob.download_blob().readall())
+        blob = self._blob_client(container, blob_name, max_chunk_get_size=chunk_size,
+                                 max_single_get_size=chunk_size)
+        partial = local_path + ".part"
+        try:
+            stream = blob.download_blob(max_concurrency=int(max_concurrency or 1),
+                                        progress_hook=progress_hook)
+            with open(partial, "wb") as f:
+                stream.readinto(f)
+            os.replace(partial, local_path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        logger.info(f"Downloaded {container}/{blob_name} → {local_path}")
         return local_path
 
+    def open_stream(self, container: str, blob_name: str, chunk_size: int = None,
+                    max_concurrency: int = None):
+        """(downloader, size) — downloader.read(n) fetches chunk_size ranges as it is consumed."""
+        blob = self._blob_client(container, blob_name, max_chunk_get_size=chunk_size,
+                                 max_single_get_size=chunk_size)
+        downloader = blob.download_blob(max_concurrency=int(max_concurrency or 1))
+        return downloader, downloader.size
+
+    def upload_stream(
+        self,
+        container: str,
+        blob_name: str,
+        fileobj,
+        length: int = None,
+        block_size: int = None,
+        max_concurrency: int = None,
+        progress_hook=None,
+    ) -> str:
+        """Upload from a readable stream, staged block by block (memory ~ block_size × max_concurrency)."""
+        blob = self._blob_client(container, blob_name, max_block_size=block_size)
+        blob.upload_blob(fileobj, length=length, overwrite=True,
+                         max_concurrency=int(max_concurrency or 1), progress_hook=progress_hook)
+        return blob_name
+
+    def set_content_md5(self, container: str, blob_name: str, md5: bytes):
+        """Record a whole-blob MD5 (e.g. computed while streaming) as the blob's Content-MD5."""
+        blob  = self._client.get_blob_client(container=container, blob=blob_name)
+        props = blob.get_blob_properties().content_settings
+        blob.set_http_headers(ContentSettings(
+            content_type=props.content_type, content_encoding=props.content_encoding,
+            content_language=props.content_language, content_disposition=props.content_disposition,
+            cache_control=props.cache_control, content_md5=bytearray(md5),
+        ))
+
+    def get_checksums(self, container: str, blob_name: str) -> dict:
+        """Server-side checksums as lowercase hex: md5 when the blob has a Content-MD5."""
+        props = self._client.get_blob_client(container=container, blob=blob_name).get_blob_properties()
+        out   = {"size": props.size, "etag": (props.etag or "").strip('"')}
+        if props.content_settings.content_md5:
+            out["md5"] = bytes(props.content_settings.content_md5).hex()
+        return out
+
     def blob_exists(self, container: str, blob_name: str) -> bool:
         return self._client.get_blob_client(container=container, blob=blob_name).exists()
 
@@ -83,6 +252,10 @@ class AzureConnector:
         if not self.blob_exists(container, blob_name):
             raise AssertionError(f"Azure blob not found: {container}/{blob_name}")
 
+    def close(self):
+        """Close the service client's transport (called when evicted from the connector cache)."""
+        self._client.close()
+
     def health_check(self) -> dict:
         try:
             list(self._client.list_containers(max_results=1))
@@ -1,20 +1,662 @@
 """
 FlowForge — HTTP MCP Connector
 Wraps requests library with retry, assertion, and logging.
+
+Connections are pooled process-wide: every HTTPConnector borrows a keep-alive
+requests.Session from the SessionRegistry, keyed by credential (or by origin
+for anonymous calls), so repeated API checks reuse warm TCP+TLS connections
+instead of handshaking on every node execution.
+
+ResponseStream consumes a streamed body chunk by chunk under a byte budget:
+bounded preview, optional spill to a file, and incremental evaluation of the
+json-field / body-contains assertions (ijson, optional) so a 200 MB export
+never has to sit in worker memory.
+
+next_link() reads RFC 8288 Link headers for the http node's paginate option.
+
+Every request's latency is recorded per method + URL in the LatencyTracker.
+HTTPConnector.hedged_request() uses the observed p95 as the delay before
+firing a duplicate GET/HEAD: whichever response arrives first wins and the
+other is cancelled. A per-call deadline caps total time across retries.
+
+ConditionalCache (opt-in per call, conditional=True) keeps validated GET bodies
+per URL + auth identity and revalidates them with If-None-Match /
+If-Modified-Since; a 304 is answered from the cached body, so pollers of
+config/status endpoints only transfer bytes when something changed.
+
+HTTPConnector.arequest() is the asyncio transport (httpx.AsyncClient, optional
+dependency). The engine awaits it directly, so concurrent probes share one
+thread and one connection-limited client per key instead of one executor
+thread each.
 """
 
+import asyncio
+import functools
+import hashlib
+import json as _json
 import logging
+import os
+import threading
 import time
+from collections import OrderedDict, deque
+from http.cookiejar import DefaultCookiePolicy
 from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False   # async transport only — sync requests path needs nothing extra
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False   # streamed JSON assertions fall back to a bounded in-memory parse
+
+RETRY_STATUSES = (500, 502, 503, 504)
+RETRY_METHODS  = frozenset({"HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE"})  # urllib3 Retry default
+
+POOL_CONNECTIONS = int(os.getenv("FLOWFORGE_HTTP_POOL_CONNECTIONS", "10"))   # host pools per session
+POOL_MAXSIZE     = int(os.getenv("FLOWFORGE_HTTP_POOL_MAXSIZE", "20"))       # keep-alive conns per host
+POOL_IDLE_TTL    = float(os.getenv("FLOWFORGE_HTTP_POOL_IDLE_TTL", "300"))   # evict sessions idle this long
+
+CONDITIONAL_CACHE_BYTES = int(float(os.getenv("FLOWFORGE_HTTP_CONDITIONAL_CACHE_MB", "32")) * 1024 * 1024)
+
+HEDGE_DELAY       = float(os.getenv("FLOWFORGE_HTTP_HEDGE_DELAY", "1.0"))   # hedge delay until a URL has history
+HEDGE_MIN_SAMPLES = 20        # latencies needed before the observed p95 replaces HEDGE_DELAY
+HEDGE_METHODS     = frozenset({"GET", "HEAD"})
+
+
+# ── Shared session registry ───────────────────────────────────────────────────
+
+class _PooledSession:
+    __slots__ = ("session", "created_at", "last_used", "requests")
+
+    def __init__(self, session):
+        self.session    = session
+        self.created_at = time.time()
+        self.last_used  = self.created_at
+        self.requests   = 0
+
+
+class SessionRegistry:
+    """
+    Process-wide registry of keep-alive requests.Session objects.
+
+    Sessions carry only transport state (adapters, retry policy, TLS verify) —
+    auth and default headers are sent per request by the owning HTTPConnector,
+    and cookie storage is disabled, so one session can safely serve every run
+    that uses the same key. Sessions idle longer than idle_ttl are closed.
+    """
+
+    def __init__(self, idle_ttl: float = POOL_IDLE_TTL):
+        self.idle_ttl   = idle_ttl
+        self._lock      = threading.Lock()
+        self._pools: Dict[tuple, _PooledSession] = {}
+        self._created   = 0
+        self._evicted   = 0
+
+    def acquire(self, key: tuple, retries: int = 3, verify: bool = True,
+                pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+        full_key = (key, retries, verify, pool_connections, pool_maxsize)
+        with self._lock:
+            self._evict_idle_locked()
+            entry = self._pools.get(full_key)
+            if entry is None:
+                entry = _PooledSession(_new_session(retries, verify, pool_connections, pool_maxsize))
+                self._pools[full_key] = entry
+                self._created += 1
+                logger.info(f"HTTP pool: new session for {key[0]}:{key[1]} "
+                            f"(pool_connections={pool_connections}, pool_maxsize={pool_maxsize})")
+            entry.requests  += 1
+            entry.last_used  = time.time()
+            return entry.session
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_idle_locked()
+
+    def close_all(self):
+        with self._lock:
+            for entry in self._pools.values():
+                entry.session.close()
+            self._evicted += len(self._pools)
+            self._pools.clear()
+
+    def stats(self) -> dict:
+        """Per-pool counters. new_connections counts TCP(+TLS) connects made by urllib3."""
+        now   = time.time()
+        pools = []
+        with self._lock:
+            for (key, retries, verify, pc, pm), entry in self._pools.items():
+                conns = reqs = hosts = 0
+                for adapter in {id(a): a for a in entry.session.adapters.values()}.values():
+                    container = getattr(adapter.poolmanager.pools, "_container", {})
+                    for host_pool in list(container.values()):
+                        hosts += 1
+                        conns += getattr(host_pool, "num_connections", 0)
+                        reqs  += getattr(host_pool, "num_requests", 0)
+                pools.append({
+                    "kind":             key[0],
+                    "key":              key[1],
+                    "pool_connections": pc,
+                    "pool_maxsize":     pm,
+                    "requests":         entry.requests,
+                    "hosts":            hosts,
+                    "new_connections":  conns,
+                    "connection_reuse_pct": round((1 - conns / reqs) * 100, 1) if reqs else None,
+                    "age_s":            round(now - entry.created_at, 1),
+                    "idle_s":           round(now - entry.last_used, 1),
+                })
+            return {
+                "sessions":         len(self._pools),
+                "sessions_created": self._created,
+                "sessions_evicted": self._evicted,
+                "idle_ttl_s":       self.idle_ttl,
+                "pools":            pools,
+            }
+
+    def _evict_idle_locked(self) -> int:
+        cutoff = time.time() - self.idle_ttl
+        doomed = [k for k, e in self._pools.items() if e.last_used < cutoff]
+        for k in doomed:
+            self._pools.pop(k).session.close()
+        self._evicted += len(doomed)
+        return len(doomed)
+
+
+def _new_session(retries: int, verify: bool, pool_connections: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=list(RETRY_STATUSES),
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))   # never persist cookies across runs
+    session.verify = verify
+    return session
+
+
+# Singleton
+_registry_instance: Optional[SessionRegistry] = None
+
+def get_session_registry() -> SessionRegistry:
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = SessionRegistry()
+    return _registry_instance
+
+
+class AsyncClientRegistry:
+    """
+    httpx.AsyncClient per (event loop, key). A client is bound to the loop it
+    was created on, so each loop gets its own; connection limits cap the
+    sockets one key can open no matter how many probes run concurrently.
+    """
+
+    def __init__(self):
+        self._clients: Dict[tuple, "httpx.AsyncClient"] = {}
+        self._requests: Dict[tuple, int] = {}
+
+    def acquire(self, key: tuple, verify: bool = True, timeout: float = 30,
+                max_connections: int = POOL_MAXSIZE, max_keepalive: int = POOL_CONNECTIONS) -> "httpx.AsyncClient":
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx not installed — async HTTP transport unavailable. Run: pip install httpx")
+        full_key = (id(asyncio.get_running_loop()), key, verify, max_connections, max_keepalive)
+        client = self._clients.get(full_key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                verify=verify,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_keepalive,
+                                    keepalive_expiry=POOL_IDLE_TTL),
+            )
+            self._clients[full_key] = client
+            logger.info(f"HTTP async client created for {key[0]}:{key[1]} (max_connections={max_connections})")
+        self._requests[full_key] = self._requests.get(full_key, 0) + 1
+        return client
+
+    async def aclose_all(self):
+        loop_id = id(asyncio.get_running_loop())
+        for k in [k for k in self._clients if k[0] == loop_id]:
+            await self._clients.pop(k).aclose()
+            self._requests.pop(k, None)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "pools": [
+                {"kind": k[1][0], "key": k[1][1], "max_connections": k[3],
+                 "requests": self._requests.get(k, 0), "closed": c.is_closed}
+                for k, c in self._clients.items()
+            ],
+        }
+
+
+_async_registry_instance: Optional[AsyncClientRegistry] = None
+
+def get_async_client_registry() -> AsyncClientRegistry:
+    global _async_registry_instance
+    if _async_registry_instance is None:
+        _async_registry_instance = AsyncClientRegistry()
+    return _async_registry_instance
+
+
+# ── Latency tracking / hedging stats ──────────────────────────────────────────
+
+class _UrlLatency:
+    __slots__ = ("samples", "hedges_sent", "hedge_wins")
+
+    def __init__(self):
+        self.samples     = deque(maxlen=200)
+        self.hedges_sent = 0
+        self.hedge_wins  = 0
+
+
+class LatencyTracker:
+    """Rolling latency window per method + URL (query string ignored), bounded LRU of URLs."""
+
+    def __init__(self, max_urls: int = 1000):
+        self.max_urls = max_urls
+        self._lock    = threading.Lock()
+        self._urls: "OrderedDict[str, _UrlLatency]" = OrderedDict()
+
+    @staticmethod
+    def key(method: str, full_url: str) -> str:
+        parts = urlsplit(full_url)
+        return f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}"
+
+    def _entry(self, key: str) -> _UrlLatency:
+        entry = self._urls.get(key)
+        if entry is None:
+            entry = self._urls[key] = _UrlLatency()
+            while len(self._urls) > self.max_urls:
+                self._urls.popitem(last=False)
+        else:
+            self._urls.move_to_end(key)
+        return entry
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            self._entry(key).samples.append(seconds)
+
+    def record_hedge(self, key: str, won: bool):
+        with self._lock:
+            entry = self._entry(key)
+            entry.hedges_sent += 1
+            entry.hedge_wins  += int(won)
+
+    def percentile(self, key: str, pct: float) -> Optional[float]:
+        with self._lock:
+            entry = self._urls.get(key)
+            samples = sorted(entry.samples) if entry else []
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct))]
+
+    def hedge_delay(self, key: str) -> float:
+        with self._lock:
+            entry = self._urls.get(key)
+            enough = entry is not None and len(entry.samples) >= HEDGE_MIN_SAMPLES
+        return self.percentile(key, 0.95) if enough else HEDGE_DELAY
+
+    def stats(self) -> dict:
+        with self._lock:
+            items = [(k, sorted(e.samples), e.hedges_sent, e.hedge_wins) for k, e in self._urls.items()]
+        sent = sum(i[2] for i in items)
+        wins = sum(i[3] for i in items)
+        def pct(samples, p): return round(samples[min(len(samples) - 1, int(len(samples) * p))], 4) if samples else None
+        return {
+            "urls":          len(items),
+            "hedges_sent":   sent,
+            "hedge_wins":    wins,
+            "hedge_win_pct": round(100 * wins / sent, 1) if sent else None,
+            "by_url": [
+                {"url": k, "samples": len(smp), "p50_s": pct(smp, 0.5), "p95_s": pct(smp, 0.95),
+                 "hedges_sent": hs, "hedge_wins": hw}
+                for k, smp, hs, hw in items if hs or len(smp) >= HEDGE_MIN_SAMPLES
+            ],
+        }
+
+
+_latency_tracker_instance: Optional[LatencyTracker] = None
+
+def get_latency_tracker() -> LatencyTracker:
+    global _latency_tracker_instance
+    if _latency_tracker_instance is None:
+        _latency_tracker_instance = LatencyTracker()
+    return _latency_tracker_instance
+
+
+# ── Conditional-request cache (ETag / Last-Modified) ──────────────────────────
+
+# Hop-by-hop / body-encoding headers that must not be replayed with a cached, decoded body
+_UNCACHED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class _CachedResponse:
+    __slots__ = ("status_code", "headers", "content", "encoding", "etag", "last_modified", "stored_at")
+
+    def __init__(self, status_code, headers, content, encoding):
+        self.status_code   = status_code
+        self.headers       = {k: v for k, v in headers.items() if k.lower() not in _UNCACHED_HEADERS}
+        self.content       = content
+        self.encoding      = encoding
+        self.etag          = headers.get("etag") or headers.get("ETag")
+        self.last_modified = headers.get("last-modified") or headers.get("Last-Modified")
+        self.stored_at     = time.time()
+
+
+class ConditionalCache:
+    """
+    Thread-safe LRU of validated GET responses, bounded by total body bytes.
+    Only 200 responses carrying an ETag or Last-Modified are stored; the key
+    covers the full URL, query params and a hash of every request header, so
+    two auth identities never see each other's bodies.
+    """
+
+    def __init__(self, max_bytes: int = CONDITIONAL_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        self._entries: "OrderedDict[str, _CachedResponse]" = OrderedDict()
+        self._bytes       = 0
+        self._revalidated = 0      # 304 → served from cache
+        self._misses      = 0      # full body transferred
+        self._bytes_saved = 0
+
+    @staticmethod
+    def make_key(full_url: str, params: Optional[Dict], headers: Dict) -> str:
+        identity = sorted((k.lower(), str(v)) for k, v in headers.items()
+                          if k.lower() not in ("if-none-match", "if-modified-since"))
+        raw = "\x1f".join([full_url, repr(sorted((params or {}).items())), repr(identity)])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[_CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def validators(self, entry: Optional[_CachedResponse]) -> Dict[str, str]:
+        if entry is None:
+            return {}
+        extra = {}
+        if entry.etag:          extra["If-None-Match"]     = entry.etag
+        if entry.last_modified: extra["If-Modified-Since"] = entry.last_modified
+        return extra
+
+    def store(self, key: str, status_code: int, headers, content: bytes, encoding: Optional[str]) -> bool:
+        with self._lock:
+            self._misses += 1
+        entry = _CachedResponse(status_code, headers, content, encoding)
+        if status_code != 200 or not (entry.etag or entry.last_modified) or len(content) > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.content)
+            self._entries[key] = entry
+            self._bytes       += len(content)
+            while self._bytes > self.max_bytes and self._entries:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped.content)
+        return True
+
+    def revalidated(self, key: str, entry: _CachedResponse, headers):
+        """Record a 304: refresh validators / headers the server sent with it."""
+        with self._lock:
+            self._revalidated += 1
+            self._bytes_saved += len(entry.content)
+            for k, v in headers.items():
+                if k.lower() not in _UNCACHED_HEADERS:
+                    entry.headers[k] = v
+            entry.etag          = headers.get("etag") or entry.etag
+            entry.last_modified = headers.get("last-modified") or entry.last_modified
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._revalidated + self._misses
+            return {
+                "entries":       len(self._entries),
+                "bytes":         self._bytes,
+                "max_bytes":     self.max_bytes,
+                "not_modified":  self._revalidated,
+                "full_fetches":  self._misses,
+                "hit_ratio":     round(self._revalidated / lookups, 4) if lookups else None,
+                "bytes_saved":   self._bytes_saved,
+            }
+
+
+_conditional_cache_instance: Optional[ConditionalCache] = None
+
+def get_conditional_cache() -> ConditionalCache:
+    global _conditional_cache_instance
+    if _conditional_cache_instance is None:
+        _conditional_cache_instance = ConditionalCache()
+    return _conditional_cache_instance
+
+
+# ── Streamed response bodies ──────────────────────────────────────────────────
+
+STREAM_CHUNK_SIZE   = 64 * 1024
+JSON_FALLBACK_LIMIT = 32 * 1024 * 1024   # max body buffered for json.loads when ijson is missing
+
+_SCALAR_EVENTS = {"null", "boolean", "integer", "double", "number", "string"}
+
+
+def walk_json_path(data: Any, field: str) -> Any:
+    """Resolve a dotted path ("items.0.id") against parsed JSON; None when absent."""
+    val = data
+    for part in field.split("."):
+        val = val.get(part) if isinstance(val, dict) else (val[int(part)] if isinstance(val, list) and part.isdigit() and int(part) < len(val) else None)
+    return val
+
+
+def next_link(headers) -> Optional[str]:
+    """rel="next" target from an RFC 8288 Link header (GitHub/GitLab style pagination)."""
+    raw = headers.get("link") or headers.get("Link")
+    if not raw:
+        return None
+    for link in requests.utils.parse_header_links(raw):
+        if "next" in (link.get("rel") or "").split():
+            return link.get("url")
+    return None
+
+
+class _JsonFieldWatcher:
+    """Tracks the concrete path of ijson basic_parse events and captures one dotted field."""
+
+    def __init__(self, field: str):
+        self.target  = field.split(".")
+        self.stack: list = []       # frames: ["map", key] | ["array", index]
+        self.found   = False
+        self.value   = None
+        self._builder = None
+        self._depth   = 0
+
+    def event(self, ev: str, val: Any):
+        if self._builder is not None:   # inside the target container — build it
+            self._builder.event(ev, val)
+            if ev in ("start_map", "start_array"):
+                self._depth += 1
+            elif ev in ("end_map", "end_array"):
+                self._depth -= 1
+                if self._depth == 0:
+                    self.found, self.value, self._builder = True, self._builder.value, None
+            return
+        if ev == "map_key":
+            self.stack[-1][1] = val
+            return
+        if ev in ("end_map", "end_array"):
+            self.stack.pop()
+            return
+        # A value starts here (scalar or container)
+        if self.stack and self.stack[-1][0] == "array":
+            self.stack[-1][1] += 1
+        if [str(f[1]) for f in self.stack] == self.target:
+            if ev in _SCALAR_EVENTS:
+                self.found, self.value = True, val
+            else:
+                self._builder = ijson.ObjectBuilder()
+                self._builder.event(ev, val)
+                self._depth = 1
+        if ev == "start_map":
+            self.stack.append(["map", None])
+        elif ev == "start_array":
+            self.stack.append(["array", -1])
+
+
+class ResponseStream:
+    """
+    Incrementally consume a response body.
+
+      max_bytes      hard budget — exceeding it raises ValueError and stops reading
+      preview_bytes  leading bytes kept for the node log / output
+      spill_path     if set, the full body is written there as it arrives
+      json_field     dotted path evaluated incrementally (ijson) — see json_value/json_found
+      contains       substring searched across chunk boundaries — see contains_found
+    """
+
+    def __init__(self, max_bytes: int, preview_bytes: int = 3000, spill_path: str = None,
+                 json_field: str = None, contains: str = None):
+        self.max_bytes     = int(max_bytes)
+        self.preview_bytes = int(preview_bytes)
+        self.spill_path    = spill_path
+        self.total_bytes   = 0
+        self._preview      = bytearray()
+        self._spill        = open(spill_path, "wb") if spill_path else None
+
+        self._needle       = contains.encode() if contains else None
+        self._tail         = b""
+        self.contains_found = False
+
+        self.json_field    = json_field
+        self._watcher      = None
+        self._events       = None
+        self._coro         = None
+        self._json_buf     = None
+        self.json_error    = None
+        if json_field:
+            if IJSON_AVAILABLE:
+                self._watcher = _JsonFieldWatcher(json_field)
+                self._events  = ijson.sendable_list()
+                self._coro    = ijson.basic_parse_coro(self._events)
+            else:
+                self._json_buf = bytearray()
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        self.total_bytes += len(chunk)
+        if self.total_bytes > self.max_bytes:
+            self.close()
+            raise ValueError(f"HTTP response exceeded max_bytes={self.max_bytes:,} — aborted after {self.total_bytes:,} bytes")
+        if len(self._preview) < self.preview_bytes:
+            self._preview += chunk[: self.preview_bytes - len(self._preview)]
+        if self._spill:
+            self._spill.write(chunk)
+        if self._needle and not self.contains_found:
+            window = self._tail + chunk
+            if self._needle in window:
+                self.contains_found = True
+            self._tail = window[-(len(self._needle) - 1):] if len(self._needle) > 1 else b""
+        if self._coro is not None and not self._watcher.found and self.json_error is None:
+            try:
+                self._coro.send(chunk)
+            except Exception as e:   # malformed / non-JSON body
+                self.json_error = str(e)
+            for ev, val in self._events:
+                self._watcher.event(ev, val)
+                if self._watcher.found:
+                    break
+            del self._events[:]
+        elif self._json_buf is not None and self.json_error is None:
+            if len(self._json_buf) + len(chunk) > JSON_FALLBACK_LIMIT:
+                self.json_error = f"body larger than {JSON_FALLBACK_LIMIT:,} bytes — install ijson for streamed JSON assertions"
+                self._json_buf = None
+            else:
+                self._json_buf += chunk
+
+    def close(self):
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+
+    def finish(self) -> dict:
+        self.close()
+        if self._coro is not None and not self._watcher.found and self.json_error is None:
+            try:
+                self._coro.close()
+            except Exception as e:
+                self.json_error = str(e)
+        json_found, json_value = False, None
+        if self._watcher is not None:
+            json_found, json_value = self._watcher.found, self._watcher.value
+        elif self._json_buf is not None:
+            try:
+                json_value = walk_json_path(_json.loads(bytes(self._json_buf)), self.json_field)
+                json_found = json_value is not None
+            except ValueError as e:
+                self.json_error = str(e)
+        return {
+            "total_bytes":    self.total_bytes,
+            "preview":        bytes(self._preview).decode("utf-8", errors="replace"),
+            "truncated":      self.total_bytes > len(self._preview),
+            "spill_path":     self.spill_path,
+            "contains_found": self.contains_found,
+            "json_found":     json_found,
+            "json_value":     json_value,
+            "json_error":     self.json_error,
+        }
+
+
+# ── Connector ─────────────────────────────────────────────────────────────────
+
+
+def _discard_response(task: "asyncio.Future") -> None:
+    """Cancel a losing hedge task and close its response whenever it completes (sync calls can't be cancelled)."""
+    def _close(t):
+        if t.cancelled() or t.exception() is not None:
+            return
+        resp = t.result()
+        if hasattr(resp, "aclose"):
+            asyncio.ensure_future(resp.aclose())
+        elif hasattr(resp, "close"):
+            resp.close()
+    if task.done():
+        _close(task)
+    else:
+        task.cancel()
+        task.add_done_callback(_close)
 
 class HTTPConnector:
-    """Generic HTTP/REST connector with retry logic and assertion helpers."""
+    """
+    Generic HTTP/REST connector with retry logic and assertion helpers.
+
+    Thread-safety: safe to share. Headers are passed per request, sessions and
+    async clients come from the process-wide registries, and no response state is
+    kept on the instance, so CredentialManager caches one instance per credential
+    version.
+    """
+
+    THREAD_SAFE = True
 
     def __init__(
         self,
@@ -26,30 +668,54 @@ class HTTPConnector:
         retries: int = 3,
         verify_ssl: bool = True,
         credential_name: str = None,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        shared_session: bool = True,
     ):
         self.base_url        = base_url.rstrip("/")
         self.timeout         = timeout
         self.credential_name = credential_name
+        self.retries         = retries
+        self.verify_ssl      = verify_ssl
+        self.pool_connections = int(pool_connections)
+        self.pool_maxsize     = int(pool_maxsize)
+        self.shared_session   = shared_session
 
-        self.session = requests.Session()
-
-        # Retry strategy
-        retry = Retry(
-            total=retries,
-            backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504],
-        )
-        self.session.mount("https://", HTTPAdapter(max_retries=retry))
-        self.session.mount("http://", HTTPAdapter(max_retries=retry))
-
-        # Default headers
-        default_headers = headers or {}
+        # Default headers — sent per request, never stored on the (shared) session
+        default_headers = dict(headers or {})
         if bearer_token:
             default_headers["Authorization"] = f"Bearer {bearer_token}"
         if api_key:
             default_headers["X-API-Key"] = api_key
-        self.session.headers.update(default_headers)
-        self.session.verify = verify_ssl
+        self.headers = default_headers
+
+        # Private session only when pooling is disabled
+        self._own_session = None if shared_session else _new_session(
+            retries, verify_ssl, self.pool_connections, self.pool_maxsize)
+
+    @property
+    def session(self) -> requests.Session:
+        """Session for base_url (kept for callers that use the session directly)."""
+        return self._session_for(self.base_url)
+
+    def _pool_key(self, full_url: str) -> tuple:
+        if self.credential_name:
+            # Secrets are hashed into the key so two owners' same-named credentials never share
+            digest = hashlib.sha256(repr(sorted(self.headers.items())).encode()).hexdigest()[:16]
+            return ("credential", f"{self.credential_name}#{digest}")
+        parts = urlsplit(full_url)
+        return ("origin", f"{parts.scheme}://{parts.netloc}".lower())
+
+    def _session_for(self, full_url: str) -> requests.Session:
+        if self._own_session is not None:
+            return self._own_session
+        return get_session_registry().acquire(
+            self._pool_key(full_url), retries=self.retries, verify=self.verify_ssl,
+            pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize,
+        )
+
+    def _full_url(self, url: str) -> str:
+        return url if url.startswith("http") else f"{self.base_url}/{url.lstrip('/')}"
 
     def request(
         self,
@@ -59,18 +725,199 @@ class HTTPConnector:
         params: Dict = None,
         json: Any = None,
         data: Any = None,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+        conditional: bool = False,
     ) -> requests.Response:
-        full_url = url if url.startswith("http") else f"{self.base_url}/{url.lstrip('/')}"
+        """
+        deadline caps each attempt's timeout; the engine enforces it across adapter retries.
+        conditional=True revalidates GETs against the ConditionalCache — see _conditional_begin().
+        """
+        full_url = self._full_url(url)
         logger.info(f"HTTP {method} {full_url}")
-        resp = self.session.request(
+        send_headers = {**self.headers, **(headers or {})}
+        ckey, cached = self._conditional_begin(method, full_url, params, send_headers, conditional and not stream)
+        t0   = time.monotonic()
+        resp = self._session_for(full_url).request(
             method.upper(), full_url,
-            headers=headers, params=params,
+            headers=send_headers, params=params,
             json=json, data=data,
-            timeout=self.timeout,
+            timeout=min(self.timeout, deadline) if deadline else self.timeout, stream=stream,
         )
+        if resp.status_code < 500:
+            get_latency_tracker().record(LatencyTracker.key(method, full_url), time.monotonic() - t0)
         logger.info(f"HTTP {resp.status_code} ← {full_url}")
+        if ckey is None:
+            return resp
+        if resp.status_code == 304 and cached is not None:
+            get_conditional_cache().revalidated(ckey, cached, resp.headers)
+            replay = requests.Response()
+            replay.status_code = cached.status_code
+            replay.headers     = requests.structures.CaseInsensitiveDict(cached.headers)
+            replay._content    = cached.content
+            replay.encoding    = cached.encoding
+            replay.url         = resp.url
+            replay.request     = resp.request
+            replay.cache_status = "hit"
+            return replay
+        stored = get_conditional_cache().store(ckey, resp.status_code, resp.headers, resp.content, resp.encoding)
+        resp.cache_status = "miss" if stored else "bypass"
         return resp
 
+    def _conditional_begin(self, method, full_url, params, send_headers, enabled):
+        """
+        For a conditional GET: look up the cached entry and add its validators to
+        send_headers (in place). Returns (cache_key, entry) or (None, None) when the
+        call is not cacheable (non-GET, streamed, or conditional not requested).
+        """
+        if not enabled or method.upper() != "GET":
+            return None, None
+        cache = get_conditional_cache()
+        key   = cache.make_key(full_url, params, send_headers)
+        entry = cache.get(key)
+        send_headers.update(cache.validators(entry))
+        return key, entry
+
+    async def arequest(
+        self,
+        method: str,
+        url: str,
+        headers: Dict = None,
+        params: Dict = None,
+        json: Any = None,
+        data: Any = None,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+        conditional: bool = False,
+    ) -> "httpx.Response":
+        """
+        Async counterpart of request() on a shared httpx.AsyncClient.
+        Mirrors the sync Retry policy: connection errors and 500/502/503/504 are
+        retried up to self.retries times for idempotent methods, with 0.5s
+        exponential backoff. If the last retry still gets one of those statuses,
+        requests' RetryError is raised, just as the sync adapter raises it.
+        stream=True returns an open response — read it with aiter_bytes() and aclose() it.
+        deadline (seconds) caps the whole call: attempt timeouts shrink to the time
+        left, and no retry is started whose backoff would overrun it.
+        """
+        full_url = self._full_url(url)
+        method   = method.upper()
+        client   = get_async_client_registry().acquire(
+            self._pool_key(full_url), verify=self.verify_ssl, timeout=self.timeout,
+            max_connections=self.pool_maxsize, max_keepalive=self.pool_connections,
+        )
+        stop_at  = time.monotonic() + deadline if deadline else None
+        resp     = None
+        send_headers = {**self.headers, **(headers or {})}
+        ckey, cached = self._conditional_begin(method, full_url, params, send_headers, conditional and not stream)
+        logger.info(f"HTTP {method} {full_url} (async)")
+        cut_short = False
+        for attempt in range(self.retries + 1):
+            if attempt:
+                backoff = 0.5 * 2 ** (attempt - 1)
+                if stop_at and time.monotonic() + backoff >= stop_at:
+                    cut_short = True
+                    break
+                if stream and resp is not None:
+                    await resp.aclose()
+                await asyncio.sleep(backoff)
+            timeout = min(self.timeout, stop_at - time.monotonic()) if stop_at else self.timeout
+            if timeout <= 0:
+                raise TimeoutError(f"HTTP deadline of {deadline}s exceeded: {method} {full_url}")
+            t0 = time.monotonic()
+            try:
+                req  = client.build_request(
+                    method, full_url,
+                    headers=send_headers, params=params,
+                    json=json, data=data, timeout=timeout,
+                )
+                resp = await client.send(req, stream=stream)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+                resp = None
+                continue
+            if resp.status_code < 500:
+                get_latency_tracker().record(LatencyTracker.key(method, full_url), time.monotonic() - t0)
+            if resp.status_code not in RETRY_STATUSES or method not in RETRY_METHODS or attempt >= self.retries:
+                break
+        if resp is None:
+            raise TimeoutError(f"HTTP deadline of {deadline}s exceeded: {method} {full_url}")
+        logger.info(f"HTTP {resp.status_code} ← {full_url}")
+        if resp.status_code in RETRY_STATUSES and method in RETRY_METHODS:
+            await resp.aclose()
+            if cut_short:
+                raise TimeoutError(f"HTTP deadline of {deadline}s exceeded: {method} {full_url} "
+                                   f"(last status {resp.status_code})")
+            raise requests.exceptions.RetryError(
+                f"Max retries exceeded with url: {full_url} "
+                f"(Caused by ResponseError('too many {resp.status_code} error responses'))")
+        if ckey is None:
+            return resp
+        if resp.status_code == 304 and cached is not None:
+            get_conditional_cache().revalidated(ckey, cached, resp.headers)
+            replay = httpx.Response(cached.status_code, headers=cached.headers,
+                                    content=cached.content, request=resp.request)
+            if cached.encoding:
+                replay.encoding = cached.encoding
+            replay.cache_status = "hit"
+            return replay
+        stored = get_conditional_cache().store(ckey, resp.status_code, resp.headers, resp.content, resp.encoding)
+        resp.cache_status = "miss" if stored else "bypass"
+        return resp
+
+    async def hedged_request(
+        self,
+        method: str,
+        url: str,
+        use_async: bool = False,
+        hedge_after: Optional[float] = None,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Hedged GET/HEAD. Sends the request; if no response has arrived after
+        hedge_after seconds (default: this URL's observed p95 latency), sends an
+        identical second request and returns whichever completes first, cancelling
+        the other. Returns (response, winner) with winner "primary" or "hedge".
+        If the first finisher failed, the other is awaited before giving up.
+
+        With the sync transport the losing call cannot be interrupted mid-read;
+        its result is discarded when it completes.
+        """
+        method = method.upper()
+        if method not in HEDGE_METHODS:
+            raise ValueError(f"Hedging is only allowed for idempotent GET/HEAD, not {method}")
+        tracker = get_latency_tracker()
+        key     = LatencyTracker.key(method, self._full_url(url))
+        delay   = hedge_after if hedge_after is not None else tracker.hedge_delay(key)
+        loop    = asyncio.get_running_loop()
+
+        def launch():
+            if use_async:
+                return asyncio.ensure_future(self.arequest(method, url, deadline=deadline, **kwargs))
+            return asyncio.ensure_future(loop.run_in_executor(
+                None, functools.partial(self.request, method, url, deadline=deadline, **kwargs)))
+
+        primary = launch()
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result(), "primary"
+
+        hedge = launch()
+        done, pending = await asyncio.wait({primary, hedge}, return_when=asyncio.FIRST_COMPLETED)
+        ok = [t for t in (primary, hedge) if t in done and t.exception() is None]
+        if not ok and pending:
+            done, pending = await asyncio.wait(pending)
+            ok = [t for t in done if t.exception() is None]
+        winner = ok[0] if ok else primary
+        for task in (primary, hedge):
+            if task is not winner:
+                _discard_response(task)
+        tracker.record_hedge(key, won=winner is hedge)
+        logger.info(f"HTTP hedge after {delay:.3f}s → {'hedge' if winner is hedge else 'primary'} won ({key})")
+        return winner.result(), "hedge" if winner is hedge else "primary"
+
     def get(self, url: str, **kwargs)    -> requests.Response: return self.request("GET", url, **kwargs)
     def post(self, url: str, **kwargs)   -> requests.Response: return self.request("POST", url, **kwargs)
     def put(self, url: str, **kwargs)    -> requests.Response: return self.request("PUT", url, **kwargs)
@@ -97,5 +944,10 @@ class HTTPConnector:
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
+    def close(self):
+        """Close a private session. Shared sessions stay warm in the registry."""
+        if self._own_session is not None:
+            self._own_session.close()
+
     def __enter__(self):  return self
-    def __exit__(self, *a): self.session.close()
+    def __exit__(self, *a): self.close()
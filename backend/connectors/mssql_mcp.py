@@ -4,6 +4,7 @@ Wraps Microsoft SQL Server via pyodbc / pymssql
 
 Supports:
 - Execute queries (SELECT, INSERT, UPDATE, DELETE, stored procs)
+- Bulk inserts (pyodbc fast_executemany / pymssql multi-row VALUES, chunked)
 - Row count assertions
 - Export results to CSV / XLSX
 - Schema inspection
@@ -12,7 +13,9 @@ Supports:
 import logging
 import csv
 import io
-from typing import Any, List, Optional, Tuple
+import itertools
+import time
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -37,12 +40,24 @@ except ImportError:
     OPENPYXL_AVAILABLE = False
 
 
+def _quote_ident(name: str) -> str:
+    """Bracket-quote a (possibly schema-qualified) identifier: dbo.Orders → [dbo].[Orders]."""
+    parts = [p.strip().strip("[]") for p in str(name).split(".")]
+    return ".".join("[" + p.replace("]", "]]") + "]" for p in parts if p)
+
+
 class MSSQLMCP:
     """
     MCP connector for Microsoft SQL Server.
     Prefers pyodbc; falls back to pymssql.
+
+    Thread-safety: NOT safe to share. Holds one DB-API connection plus per-call
+    state (last_column_names) and callers disconnect() when done, so
+    CredentialManager builds a fresh instance for every caller.
     """
 
+    THREAD_SAFE = False
+
     def __init__(
         self,
         server: str = None,
@@ -54,11 +69,14 @@ class MSSQLMCP:
         driver: str = "ODBC Driver 17 for SQL Server",
         timeout: int = 30,
         autocommit: bool = False,
+        cache_ttl: float = 0,
     ):
         self.credential_name = credential_name
         self.timeout = timeout
         self.autocommit = autocommit
+        self.cache_ttl = cache_ttl      # default result-cache TTL (s) for this credential; 0 = off
         self._conn = None
+        self._driver = None   # "pyodbc" | "pymssql", set by connect()
 
         if connection_string:
             self._connection_string = connection_string
@@ -85,11 +103,13 @@ class MSSQLMCP:
     def connect(self):
         if PYODBC_AVAILABLE:
             self._conn = pyodbc.connect(self._connection_string, autocommit=self.autocommit)
+            self._driver = "pyodbc"
         elif PYMSSQL_AVAILABLE:
             self._conn = pymssql.connect(
                 server=self._server, user=self._username,
                 password=self._password, database=self._database
             )
+            self._driver = "pymssql"
         else:
             raise RuntimeError("No SQL driver available. Install pyodbc or pymssql.")
         logger.info("MSSQL connection established")
@@ -141,15 +161,100 @@ class MSSQLMCP:
             cur.execute(query, params or ())
             return cur.rowcount
 
-    def execute_many(self, query: str, params_list: List[tuple]) -> int:
-        """Bulk DML execution. Returns total rows affected."""
+    def execute_many(self, query: str, params_list: List[tuple], chunk_size: int = 1000) -> int:
+        """
+        Bulk DML execution. Returns total rows affected.
+        pyodbc sends each chunk as one parameter array (fast_executemany);
+        pymssql falls back to cursor.executemany per chunk.
+        """
         total = 0
         with self._cursor() as cur:
-            for params in params_list:
-                cur.execute(query, params)
-                total += cur.rowcount
+            if self._driver == "pyodbc":
+                cur.fast_executemany = True
+            it = iter(params_list)
+            while True:
+                chunk = list(itertools.islice(it, chunk_size))
+                if not chunk:
+                    break
+                cur.executemany(query, chunk)
+                total += cur.rowcount if cur.rowcount and cur.rowcount > 0 else len(chunk)
         return total
 
+    def bulk_insert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: Iterable[Sequence[Any]],
+        chunk_size: int = 1000,
+        on_progress: Optional[Callable[[int, float], None]] = None,
+    ) -> dict:
+        """
+        Insert rows into table in chunks, committing after every chunk.
+
+        pyodbc:  INSERT … VALUES (?,…) with cursor.fast_executemany (one round trip per chunk)
+        pymssql: multi-row INSERT … VALUES (…),(…) batches (max 1000 rows per statement)
+
+        rows may be any iterable (generator, csv.reader, …) — it is consumed
+        lazily, so only one chunk is held in memory at a time.
+        on_progress(rows_inserted_so_far, elapsed_seconds) is called after each commit.
+        Returns {"rows_inserted", "chunks", "duration_s", "rows_per_sec", "driver"}.
+        """
+        if not columns:
+            raise ValueError("bulk_insert requires at least one column")
+        if not self._conn:
+            self.connect()
+
+        cols_sql = ", ".join(_quote_ident(c) for c in columns)
+        tbl_sql  = _quote_ident(table)
+        ncols    = len(columns)
+        # SQL Server caps a single VALUES list at 1000 rows
+        batch    = max(1, min(int(chunk_size), 1000)) if self._driver == "pymssql" else max(1, int(chunk_size))
+
+        inserted = 0
+        chunks   = 0
+        t0       = time.time()
+        it       = iter(rows)
+        cur      = self._conn.cursor()
+        try:
+            if self._driver == "pyodbc":
+                cur.fast_executemany = True
+                sql = f"INSERT INTO {tbl_sql} ({cols_sql}) VALUES ({', '.join('?' * ncols)})"
+            while True:
+                chunk = [tuple(r) for r in itertools.islice(it, batch)]
+                if not chunk:
+                    break
+                for r in chunk:
+                    if len(r) != ncols:
+                        raise ValueError(f"bulk_insert: row has {len(r)} values, expected {ncols}: {r!r}"[:300])
+                if self._driver == "pyodbc":
+                    cur.executemany(sql, chunk)
+                else:
+                    row_ph = "(" + ", ".join(["%s"] * ncols) + ")"
+                    sql    = f"INSERT INTO {tbl_sql} ({cols_sql}) VALUES " + ", ".join([row_ph] * len(chunk))
+                    cur.execute(sql, tuple(v for r in chunk for v in r))
+                if not self.autocommit:
+                    self._conn.commit()
+                inserted += len(chunk)
+                chunks   += 1
+                if on_progress:
+                    on_progress(inserted, time.time() - t0)
+        except Exception:
+            self._conn.rollback()   # only the in-flight chunk — earlier chunks are committed
+            raise
+        finally:
+            cur.close()
+
+        elapsed = time.time() - t0
+        rps     = round(inserted / elapsed, 1) if elapsed > 0 else float(inserted)
+        logger.info(f"bulk_insert {table}: {inserted} rows in {chunks} chunk(s), {elapsed:.2f}s ({rps} rows/s)")
+        return {
+            "rows_inserted": inserted,
+            "chunks":        chunks,
+            "duration_s":    round(elapsed, 3),
+            "rows_per_sec":  rps,
+            "driver":        self._driver,
+        }
+
     def execute_stored_proc(self, proc_name: str, params: tuple = None) -> List[Tuple]:
         """Execute stored procedure."""
         placeholders = ",".join(["?" for _ in (params or [])])
@@ -230,6 +335,64 @@ class MSSQLMCP:
         )
         return [{"column": r[0], "type": r[1], "nullable": r[2], "max_length": r[3]} for r in rows]
 
+    def describe_schema(self, schema: str = None, include_row_counts: bool = True) -> dict:
+        """
+        Describe every table (optionally in one schema) in at most two round trips:
+          1. INFORMATION_SCHEMA.COLUMNS joined with primary-key constraint columns
+          2. row-count estimates from sys.dm_db_partition_stats (heap/clustered index)
+        Returns {"schema.table": {"schema", "table", "columns": [...], "primary_key": [...],
+        "row_count": int|None}}. Row counts are None when the login lacks VIEW DATABASE STATE.
+        """
+        where  = "WHERE c.TABLE_SCHEMA=? " if schema else ""
+        params = (schema,) if schema else ()
+        rows = self.execute_query(
+            "SELECT c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.IS_NULLABLE, "
+            "c.CHARACTER_MAXIMUM_LENGTH, c.ORDINAL_POSITION, "
+            "CASE WHEN pk.COLUMN_NAME IS NULL THEN 0 ELSE 1 END AS IS_PK "
+            "FROM INFORMATION_SCHEMA.COLUMNS c "
+            "LEFT JOIN ("
+            "  SELECT ku.TABLE_SCHEMA, ku.TABLE_NAME, ku.COLUMN_NAME "
+            "  FROM INFORMATION_SCHEMA.TABLE_CONSTRAINTS tc "
+            "  JOIN INFORMATION_SCHEMA.KEY_COLUMN_USAGE ku "
+            "    ON tc.CONSTRAINT_NAME = ku.CONSTRAINT_NAME AND tc.TABLE_SCHEMA = ku.TABLE_SCHEMA "
+            "  WHERE tc.CONSTRAINT_TYPE = 'PRIMARY KEY'"
+            ") pk ON pk.TABLE_SCHEMA = c.TABLE_SCHEMA AND pk.TABLE_NAME = c.TABLE_NAME "
+            "     AND pk.COLUMN_NAME = c.COLUMN_NAME "
+            f"{where}ORDER BY c.TABLE_SCHEMA, c.TABLE_NAME, c.ORDINAL_POSITION",
+            params,
+        )
+        tables: dict = {}
+        for sch, tbl, col, typ, nullable, max_len, _ordinal, is_pk in rows:
+            t = tables.setdefault(f"{sch}.{tbl}", {
+                "schema": sch, "table": tbl, "columns": [], "primary_key": [], "row_count": None,
+            })
+            t["columns"].append({
+                "column": col, "type": typ, "nullable": nullable,
+                "max_length": max_len, "primary_key": bool(is_pk),
+            })
+            if is_pk:
+                t["primary_key"].append(col)
+
+        if include_row_counts and tables:
+            try:
+                counts = self.execute_query(
+                    "SELECT s.name, t.name, SUM(p.row_count) "
+                    "FROM sys.dm_db_partition_stats p "
+                    "JOIN sys.tables t  ON t.object_id = p.object_id "
+                    "JOIN sys.schemas s ON s.schema_id = t.schema_id "
+                    "WHERE p.index_id IN (0, 1) " + ("AND s.name=? " if schema else "") +
+                    "GROUP BY s.name, t.name",
+                    params,
+                )
+                for sch, tbl, cnt in counts:
+                    if f"{sch}.{tbl}" in tables:
+                        tables[f"{sch}.{tbl}"]["row_count"] = int(cnt or 0)
+            except Exception as e:
+                logger.warning(f"describe_schema: row-count estimates unavailable: {e}")
+
+        logger.info(f"describe_schema: {len(tables)} tables, {len(rows)} columns")
+        return tables
+
     # ── Health Check ─────────────────────────────────────────────────────────
 
     def health_check(self) -> dict:
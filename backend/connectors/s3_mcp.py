@@ -1,25 +1,132 @@
 """
 FlowForge — Amazon S3 MCP Connector
 Wraps boto3 for S3 operations with assertions.
+
+upload_file / download_file accept a boto3 TransferConfig (see transfer_config())
+for multipart threshold, part size and thread concurrency, plus a progress
+callback invoked with byte counts from the transfer worker threads.
+
+iter_objects() is a lazy lister: pages are requested only as the caller
+consumes them, so taking the first N keys of a 3M-key prefix costs
+ceil(N / 1000) ListObjectsV2 calls. S3 itself can only narrow a listing by
+Prefix / StartAfter / Delimiter; suffix, regex and modified-since filters are
+applied to the stream as each page arrives, before anything is materialised.
+
+Bulk prefix operations (delete_prefix, copy_prefix, exists_many) consume that
+stream through a bounded thread pool and return compact summaries: counts plus
+at most RESULT_SAMPLE failing/missing keys.
+
+sync_directory() mirrors a local directory and a prefix in either direction.
+The sorted local tree is merge-joined against the streaming listing. Size
+decides first. When sizes match, a file whose mtime says it may have changed
+is confirmed by computing its MD5 / multipart ETag before anything is sent.
+That makes a repeat sync of an unchanged tree one listing plus a stat() per
+file.
+
+open_stream() / upload_stream() let the transfer and verify nodes pipe bytes
+through without temp files. get_checksums() reports the checksums S3 already
+holds for an object: the ETag (an MD5 for single-part uploads) and any
+full-object CRC32/CRC32C/SHA-256 additional checksum.
 """
 
+import base64
+import hashlib
 import logging
 import os
-from typing import List, Optional
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
     from botocore.exceptions import ClientError
     BOTO3_AVAILABLE = True
 except ImportError:
     BOTO3_AVAILABLE = False
     logger.warning("boto3 not installed. Run: pip install boto3")
 
+DELETE_BATCH  = 1000   # DeleteObjects hard limit
+RESULT_SAMPLE = 100    # failing / missing keys reported per bulk operation
+
+
+def _bounded_map(fn: Callable, items: Iterable, max_workers: int) -> Iterator:
+    """Map fn over a (lazy) iterable on a thread pool with at most 2×max_workers tasks queued; unordered."""
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        for item in items:
+            pending.add(pool.submit(fn, item))
+            if len(pending) >= max_workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    yield f.result()
+        for f in wait(pending).done:
+            yield f.result()
+
+
+_ETAG_PART_SIZES = [8 * 1024 ** 2, 16 * 1024 ** 2, 5 * 1024 ** 2, 32 * 1024 ** 2,
+                    64 * 1024 ** 2, 100 * 1024 ** 2, 128 * 1024 ** 2, 256 * 1024 ** 2, 512 * 1024 ** 2]
+
+
+def local_etag(path: str, etag: str, part_size: int = None) -> Optional[str]:
+    """
+    The S3 ETag path would have if uploaded like the object whose ETag is given:
+    plain MD5 for single-part objects, md5(concat(part MD5s))-N for multipart.
+    The part size of a multipart object is inferred from N and the file size
+    (part_size first, then common client defaults). None if no candidate fits.
+    """
+    etag = etag.strip('"')
+    if "-" not in etag:
+        h = hashlib.md5()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(block)
+        return h.hexdigest()
+    parts = int(etag.rsplit("-", 1)[1])
+    size  = os.path.getsize(path)
+    for ps in dict.fromkeys([part_size, *_ETAG_PART_SIZES]):
+        if not ps or -(-size // ps) != parts:
+            continue
+        digests = []
+        with open(path, "rb") as f:
+            for _ in range(parts):
+                h, left = hashlib.md5(), ps
+                while left:
+                    block = f.read(min(left, 1024 * 1024))
+                    if not block:
+                        break
+                    h.update(block)
+                    left -= len(block)
+                digests.append(h.digest())
+        candidate = f"{hashlib.md5(b''.join(digests)).hexdigest()}-{parts}"
+        if candidate == etag:
+            return candidate
+    return None
+
+
+def _batched(iterable: Iterable, size: int) -> Iterator[list]:
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
 
 class S3Connector:
-    """MCP connector for Amazon S3."""
+    """
+    MCP connector for Amazon S3.
+
+    Thread-safety: safe to share. boto3 low-level clients are thread-safe and the
+    connector keeps no per-call state, so CredentialManager caches one instance
+    per credential version and hands it to concurrent nodes.
+    """
+
+    THREAD_SAFE = True
 
     def __init__(
         self,
@@ -47,9 +154,25 @@ class S3Connector:
 
     # ── Object Operations ────────────────────────────────────────────────────
 
-    def upload_file(self, local_path: str, bucket: str, key: str) -> str:
-        """Upload a local file to S3. Returns s3:// URI."""
-        self._s3.upload_file(local_path, bucket, key)
+    @staticmethod
+    def transfer_config(
+        multipart_threshold: int = None,
+        part_size: int = None,
+        max_concurrency: int = None,
+        max_bandwidth: int = None,
+    ) -> "TransferConfig":
+        """TransferConfig with only the given knobs overridden (boto3 defaults: 8 MB / 8 MB / 10 threads)."""
+        kwargs = {}
+        if multipart_threshold: kwargs["multipart_threshold"] = int(multipart_threshold)
+        if part_size:           kwargs["multipart_chunksize"] = int(part_size)
+        if max_concurrency:     kwargs["max_concurrency"]     = int(max_concurrency)
+        if max_bandwidth:       kwargs["max_bandwidth"]       = int(max_bandwidth)
+        return TransferConfig(**kwargs)
+
+    def upload_file(self, local_path: str, bucket: str, key: str,
+                    config: "TransferConfig" = None, callback=None) -> str:
+        """Upload a local file to S3 (multipart above config.multipart_threshold). Returns s3:// URI."""
+        self._s3.upload_file(local_path, bucket, key, Config=config, Callback=callback)
         uri = f"s3://{bucket}/{key}"
         logger.info(f"Uploaded {local_path} → {uri}")
         return uri
@@ -59,26 +182,96 @@ class S3Connector:
         self._s3.upload_fileobj(io.BytesIO(data), bucket, key, ExtraArgs={"ContentType": content_type})
         return f"s3://{bucket}/{key}"
 
-    def download_file(self, bucket: str, key: str, local_path: str) -> str:
-        """Download an S3 object to local_path. Returns local_path."""
+    def download_file(self, bucket: str, key: str, local_path: str,
+                      config: "TransferConfig" = None, callback=None) -> str:
+        """
+        Download an S3 object to local_path (ranged parallel GETs above the
+        multipart threshold). A directory path (trailing "/") keeps the key's
+        file name. Returns the file path written.
+        """
+        if local_path.endswith("/") or os.path.isdir(local_path):
+            local_path = os.path.join(local_path, os.path.basename(key))
         os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
-        self._s3.download_file(bucket, key, local_path)
+        self._s3.download_file(bucket, key, local_path, Config=config, Callback=callback)
         logger.info(f"Downloaded s3://{bucket}/{key} → {local_path}")
         return local_path
 
+    def open_stream(self, bucket: str, key: str):
+        """(body, size) — body.read(n) pulls the object from the socket as it is consumed."""
+        resp = self._s3.get_object(Bucket=bucket, Key=key)
+        return resp["Body"], resp["ContentLength"]
+
+    def upload_stream(self, fileobj, bucket: str, key: str,
+                      config: "TransferConfig" = None, callback=None) -> str:
+        """
+        Upload from a readable stream. Above the multipart threshold it is read
+        part by part, so memory is bounded by part size × concurrency.
+        """
+        self._s3.upload_fileobj(fileobj, bucket, key, Config=config, Callback=callback)
+        return f"s3://{bucket}/{key}"
+
+    def get_checksums(self, bucket: str, key: str) -> dict:
+        """Server-side checksums for an object as lowercase hex: md5 (single-part ETag), crc32, crc32c, sha256."""
+        resp = self._s3.head_object(Bucket=bucket, Key=key, ChecksumMode="ENABLED")
+        etag = resp["ETag"].strip('"')
+        out  = {"size": resp["ContentLength"], "etag": etag, "multipart": "-" in etag}
+        if "-" not in etag:
+            out["md5"] = etag
+        if resp.get("ChecksumType", "FULL_OBJECT") == "FULL_OBJECT":
+            for algo, field in (("crc32", "ChecksumCRC32"), ("crc32c", "ChecksumCRC32C"), ("sha256", "ChecksumSHA256")):
+                value = resp.get(field)
+                if value and "-" not in value:
+                    out[algo] = base64.b64decode(value).hex()
+        return out
+
     def read_object(self, bucket: str, key: str) -> bytes:
         """Return raw bytes of S3 object."""
         resp = self._s3.get_object(Bucket=bucket, Key=key)
         return resp["Body"].read()
 
-    def list_objects(self, bucket: str, prefix: str = "", max_results: int = 1000) -> List[dict]:
-        """List objects in bucket (paginated)."""
+    def iter_objects(
+        self,
+        bucket: str,
+        prefix: str = "",
+        start_after: str = None,
+        delimiter: str = None,
+        suffix: str = None,
+        pattern: str = None,
+        modified_since: datetime = None,
+        page_size: int = 1000,
+    ) -> Iterator[dict]:
+        """
+        Lazily yield objects in key order (ListObjectsV2, one page per 1000 keys consumed).
+
+          start_after     resume after this key (exclusive)
+          delimiter       "directory" listing — common prefixes are yielded as
+                          {"prefix": "...", "type": "prefix"} alongside the objects
+          suffix          keep keys ending with this string
+          pattern         keep keys matching this regex (re.search)
+          modified_since  keep objects with LastModified >= this (tz-aware) datetime
+        """
+        regex  = re.compile(pattern) if pattern else None
+        kwargs = {"Bucket": bucket, "Prefix": prefix or "", "MaxKeys": max(1, min(int(page_size), 1000))}
+        if start_after: kwargs["StartAfter"] = start_after
+        if delimiter:   kwargs["Delimiter"]  = delimiter
         paginator = self._s3.get_paginator("list_objects_v2")
-        items = []
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for page in paginator.paginate(**kwargs):
+            for cp in page.get("CommonPrefixes", []):
+                if regex is None or regex.search(cp["Prefix"]):
+                    yield {"prefix": cp["Prefix"], "type": "prefix"}
             for obj in page.get("Contents", []):
-                items.append({"key": obj["Key"], "size": obj["Size"], "last_modified": str(obj["LastModified"])})
-        return items[:max_results]
+                key = obj["Key"]
+                if suffix and not key.endswith(suffix):             continue
+                if regex is not None and not regex.search(key):     continue
+                if modified_since and obj["LastModified"] < modified_since: continue
+                yield {"key": key, "size": obj["Size"], "last_modified": str(obj["LastModified"]),
+                       "etag": obj.get("ETag", "").strip('"')}
+
+    def list_objects(self, bucket: str, prefix: str = "", max_results: int = 1000, **filters) -> List[dict]:
+        """First max_results objects (see iter_objects for filters) — stops listing once reached."""
+        if not filters:
+            filters["page_size"] = min(max_results, 1000)
+        return list(islice((o for o in self.iter_objects(bucket, prefix, **filters) if "key" in o), max_results))
 
     def object_exists(self, bucket: str, key: str) -> bool:
         try:
@@ -91,6 +284,282 @@ class S3Connector:
         self._s3.delete_object(Bucket=bucket, Key=key)
         return True
 
+    # ── Bulk prefix operations ───────────────────────────────────────────────
+
+    def delete_keys(self, bucket: str, keys: List[str]) -> dict:
+        """One DeleteObjects call (≤ 1000 keys). Returns {"deleted": n, "errors": [...]}."""
+        resp = self._s3.delete_objects(
+            Bucket=bucket, Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True})
+        errors = [{"key": e["Key"], "code": e.get("Code"), "message": e.get("Message")}
+                  for e in resp.get("Errors", [])]
+        return {"deleted": len(keys) - len(errors), "errors": errors}
+
+    def delete_prefix(self, bucket: str, prefix: str, max_workers: int = 8,
+                      dry_run: bool = False, **filters) -> dict:
+        """
+        Delete every object under prefix (iter_objects filters apply) with
+        DeleteObjects batches of 1000 keys, up to max_workers batches in flight.
+        dry_run only counts what would be deleted.
+        """
+        objects = (o for o in self.iter_objects(bucket, prefix, **filters) if "key" in o)
+        if dry_run:
+            count, sample = 0, []
+            for o in objects:
+                count += 1
+                if len(sample) < 20:
+                    sample.append(o["key"])
+            return {"deleted": 0, "would_delete": count, "sample": sample,
+                    "batches": 0, "failed": 0, "errors": []}
+
+        def _run(batch):
+            try:
+                return self.delete_keys(bucket, batch)
+            except Exception as e:
+                return {"deleted": 0, "errors": [{"key": k, "code": "Exception", "message": str(e)} for k in batch]}
+
+        deleted, batches, failed, errors = 0, 0, 0, []
+        for res in _bounded_map(_run, _batched((o["key"] for o in objects), DELETE_BATCH), max_workers):
+            batches += 1
+            deleted += res["deleted"]
+            failed  += len(res["errors"])
+            errors.extend(res["errors"][:RESULT_SAMPLE - len(errors)])
+        logger.info(f"Deleted {deleted} objects under s3://{bucket}/{prefix} in {batches} batches ({failed} failed)")
+        return {"deleted": deleted, "batches": batches, "failed": failed, "errors": errors}
+
+    def copy_prefix(self, bucket: str, prefix: str, dest_bucket: str, dest_prefix: str,
+                    max_workers: int = 16, config: "TransferConfig" = None, **filters) -> dict:
+        """
+        Server-side copy of every object under prefix to dest_prefix (key suffix
+        preserved), up to max_workers objects in flight. Objects below the
+        multipart threshold take a single CopyObject; larger ones a managed
+        multipart UploadPartCopy.
+        """
+        threshold = config.multipart_threshold if config else 8 * 1024 * 1024
+
+        def _run(obj):
+            dest_key = dest_prefix + obj["key"][len(prefix):]
+            source   = {"Bucket": bucket, "Key": obj["key"]}
+            try:
+                if obj["size"] < threshold:
+                    self._s3.copy_object(CopySource=source, Bucket=dest_bucket, Key=dest_key)
+                else:
+                    self._s3.copy(source, dest_bucket, dest_key, Config=config)
+                return obj, None
+            except Exception as e:
+                return obj, str(e)
+
+        objects = (o for o in self.iter_objects(bucket, prefix, **filters) if "key" in o)
+        copied, nbytes, errors, failed = 0, 0, [], 0
+        for obj, err in _bounded_map(_run, objects, max_workers):
+            if err:
+                failed += 1
+                if len(errors) < RESULT_SAMPLE:
+                    errors.append({"key": obj["key"], "error": err})
+            else:
+                copied += 1
+                nbytes += obj["size"]
+        logger.info(f"Copied {copied} objects s3://{bucket}/{prefix} → s3://{dest_bucket}/{dest_prefix} ({failed} failed)")
+        return {"copied": copied, "bytes": nbytes, "failed": failed, "errors": errors}
+
+    def exists_many(self, bucket: str, keys: List[str], max_workers: int = 16,
+                    strategy: str = "auto") -> dict:
+        """
+        Check many keys at once.
+          "head"  — bounded-concurrency HEAD per key
+          "list"  — one listing of the keys' common prefix, diffed against the set
+          "auto"  — list when there are >= 50 keys under a non-empty common prefix
+        Returns {"checked", "present", "missing": count, "missing_keys": [...], "strategy"}.
+        """
+        wanted = list(dict.fromkeys(keys))
+        common = os.path.commonprefix(wanted) if wanted else ""
+        if strategy == "auto":
+            strategy = "list" if len(wanted) >= 50 and common else "head"
+
+        if strategy == "list":
+            remaining = set(wanted)
+            last      = max(wanted) if wanted else ""
+            for obj in self.iter_objects(bucket, common):
+                remaining.discard(obj.get("key"))
+                if not remaining or obj.get("key", "") >= last:
+                    break
+            missing = [k for k in wanted if k in remaining]
+        else:
+            missing = [k for k, ok in _bounded_map(lambda k: (k, self.object_exists(bucket, k)), wanted, max_workers)
+                       if not ok]
+            order   = {k: i for i, k in enumerate(wanted)}
+            missing.sort(key=order.get)
+        return {"checked": len(wanted), "present": len(wanted) - len(missing), "missing": len(missing),
+                "missing_keys": missing[:RESULT_SAMPLE], "strategy": strategy}
+
+    # ── Sync ──────────────────────────────────────────────────────────────────
+
+    def sync_directory(
+        self,
+        local_dir: str,
+        bucket: str,
+        prefix: str,
+        direction: str = "up",
+        compare: str = "auto",
+        delete: bool = False,
+        dry_run: bool = False,
+        max_workers: int = 16,
+        config: "TransferConfig" = None,
+        callback=None,
+        on_action=None,
+    ) -> dict:
+        """
+        Mirror local_dir → s3://bucket/prefix (direction "up") or the reverse ("down").
+
+          compare  "auto"      size, then mtime; same-size files that look newer on
+                               the source side are confirmed by MD5 / multipart ETag
+                   "checksum"  size, then MD5 / ETag for every same-size pair
+                   "size"      size only
+          delete   remove destination entries that are absent from the source
+          dry_run  plan (and hash) only — nothing is transferred or deleted
+
+        Downloads stamp the file mtime with the object's LastModified so the next
+        "auto" run sees them as current. on_action(result) is called per action.
+        """
+        if direction not in ("up", "down"):
+            raise ValueError(f"sync direction must be 'up' or 'down' — got {direction!r}")
+        if compare not in ("auto", "checksum", "size"):
+            raise ValueError(f"sync compare must be auto, checksum or size — got {compare!r}")
+        if prefix and not prefix.endswith("/"):
+            prefix += "/"
+        local_dir = os.path.abspath(local_dir)
+        if direction == "up" and not os.path.isdir(local_dir):
+            raise FileNotFoundError(f"Local sync directory not found: {local_dir}")
+        part_size = config.multipart_chunksize if config else None
+
+        local = []
+        for root, _, files in os.walk(local_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                st   = os.stat(path)
+                local.append((os.path.relpath(path, local_dir).replace(os.sep, "/"), path, st.st_size, st.st_mtime))
+        local.sort()
+
+        def pairs():
+            """Merge-join sorted local entries with the (key-ordered) streaming listing."""
+            it  = iter(local)
+            cur = next(it, None)
+            for obj in self.iter_objects(bucket, prefix):
+                rel = obj["key"][len(prefix):]
+                if not rel or rel.endswith("/"):
+                    continue       # directory marker
+                while cur is not None and cur[0] < rel:
+                    yield cur, None
+                    cur = next(it, None)
+                if cur is not None and cur[0] == rel:
+                    yield cur, obj
+                    cur = next(it, None)
+                else:
+                    yield None, obj
+            while cur is not None:
+                yield cur, None
+                cur = next(it, None)
+
+        def decide(pair):
+            loc, obj = pair
+            if direction == "down" and obj is not None:
+                rel = obj["key"][len(prefix):]
+                if rel.startswith("/") or ".." in rel.split("/"):
+                    return {"action": "skip", "key": obj["key"], "reason": "unsafe path"}
+            if obj is None:
+                if direction == "up":
+                    return {"action": "upload", "key": prefix + loc[0], "path": loc[1], "size": loc[2], "reason": "new"}
+                return {"action": "delete", "key": loc[0], "path": loc[1], "reason": "extraneous"} if delete else None
+            if loc is None:
+                if direction == "down":
+                    path = os.path.join(local_dir, *obj["key"][len(prefix):].split("/"))
+                    return {"action": "download", "key": obj["key"], "path": path, "size": obj["size"],
+                            "mtime": obj["last_modified"], "reason": "new"}
+                return {"action": "delete", "key": obj["key"], "reason": "extraneous"} if delete else None
+
+            xfer = "upload" if direction == "up" else "download"
+            base = {"action": xfer, "key": obj["key"], "path": loc[1], "size": loc[2] if direction == "up" else obj["size"],
+                    "mtime": obj["last_modified"]}
+            if loc[2] != obj["size"]:
+                return {**base, "reason": "size"}
+            if compare == "size":
+                return None
+            remote_ts = datetime.fromisoformat(obj["last_modified"]).timestamp()
+            newer = loc[3] > remote_ts if direction == "up" else remote_ts > loc[3] + 1
+            if compare == "auto" and not newer:
+                return None
+            return {**base, "reason": "checksum", "verify": True}
+
+        def run(action):
+            try:
+                etag = action.pop("_etag", None)
+                if action.pop("verify", False) and local_etag(action["path"], etag, part_size) == etag:
+                    if direction == "down" and not dry_run:
+                        ts = datetime.fromisoformat(action["mtime"]).timestamp()
+                        os.utime(action["path"], (ts, ts))
+                    return {"action": "unchanged", "key": action["key"], "reason": "checksum match"}
+                if dry_run:
+                    return action
+                if action["action"] == "upload":
+                    self.upload_file(action["path"], bucket, action["key"], config=config, callback=callback)
+                elif action["action"] == "download":
+                    self.download_file(bucket, action["key"], action["path"], config=config, callback=callback)
+                    ts = datetime.fromisoformat(action["mtime"]).timestamp()
+                    os.utime(action["path"], (ts, ts))
+                elif action["action"] == "delete" and direction == "down":
+                    os.remove(action["path"])
+                return action
+            except Exception as e:
+                return {**action, "error": str(e)}
+
+        counts = {"uploaded": 0, "downloaded": 0, "deleted": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+        nbytes, plan, errors, remote_deletes = 0, [], [], []
+
+        def actions():
+            for pair in pairs():
+                act = decide(pair)
+                if act is None:
+                    counts["unchanged"] += 1
+                    continue
+                if act.get("verify"):
+                    act["_etag"] = pair[1]["etag"]
+                if act["action"] == "skip":
+                    counts["skipped"] += 1
+                    continue
+                if act["action"] == "delete" and direction == "up":
+                    remote_deletes.append(act)       # batched below with DeleteObjects
+                    continue
+                yield act
+
+        done_key = {"upload": "uploaded", "download": "downloaded", "delete": "deleted"}
+        for res in _bounded_map(run, actions(), max_workers):
+            if on_action: on_action(res)
+            if res.get("error"):
+                counts["failed"] += 1
+                if len(errors) < RESULT_SAMPLE: errors.append({"key": res["key"], "error": res["error"]})
+                continue
+            if res["action"] == "unchanged":
+                counts["unchanged"] += 1
+                continue
+            counts[done_key[res["action"]]] += 1
+            nbytes += res.get("size") or 0
+            if len(plan) < RESULT_SAMPLE:
+                plan.append({"action": res["action"], "key": res["key"], "reason": res["reason"]})
+
+        for act in remote_deletes:
+            if on_action: on_action(act)
+            if len(plan) < RESULT_SAMPLE:
+                plan.append({"action": "delete", "key": act["key"], "reason": act["reason"]})
+        if remote_deletes and not dry_run:
+            for batch in _batched([a["key"] for a in remote_deletes], DELETE_BATCH):
+                res = self.delete_keys(bucket, batch)
+                counts["deleted"] += res["deleted"]
+                counts["failed"]  += len(res["errors"])
+                errors.extend({"key": e["key"], "error": e["message"]} for e in res["errors"][:RESULT_SAMPLE - len(errors)])
+        elif remote_deletes:
+            counts["deleted"] = len(remote_deletes)
+
+        return {**counts, "bytes": nbytes, "local_files": len(local), "plan": plan, "errors": errors}
+
     def get_object_metadata(self, bucket: str, key: str) -> dict:
         resp = self._s3.head_object(Bucket=bucket, Key=key)
         return {"size": resp["ContentLength"], "last_modified": str(resp["LastModified"]), "etag": resp["ETag"]}
@@ -107,9 +576,18 @@ class S3Connector:
             raise AssertionError(f"S3 object size {meta['size']} not > {min_bytes}")
 
     def assert_object_count(self, bucket: str, prefix: str, expected: int):
-        items = self.list_objects(bucket, prefix)
-        if len(items) != expected:
-            raise AssertionError(f"Expected {expected} objects at s3://{bucket}/{prefix}, found {len(items)}")
+        found = sum(1 for _ in islice(self.iter_objects(bucket, prefix), expected + 1))
+        if found != expected:
+            shown = f"more than {expected}" if found > expected else str(found)
+            raise AssertionError(f"Expected {expected} objects at s3://{bucket}/{prefix}, found {shown}")
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def close(self):
+        """Release the client's HTTP connection pool (called when evicted from the connector cache)."""
+        close = getattr(self._s3, "close", None)   # botocore >= 1.23
+        if close:
+            close()
 
     # ── Health Check ─────────────────────────────────────────────────────────
 
@@ -1,11 +1,42 @@
 """
 FlowForge — SFTP MCP Connector
 Wraps paramiko for SFTP file operations.
+
+SSH transports are pooled process-wide in the SFTPSessionPool, keyed by
+host + port + user + a hash of the secret. The first operation against an
+endpoint pays for key exchange and auth. Every later one borrows an SFTP
+channel on the already-authenticated transport. Transports send SSH keepalives
+so NAT/firewall idle timers don't drop them between steps, and are closed after
+FLOWFORGE_SFTP_POOL_IDLE_TTL seconds unused. Borrowing health-checks the
+transport (and pings channels that sat idle), replacing anything dead; an
+operation that fails because the connection dropped is retried once on a fresh
+transport. At most FLOWFORGE_SFTP_MAX_CHANNELS channels are open per host at a
+time — further borrowers wait for one to be returned.
+
+Transfers are latency-bound over WAN links unless many requests are in
+flight, so channels open with a larger flow-control window
+(FLOWFORGE_SFTP_WINDOW_SIZE). Uploads are pipelined: write requests are sent
+without waiting for each ack, and the size is checked once at the end.
+Downloads prefetch the whole file's read requests up front, up to
+max_prefetch at a time. request_size raises the 32 KB per-request payload for
+servers that accept more (OpenSSH takes up to 255 KB). transfer() moves a
+file, a directory tree or a glob, with up to max_workers files in flight, each
+on its own pooled channel. It returns per-file and aggregate MB/s.
 """
 
+import fnmatch
+import glob
+import hashlib
 import logging
 import os
-from typing import List
+import posixpath
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +47,344 @@ except ImportError:
     PARAMIKO_AVAILABLE = False
     logger.warning("paramiko not installed. Run: pip install paramiko")
 
+POOL_IDLE_TTL     = float(os.getenv("FLOWFORGE_SFTP_POOL_IDLE_TTL", "300"))  # 0 disables pooling
+KEEPALIVE_S       = int(os.getenv("FLOWFORGE_SFTP_KEEPALIVE", "30"))
+MAX_CHANNELS      = int(os.getenv("FLOWFORGE_SFTP_MAX_CHANNELS", "8"))       # per host:port
+WINDOW_SIZE       = int(os.getenv("FLOWFORGE_SFTP_WINDOW_SIZE", str(16 * 1024 * 1024)))  # per-channel flow-control window
+MAX_PACKET_SIZE   = int(os.getenv("FLOWFORGE_SFTP_MAX_PACKET_SIZE", str(32 * 1024)))
+PING_IDLE_AFTER_S = 15.0     # channels idle longer than this are pinged before being handed out
+COPY_BLOCK        = 1024 * 1024
+RESULT_SAMPLE     = 100      # per-file entries / errors kept in a transfer() result
+_GLOB_CHARS       = set("*?[")
+
+
+# ── Shared session pool ───────────────────────────────────────────────────────
+
+class _PooledTransport:
+    __slots__ = ("transport", "idle", "in_use", "created_at", "last_used", "borrows")
+
+    def __init__(self, transport):
+        self.transport  = transport
+        self.idle       = []          # [(SFTPClient, returned_at)]
+        self.in_use     = 0
+        self.created_at = time.time()
+        self.last_used  = self.created_at
+        self.borrows    = 0
+
+
+class SFTPSessionPool:
+    """
+    Process-wide pool of authenticated paramiko Transports and the SFTP channels
+    opened on them. lease() hands out an SFTPClient for the duration of a with
+    block and takes it back afterwards; callers never see the Transport.
+    """
+
+    def __init__(self, idle_ttl: float = POOL_IDLE_TTL, keepalive: int = KEEPALIVE_S,
+                 max_channels: int = MAX_CHANNELS):
+        self.idle_ttl     = idle_ttl
+        self.keepalive    = keepalive
+        self.max_channels = max_channels
+        self._lock        = threading.Lock()
+        self._connect_locks: Dict[tuple, threading.Lock] = {}
+        self._transports: Dict[tuple, _PooledTransport] = {}
+        self._host_slots: Dict[tuple, threading.BoundedSemaphore] = {}
+        self._held        = threading.local()   # per-thread lease depth by host, for nested leases
+        self._connects        = 0
+        self._reconnects      = 0
+        self._borrows         = 0
+        self._channel_reuses  = 0
+        self._health_failures = 0
+        self._evicted         = 0
+
+    @staticmethod
+    def make_key(connector) -> tuple:
+        secret = f"{connector.password or ''}\x1f{connector.private_key_path or ''}"
+        return (connector.host, int(connector.port), connector.username,
+                hashlib.sha256(secret.encode()).hexdigest()[:16])
+
+    def worker_cap(self, max_workers: int, leases_per_worker: int = 1) -> int:
+        """Workers that can hold leases_per_worker channels each on one host without queueing on each other."""
+        return max(1, min(int(max_workers), self.max_channels // max(1, leases_per_worker)))
+
+    @contextmanager
+    def lease(self, connector):
+        """
+        Borrow an SFTPClient for connector's endpoint; a channel that raised is
+        discarded, not reused. Waits for a free channel slot on the host (size
+        worker pools with worker_cap()). A lease nested inside another lease on
+        the same host in the same thread — an SFTP→SFTP copy — rides on the outer
+        lease's slot instead of waiting for a second one, so it cannot deadlock.
+        """
+        key    = self.make_key(connector)
+        slots  = self._slots(key)
+        held   = self._held.__dict__.setdefault("depth", {})
+        nested = held.get(key[:2], 0) > 0
+        if not nested:
+            slots.acquire()
+        held[key[:2]] = held.get(key[:2], 0) + 1
+        sftp, ok = None, False
+        try:
+            sftp = self._borrow(key, connector)
+            yield sftp
+            ok = True
+        finally:
+            if sftp is not None:
+                self._release(key, sftp, reusable=ok)
+            held[key[:2]] -= 1
+            if not nested:
+                slots.release()
+
+    def close_all(self):
+        with self._lock:
+            entries = list(self._transports.values())
+            self._evicted += len(entries)
+            self._transports.clear()
+        for entry in entries:
+            _close_transport(entry)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            doomed = self._pop_idle_locked()
+        for entry in doomed:
+            _close_transport(entry)
+        return len(doomed)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            pools = [{
+                "host":          f"{k[0]}:{k[1]}",
+                "username":      k[2],
+                "active":        e.transport.is_active(),
+                "channels_idle": len(e.idle),
+                "channels_in_use": e.in_use,
+                "borrows":       e.borrows,
+                "age_s":         round(now - e.created_at, 1),
+                "idle_s":        round(now - e.last_used, 1),
+            } for k, e in self._transports.items()]
+            return {
+                "transports":      len(self._transports),
+                "connects":        self._connects,
+                "reconnects":      self._reconnects,
+                "borrows":         self._borrows,
+                "channel_reuses":  self._channel_reuses,
+                "health_failures": self._health_failures,
+                "evicted":         self._evicted,
+                "idle_ttl_s":      self.idle_ttl,
+                "keepalive_s":     self.keepalive,
+                "max_channels_per_host": self.max_channels,
+                "pools":           pools,
+            }
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _slots(self, key: tuple) -> threading.BoundedSemaphore:
+        with self._lock:
+            return self._host_slots.setdefault(key[:2], threading.BoundedSemaphore(self.max_channels))
+
+    def _borrow(self, key: tuple, connector) -> "paramiko.SFTPClient":
+        with self._lock:
+            doomed = self._pop_idle_locked()
+            self._borrows += 1
+        for entry in doomed:
+            _close_transport(entry)
+
+        entry = self._transport_for(key, connector)
+        while True:
+            with self._lock:
+                sftp, returned_at = entry.idle.pop() if entry.idle else (None, 0)
+                entry.in_use   += 1
+                entry.borrows  += 1
+                entry.last_used = time.time()
+            if sftp is None:
+                try:
+                    return paramiko.SFTPClient.from_transport(
+                        entry.transport, window_size=WINDOW_SIZE, max_packet_size=MAX_PACKET_SIZE)
+                except Exception:
+                    with self._lock:
+                        entry.in_use -= 1
+                    if entry.transport.is_active():
+                        raise
+                    # Transport died between the health check and the channel open
+                    entry = self._transport_for(key, connector, broken=entry)
+                    continue
+            if _channel_alive(sftp, time.time() - returned_at):
+                with self._lock:
+                    self._channel_reuses += 1
+                return sftp
+            with self._lock:
+                entry.in_use          -= 1
+                self._health_failures += 1
+            _close_quietly(sftp)
+            if not entry.transport.is_active():
+                entry = self._transport_for(key, connector, broken=entry)
+
+    def _transport_for(self, key: tuple, connector, broken: _PooledTransport = None) -> _PooledTransport:
+        """Live pooled transport for key, connecting (once, even under concurrency) if there is none."""
+        with self._lock:
+            conn_lock = self._connect_locks.setdefault(key, threading.Lock())
+        with conn_lock:
+            with self._lock:
+                entry = self._transports.get(key)
+                if entry is not None and (entry is broken or not entry.transport.is_active()):
+                    del self._transports[key]
+                    self._reconnects += 1
+                    if entry is not broken:
+                        self._health_failures += 1
+                    stale, entry = entry, None
+                else:
+                    stale = None
+                if entry is not None:
+                    return entry
+            if stale is not None:
+                logger.warning(f"SFTP pool: transport to {key[0]}:{key[1]} is dead — reconnecting")
+                _close_transport(stale)
+            entry = _PooledTransport(connector.open_transport(keepalive=self.keepalive))
+            with self._lock:
+                self._transports[key] = entry
+                self._connects += 1
+            return entry
+
+    def _release(self, key: tuple, sftp, reusable: bool):
+        with self._lock:
+            entry = self._transports.get(key)
+            owned = entry is not None and sftp.get_channel().get_transport() is entry.transport
+            if owned:
+                entry.in_use   -= 1
+                entry.last_used = time.time()
+            keep = (owned and reusable and self.idle_ttl > 0
+                    and not sftp.get_channel().closed and len(entry.idle) < self.max_channels)
+            if keep:
+                entry.idle.append((sftp, time.time()))
+                return
+            drop = owned and self.idle_ttl <= 0 and entry.in_use == 0
+            if drop:
+                del self._transports[key]
+        _close_quietly(sftp)
+        if drop:
+            _close_transport(entry)
+
+    def _pop_idle_locked(self) -> List[_PooledTransport]:
+        if self.idle_ttl <= 0:
+            return []
+        cutoff = time.time() - self.idle_ttl
+        doomed = [k for k, e in self._transports.items() if e.in_use == 0 and e.last_used < cutoff]
+        self._evicted += len(doomed)
+        return [self._transports.pop(k) for k in doomed]
+
+
+def _channel_alive(sftp, idle_for: float) -> bool:
+    channel = sftp.get_channel()
+    if channel.closed or not channel.get_transport().is_active():
+        return False
+    if idle_for < PING_IDLE_AFTER_S:
+        return True
+    try:
+        sftp.normalize(".")
+        return True
+    except Exception:
+        return False
+
+
+def _close_quietly(sftp):
+    try:
+        sftp.close()
+    except Exception:
+        pass
+
+
+def _close_transport(entry: _PooledTransport):
+    for sftp, _ in entry.idle:
+        _close_quietly(sftp)
+    entry.idle.clear()
+    try:
+        entry.transport.close()
+    except Exception:
+        pass
+
+
+# ── Transfer primitives ───────────────────────────────────────────────────────
+
+def _put(sftp, local_path: str, remote_path: str, callback=None, request_size: int = None):
+    with open(local_path, "rb") as fl:
+        _write_stream(sftp, fl, remote_path, os.path.getsize(local_path), callback, request_size)
+
+
+def _write_stream(sftp, fileobj, remote_path: str, size: int = None, callback=None,
+                  request_size: int = None) -> int:
+    """Pipelined write of everything fileobj yields; the final size is checked against the server's."""
+    done = 0
+    with sftp.open(remote_path, "wb") as fr:
+        fr.set_pipelined(True)
+        if request_size:
+            fr.MAX_REQUEST_SIZE = int(request_size)
+        for block in iter(lambda: fileobj.read(COPY_BLOCK), b""):
+            fr.write(block)
+            done += len(block)
+            if callback: callback(done, size)
+    remote_size = sftp.stat(remote_path).st_size
+    if remote_size != done or (size is not None and done != size):
+        raise IOError(f"size mismatch after upload to {remote_path}: remote {remote_size}, "
+                      f"sent {done}, expected {size}")
+    return done
+
+
+def _get(sftp, remote_path: str, local_path: str, callback=None,
+         max_prefetch: int = None, request_size: int = None):
+    partial = local_path + ".part"
+    done    = 0
+    try:
+        with sftp.open(remote_path, "rb") as fr:
+            size = fr.stat().st_size
+            if request_size:
+                fr.MAX_REQUEST_SIZE = int(request_size)
+            fr.prefetch(size, int(max_prefetch) if max_prefetch else None)
+            with open(partial, "wb") as fl:
+                for block in iter(lambda: fr.read(COPY_BLOCK), b""):
+                    fl.write(block)
+                    done += len(block)
+                    if callback: callback(done, size)
+        if done != size:
+            raise IOError(f"short read of {remote_path}: {done} of {size} bytes")
+        os.replace(partial, local_path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+
+
+def _glob_base(path: str, sep: str) -> str:
+    """Longest leading directory of a glob with no wildcard characters in it."""
+    parts = path.split(sep)
+    for i, part in enumerate(parts):
+        if set(part) & _GLOB_CHARS:
+            return sep.join(parts[:i]) or (sep if path.startswith(sep) else ".")
+    return path
+
+
+# Singleton
+_pool_instance: Optional[SFTPSessionPool] = None
+
+def get_sftp_pool() -> SFTPSessionPool:
+    global _pool_instance
+    if _pool_instance is None:
+        _pool_instance = SFTPSessionPool()
+    return _pool_instance
+
+
+# ── Connector ─────────────────────────────────────────────────────────────────
 
 class SFTPConnector:
-    """MCP connector for SFTP file transfers."""
+    """
+    MCP connector for SFTP file transfers.
+
+    Thread-safety: NOT safe to share. connect() / `with connector:` pins one
+    pooled channel to the instance until disconnect(), so CredentialManager
+    builds a fresh instance for every caller. Instances are cheap — the
+    authenticated transport behind them lives in the SFTPSessionPool.
+    """
+
+    THREAD_SAFE = False
 
     def __init__(
         self,
@@ -40,59 +406,285 @@ class SFTPConnector:
         self.port            = port
         self.timeout         = timeout
         self.credential_name = credential_name
-        self._transport      = None
+        self._lease          = None
         self._sftp           = None
         logger.info(f"SFTPConnector initialized: {username}@{host}:{port} (credential={credential_name})")
 
+    def open_transport(self, keepalive: int = 0) -> "paramiko.Transport":
+        """Fresh authenticated Transport (key exchange + auth). Used by the session pool."""
+        t0 = time.time()
+        transport = paramiko.Transport((self.host, self.port))
+        transport.banner_timeout = transport.auth_timeout = self.timeout
+        try:
+            transport.connect(
+                username=self.username,
+                password=self.password,
+                pkey=paramiko.RSAKey.from_private_key_file(self.private_key_path) if self.private_key_path else None
+            )
+        except Exception:
+            transport.close()
+            raise
+        if keepalive:
+            transport.set_keepalive(keepalive)
+        logger.info(f"SFTP connected to {self.host}:{self.port} as {self.username} in {time.time() - t0:.2f}s")
+        return transport
+
     def connect(self):
-        self._transport = paramiko.Transport((self.host, self.port))
-        self._transport.connect(
-            username=self.username,
-            password=self.password,
-            pkey=paramiko.RSAKey.from_private_key_file(self.private_key_path) if self.private_key_path else None
-        )
-        self._sftp = paramiko.SFTPClient.from_transport(self._transport)
-        logger.info(f"SFTP connected to {self.host}")
+        """Pin a pooled channel to this instance until disconnect()."""
+        if self._sftp is None:
+            self._lease = get_sftp_pool().lease(self)
+            self._sftp  = self._lease.__enter__()
 
     def disconnect(self):
-        if self._sftp:  self._sftp.close()
-        if self._transport: self._transport.close()
+        """Return the pinned channel to the pool (the transport stays open for the next borrower)."""
+        lease, self._lease, self._sftp = self._lease, None, None
+        if lease is not None:
+            lease.__exit__(None, None, None)
+
+    def _with_sftp(self, fn: Callable):
+        """
+        Run fn(sftp) on the pinned channel, or on one leased for this call.
+        If the connection itself dropped mid-call, fn is retried once on a
+        fresh transport — the operations here are all safe to repeat.
+        """
+        for attempt in (1, 2):
+            sftp = self._sftp
+            try:
+                if sftp is not None:
+                    return fn(sftp)
+                with get_sftp_pool().lease(self) as sftp:
+                    return fn(sftp)
+            except (EOFError, OSError, paramiko.SSHException) as e:
+                if attempt == 2 or sftp is None or sftp.get_channel().get_transport().is_active():
+                    raise
+                logger.warning(f"SFTP connection to {self.host} lost ({e!r}) — retrying on a new transport")
+                if self._sftp is not None:
+                    self._discard_pinned()
+                    self.connect()
 
-    def upload(self, local_path: str, remote_path: str) -> str:
-        if not self._sftp: self.connect()
-        self._sftp.put(local_path, remote_path)
+    def _discard_pinned(self):
+        lease, self._lease, self._sftp = self._lease, None, None
+        lease.__exit__(ConnectionError, ConnectionError("connection lost"), None)
+
+    def upload(self, local_path: str, remote_path: str, callback: Callable = None,
+               request_size: int = None) -> str:
+        """Pipelined upload; callback(bytes_so_far, total) as requests are queued."""
+        self._with_sftp(lambda s: _put(s, local_path, remote_path, callback, request_size))
         logger.info(f"SFTP upload: {local_path} → {remote_path}")
         return remote_path
 
-    def download(self, remote_path: str, local_path: str) -> str:
-        if not self._sftp: self.connect()
+    def download(self, remote_path: str, local_path: str, callback: Callable = None,
+                 max_prefetch: int = None, request_size: int = None) -> str:
+        """
+        Prefetched download into "<path>.part", renamed into place when complete.
+        A directory local_path (trailing "/") keeps the remote file name.
+        """
+        if local_path.endswith("/") or os.path.isdir(local_path):
+            local_path = os.path.join(local_path, posixpath.basename(remote_path))
         os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
-        self._sftp.get(remote_path, local_path)
+        self._with_sftp(lambda s: _get(s, remote_path, local_path, callback, max_prefetch, request_size))
         logger.info(f"SFTP download: {remote_path} → {local_path}")
         return local_path
 
+    def transfer(
+        self,
+        direction: str,
+        local_path: str,
+        remote_path: str,
+        pattern: str = None,
+        recursive: bool = True,
+        max_workers: int = 4,
+        max_prefetch: int = None,
+        request_size: int = None,
+        callback: Callable = None,
+    ) -> dict:
+        """
+        Upload ("up") or download ("down") one file, a directory tree, or a glob.
+
+        The source side is local_path for uploads and remote_path for downloads.
+        It may be a file, a directory (walked when recursive) or a glob such as
+        "/outbound/*.csv" or "/data/**/*.gz". pattern additionally filters the
+        relative paths (fnmatch). Directory and glob sources are mirrored under
+        the destination directory. Up to max_workers files move in parallel,
+        each on its own pooled channel (bounded by FLOWFORGE_SFTP_MAX_CHANNELS).
+        callback receives byte increments from the worker threads.
+        """
+        if direction not in ("up", "down"):
+            raise ValueError(f"direction must be 'up' or 'down', got {direction!r}")
+        plan = (self._plan_upload if direction == "up" else self._plan_download)(
+            local_path, remote_path, pattern, recursive)
+        if direction == "up":
+            self._make_remote_dirs({posixpath.dirname(dst) for _, dst, _ in plan})
+
+        def _one(item):
+            src, dst, size = item
+            sent = [0]
+            def _progress(done, total):
+                if callback and done > sent[0]:
+                    callback(done - sent[0])
+                    sent[0] = done
+            t0 = time.time()
+            try:
+                if direction == "up":
+                    self._with_sftp(lambda s: _put(s, src, dst, _progress, request_size))
+                else:
+                    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+                    self._with_sftp(lambda s: _get(s, src, dst, _progress, max_prefetch, request_size))
+            except Exception as e:
+                return {"path": src, "error": str(e)}
+            elapsed = max(time.time() - t0, 1e-6)
+            return {"path": src, "dest": dst, "bytes": size, "duration_s": round(elapsed, 3),
+                    "mb_per_s": round(size / 1_048_576 / elapsed, 2)}
+
+        t0 = time.time()
+        files, errors, total = [], [], 0
+        with ThreadPoolExecutor(max_workers=get_sftp_pool().worker_cap(max_workers)) as pool:
+            for res in pool.map(_one, plan):
+                if "error" in res:
+                    errors.append(res)
+                    continue
+                total += res["bytes"]
+                if len(files) < RESULT_SAMPLE:
+                    files.append(res)
+        elapsed = max(time.time() - t0, 1e-6)
+        logger.info(f"SFTP transfer ({direction}): {len(plan) - len(errors)}/{len(plan)} files, "
+                    f"{total:,} bytes in {elapsed:.2f}s")
+        return {"files": files, "transferred": len(plan) - len(errors), "failed": len(errors),
+                "errors": errors[:RESULT_SAMPLE], "bytes": total, "duration_s": round(elapsed, 3),
+                "mb_per_s": round(total / 1_048_576 / elapsed, 2)}
+
+    @contextmanager
+    def open_stream(self, remote_path: str, max_prefetch: int = None):
+        """
+        (file, size) on a pooled channel held for the with block. Reads are
+        prefetched, so read(n) is served from requests already in flight.
+        """
+        with get_sftp_pool().lease(self) as sftp:
+            with sftp.open(remote_path, "rb") as fr:
+                size = fr.stat().st_size
+                fr.prefetch(size, int(max_prefetch) if max_prefetch else None)
+                yield fr, size
+
+    def upload_stream(self, fileobj, remote_path: str, size: int = None, callback: Callable = None,
+                      request_size: int = None) -> int:
+        """
+        Pipelined upload from a readable stream. Not retried on a dropped
+        connection, because the stream cannot be rewound. Returns bytes written.
+        """
+        with get_sftp_pool().lease(self) as sftp:
+            return _write_stream(sftp, fileobj, remote_path, size, callback, request_size)
+
+    def get_checksums(self, remote_path: str) -> dict:
+        """SFTP servers expose no content checksums — size only (same shape as the S3/Azure connectors)."""
+        return {"size": self._with_sftp(lambda s: s.stat(remote_path)).st_size}
+
+    def make_dirs(self, remote_dir: str):
+        self._make_remote_dirs({remote_dir})
+
+    def list_files(self, remote_path: str, pattern: str = None, recursive: bool = True) -> List[tuple]:
+        """
+        [(path, relative_path, size)] for a remote file, directory or glob.
+        pattern filters relative paths (fnmatch). A single file's relative path
+        is its base name.
+        """
+        if set(remote_path) & _GLOB_CHARS:
+            base    = _glob_base(remote_path, "/")
+            matcher = remote_path[len(base):].lstrip("/")
+            deep    = "/" in matcher
+        else:
+            attr = self._with_sftp(lambda s: s.stat(remote_path))
+            if not stat.S_ISDIR(attr.st_mode):
+                return [(remote_path, posixpath.basename(remote_path), attr.st_size)]
+            base, matcher, deep = remote_path, None, recursive
+        out = []
+        for path, size in self._walk_remote(base, deep):
+            rel = posixpath.relpath(path, base)
+            if matcher and not fnmatch.fnmatch(rel, matcher): continue
+            if pattern and not fnmatch.fnmatch(rel, pattern):  continue
+            out.append((path, rel, size))
+        return out
+
+    def _plan_upload(self, local_path, remote_path, pattern, recursive) -> List[tuple]:
+        """[(local_file, remote_file, size)] for a local file / directory / glob source."""
+        if set(local_path) & _GLOB_CHARS:
+            base  = _glob_base(local_path, os.sep)
+            paths = [p for p in glob.glob(local_path, recursive=True) if os.path.isfile(p)]
+        elif os.path.isdir(local_path):
+            base  = local_path
+            paths = []
+            for root, dirs, names in os.walk(local_path):
+                paths.extend(os.path.join(root, n) for n in names)
+                if not recursive:
+                    break
+        else:
+            dst = posixpath.join(remote_path, os.path.basename(local_path)) \
+                if remote_path.endswith("/") else remote_path
+            return [(local_path, dst, os.path.getsize(local_path))]
+        plan = []
+        for path in sorted(paths):
+            rel = os.path.relpath(path, base).replace(os.sep, "/")
+            if pattern and not fnmatch.fnmatch(rel, pattern):
+                continue
+            plan.append((path, posixpath.join(remote_path, rel), os.path.getsize(path)))
+        return plan
+
+    def _plan_download(self, local_path, remote_path, pattern, recursive) -> List[tuple]:
+        """[(remote_file, local_file, size)] for a remote file / directory / glob source."""
+        files = self.list_files(remote_path, pattern, recursive)
+        if len(files) == 1 and files[0][0] == remote_path:
+            dst = os.path.join(local_path, files[0][1]) \
+                if local_path.endswith("/") or os.path.isdir(local_path) else local_path
+            return [(remote_path, dst, files[0][2])]
+        return [(path, os.path.join(local_path, *rel.split("/")), size) for path, rel, size in files]
+
+    def _walk_remote(self, top: str, recursive: bool):
+        """Yield (path, size) of regular files under top, breadth-first, on one channel."""
+        dirs, out = [top], []
+        while dirs:
+            current = dirs.pop(0)
+            for attr in sorted(self._with_sftp(lambda s: s.listdir_attr(current)), key=lambda a: a.filename):
+                path = posixpath.join(current, attr.filename)
+                if stat.S_ISDIR(attr.st_mode):
+                    if recursive: dirs.append(path)
+                elif stat.S_ISREG(attr.st_mode):
+                    out.append((path, attr.st_size))
+        return out
+
+    def _make_remote_dirs(self, dirs):
+        def _mkdirs(s):
+            made = set()
+            for d in sorted(dirs):
+                parts = [p for p in d.split("/") if p]
+                for i in range(1, len(parts) + 1):
+                    path = ("/" if d.startswith("/") else "") + "/".join(parts[:i])
+                    if path in made: continue
+                    try:
+                        s.stat(path)
+                    except FileNotFoundError:
+                        s.mkdir(path)
+                    made.add(path)
+        self._with_sftp(_mkdirs)
+
     def list_directory(self, remote_path: str = "/") -> List[dict]:
-        if not self._sftp: self.connect()
         items = []
-        for attr in self._sftp.listdir_attr(remote_path):
+        for attr in self._with_sftp(lambda s: s.listdir_attr(remote_path)):
             items.append({
                 "name": attr.filename,
                 "size": attr.st_size,
                 "is_dir": bool(attr.st_mode & 0o40000),
+                "last_modified": str(datetime.fromtimestamp(attr.st_mtime or 0, timezone.utc)),
             })
         return items
 
     def file_exists(self, remote_path: str) -> bool:
-        if not self._sftp: self.connect()
         try:
-            self._sftp.stat(remote_path)
+            self._with_sftp(lambda s: s.stat(remote_path))
             return True
         except FileNotFoundError:
             return False
 
     def delete(self, remote_path: str):
-        if not self._sftp: self.connect()
-        self._sftp.remove(remote_path)
+        self._with_sftp(lambda s: s.remove(remote_path))
 
     def assert_file_exists(self, remote_path: str):
         if not self.file_exists(remote_path):
@@ -100,7 +692,6 @@ class SFTPConnector:
 
     def health_check(self) -> dict:
         try:
-            self.connect()
             self.list_directory("/")
             return {"status": "ok"}
         except Exception as e:
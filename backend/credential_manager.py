@@ -7,14 +7,31 @@ Fixes from v1:
 - Explicit updated_at assignment (SQLite onupdate doesn't auto-trigger)
 - Added rotate() method to re-encrypt with new key
 - Added list_by_type() helper
+
+Connector instances for thread-safe connector types (see THREAD_SAFE on each
+connector class) are cached per (credential_id, updated_at) in ConnectorCache, so
+a workflow with twenty S3 nodes decrypts the secret and builds the boto3 client
+once. Any change to a credential bumps updated_at, which makes the old entry
+unreachable; update()/delete() also evict and close it immediately.
+
+The AES key is derived lazily, once per process, on first encrypt/decrypt —
+or read from FLOWFORGE_KEY_FILE (written by `python credential_manager.py
+write-key-file PATH`) to skip PBKDF2 entirely. Decrypted field dicts are held
+for FLOWFORGE_SECRET_CACHE_TTL seconds keyed by ciphertext hash and wiped on
+eviction. crypto_stats() reports derivation and decrypt cost.
 """
 
 import os
+import sys
 import json
 import base64
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +39,9 @@ logger = logging.getLogger(__name__)
 
 MASTER_KEY = os.getenv("FLOWFORGE_SECRET_KEY", "change-this-in-production-32chars!")
 SALT       = os.getenv("FLOWFORGE_SALT", "flowforge-salt-2025").encode()
+KEY_FILE   = os.getenv("FLOWFORGE_KEY_FILE", "")                                  # precomputed derived key (base64)
+SECRET_CACHE_TTL = float(os.getenv("FLOWFORGE_SECRET_CACHE_TTL", "30"))           # seconds; 0 disables
+SECRET_CACHE_MAX = 256
 
 try:
     from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -40,33 +60,304 @@ def _derive_key(master: str) -> bytes:
     return kdf.derive(master.encode())
 
 
-_AES_KEY = _derive_key(MASTER_KEY)
+_key_lock   = threading.Lock()
+_AES_KEY: Optional[bytes] = None
+_aesgcm     = None
+_stats_lock = threading.Lock()
+_stats      = {"key_source": None, "key_ms": None, "decrypts": 0, "decrypt_ms": 0.0,
+               "cache_hits": 0, "cache_evictions": 0}
+
+
+def _read_key_file(path: str) -> Optional[bytes]:
+    try:
+        if os.stat(path).st_mode & 0o077:
+            logger.warning(f"Key file {path} is readable by group/others — chmod 600 it")
+        with open(path) as f:
+            key = base64.b64decode(f.read().strip())
+    except (OSError, ValueError) as e:
+        logger.warning(f"Key file {path} unusable ({e}) — deriving key from FLOWFORGE_SECRET_KEY")
+        return None
+    if len(key) != 32:
+        logger.warning(f"Key file {path} holds {len(key)} bytes, expected 32 — deriving instead")
+        return None
+    return key
+
+
+def _aes_key() -> bytes:
+    """The process-wide AES key — derived (or loaded) on first use, then reused."""
+    global _AES_KEY, _aesgcm
+    if _AES_KEY is not None:
+        return _AES_KEY
+    with _key_lock:
+        if _AES_KEY is None:
+            t0  = time.perf_counter()
+            key = _read_key_file(KEY_FILE) if KEY_FILE else None
+            source = "key_file" if key else ("pbkdf2" if CRYPTO_AVAILABLE else "fallback")
+            if key is None:
+                key = _derive_key(MASTER_KEY)
+            _aesgcm  = AESGCM(key) if CRYPTO_AVAILABLE else None
+            _AES_KEY = key
+            ms = round((time.perf_counter() - t0) * 1000, 1)
+            with _stats_lock:
+                _stats["key_source"], _stats["key_ms"] = source, ms
+            logger.info(f"Credential key ready via {source} in {ms}ms")
+    return _AES_KEY
+
+
+def warm_key():
+    """Derive the key now (e.g. in a background thread at startup) instead of on first use."""
+    _aes_key()
+
+
+def write_key_file(path: str):
+    """Write the derived key for the current FLOWFORGE_SECRET_KEY/SALT to path (mode 600)."""
+    key = _derive_key(MASTER_KEY)
+    fd  = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(base64.b64encode(key).decode() + "\n")
+
+
+# ── Decrypted-secret cache ────────────────────────────────────────────────────
+
+def _wipe(fields: dict):
+    """Drop every reference to the plaintext values (Python str objects cannot be overwritten in place)."""
+    for k in list(fields):
+        fields[k] = None
+    fields.clear()
+
+
+class _SecretCache:
+    """Short-TTL LRU of decrypted field dicts, keyed by sha256 of the ciphertext."""
+
+    def __init__(self, ttl: float = SECRET_CACHE_TTL, max_entries: int = SECRET_CACHE_MAX):
+        self.ttl         = ttl
+        self.max_entries = max_entries
+        self._lock       = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()   # digest → (expires_at, fields)
+
+    def get(self, digest: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                self._evict(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return dict(entry[1])
+
+    def put(self, digest: str, fields: dict):
+        with self._lock:
+            if digest in self._entries:
+                self._evict(digest)
+            self._entries[digest] = (time.time() + self.ttl, dict(fields))
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            for digest in list(self._entries):
+                self._evict(digest)
+
+    def _evict(self, digest: str):
+        _, fields = self._entries.pop(digest)
+        _wipe(fields)
+        with _stats_lock:
+            _stats["cache_evictions"] += 1
+
+
+_secret_cache = _SecretCache()
+
+
+def crypto_stats() -> dict:
+    """Key derivation + decrypt cost for this process (startup timing report / health)."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["decrypt_ms"]     = round(out["decrypt_ms"], 2)
+    out["avg_decrypt_ms"] = round(out["decrypt_ms"] / out["decrypts"], 3) if out["decrypts"] else None
+    out["cached_secrets"] = len(_secret_cache._entries)
+    return out
 
 
 def encrypt_fields(data: dict) -> str:
     """Encrypt dict → base64 ciphertext (AES-256-GCM)."""
     plaintext = json.dumps(data, ensure_ascii=False).encode()
+    key = _aes_key()
     if CRYPTO_AVAILABLE:
         nonce      = os.urandom(12)
-        ciphertext = AESGCM(_AES_KEY).encrypt(nonce, plaintext, None)
+        ciphertext = _aesgcm.encrypt(nonce, plaintext, None)
         return base64.b64encode(nonce + ciphertext).decode()
     else:
         # XOR fallback — NOT secure, dev only
-        key    = _AES_KEY * (len(plaintext) // 32 + 1)
+        key    = key * (len(plaintext) // 32 + 1)
         xored  = bytes(b ^ k for b, k in zip(plaintext, key))
         return base64.b64encode(xored).decode()
 
 
 def decrypt_fields(encrypted: str) -> dict:
-    """Decrypt base64 ciphertext → dict."""
+    """
+    Decrypt base64 ciphertext → dict. Results are cached for SECRET_CACHE_TTL
+    seconds; every caller gets its own copy of the dict.
+    """
+    digest = hashlib.sha256(encrypted.encode()).hexdigest() if SECRET_CACHE_TTL > 0 else None
+    if digest:
+        hit = _secret_cache.get(digest)
+        if hit is not None:
+            with _stats_lock:
+                _stats["cache_hits"] += 1
+            return hit
+
+    key = _aes_key()
+    t0  = time.perf_counter()
     raw = base64.b64decode(encrypted.encode())
     if CRYPTO_AVAILABLE:
         nonce, ciphertext = raw[:12], raw[12:]
-        plaintext = AESGCM(_AES_KEY).decrypt(nonce, ciphertext, None)
+        plaintext = bytearray(_aesgcm.decrypt(nonce, ciphertext, None))
     else:
-        key       = _AES_KEY * (len(raw) // 32 + 1)
-        plaintext = bytes(b ^ k for b, k in zip(raw, key))
-    return json.loads(plaintext.decode())
+        key       = key * (len(raw) // 32 + 1)
+        plaintext = bytearray(b ^ k for b, k in zip(raw, key))
+    try:
+        fields = json.loads(plaintext.decode())
+    finally:
+        plaintext[:] = bytes(len(plaintext))     # zero the plaintext buffer
+    with _stats_lock:
+        _stats["decrypts"]   += 1
+        _stats["decrypt_ms"] += (time.perf_counter() - t0) * 1000
+
+    if digest:
+        _secret_cache.put(digest, fields)
+    return fields
+
+
+def _invalidate_result_caches(owner_id: str, credential_name: str):
+    """Drop cached query results served under a credential that changed or was removed."""
+    from sql_cache import get_query_cache, get_schema_cache
+    get_query_cache().invalidate(owner_id=owner_id, credential=credential_name)
+    get_schema_cache().invalidate(owner_id=owner_id, credential=credential_name)
+
+
+# ── Connector cache ───────────────────────────────────────────────────────────
+
+CONNECTOR_CACHE_TTL = float(os.getenv("FLOWFORGE_CONNECTOR_CACHE_TTL", "600"))   # idle seconds; 0 disables
+
+
+def _close_connector(connector):
+    """Per-type lifecycle hook: each shareable connector implements close()."""
+    try:
+        close = getattr(connector, "close", None)
+        if close:
+            close()
+    except Exception as e:
+        logger.warning(f"Connector cache: close() failed for {type(connector).__name__}: {e}")
+
+
+class ConnectorCache:
+    """
+    Process-wide cache of built connectors keyed by (credential_id, updated_at).
+    Only classes with THREAD_SAFE = True are stored — the same instance is handed
+    to concurrent nodes. Entries idle longer than ttl, and superseded or
+    invalidated credential versions, are only dropped: a node that checked the
+    connector out earlier may still be using it (a long transfer, a credential
+    edited mid-run), so it is left to close when garbage collected. Only
+    close_all() at shutdown closes connectors eagerly.
+    """
+
+    def __init__(self, ttl: float = CONNECTOR_CACHE_TTL):
+        self.ttl     = ttl
+        self._lock   = threading.Lock()
+        self._build_locks: dict = {}
+        self._entries: dict = {}    # (cred_id, updated_at) → [connector, service_type, last_used]
+        self._unshareable: set = set()   # service types whose connector class is not THREAD_SAFE
+        self._hits   = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(cred) -> tuple:
+        return (cred.id, cred.updated_at.isoformat() if cred.updated_at else "")
+
+    def get_or_build(self, cred, build: Callable):
+        if self.ttl <= 0 or cred.service_type in self._unshareable:
+            return build(cred)
+        key = self.make_key(cred)
+        self._evict_idle()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry[2] = time.time()
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        # One build per credential version at a time — concurrent callers reuse it
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry:
+                    entry[2] = time.time()
+                    return entry[0]
+            connector = build(cred)
+            if not getattr(connector, "THREAD_SAFE", False):
+                with self._lock:
+                    self._unshareable.add(cred.service_type)
+                    self._build_locks.pop(key, None)
+                return connector
+            with self._lock:
+                for k in [k for k in self._entries if k[0] == cred.id and k != key]:
+                    del self._entries[k]          # superseded version — may still be in use, not closed
+                self._entries[key] = [connector, cred.service_type, time.time()]
+                self._build_locks.pop(key, None)
+        return connector
+
+    def invalidate(self, cred_id: str = None) -> int:
+        """Drop every cached version of cred_id (all entries when None). Not closed — see the class docstring."""
+        with self._lock:
+            keys = [k for k in self._entries if cred_id is None or k[0] == cred_id]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def close_all(self):
+        """Shutdown: drop and close everything — no node is running any more."""
+        with self._lock:
+            doomed = [e[0] for e in self._entries.values()]
+            self._entries.clear()
+        for c in doomed:
+            _close_connector(c)
+
+    def _evict_idle(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if e[2] < cutoff]
+            for k in keys:
+                del self._entries[k]              # idle since checkout, not necessarily unused — not closed
+            self._evictions += len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            by_type: Dict[str, int] = {}
+            for _, stype, _ in self._entries.values():
+                by_type[stype] = by_type.get(stype, 0) + 1
+            return {
+                "entries":   len(self._entries),
+                "by_type":   by_type,
+                "idle_ttl_s": self.ttl,
+                "hits":      self._hits,
+                "misses":    self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else None,
+                "idle_evictions": self._evictions,
+            }
+
+
+_connector_cache_instance: Optional[ConnectorCache] = None
+
+def get_connector_cache() -> ConnectorCache:
+    global _connector_cache_instance
+    if _connector_cache_instance is None:
+        _connector_cache_instance = ConnectorCache()
+    return _connector_cache_instance
 
 
 # ── Manager ───────────────────────────────────────────────────────────────────
@@ -173,6 +464,8 @@ class CredentialManager:
             cred.description = description
         cred.updated_at = datetime.utcnow()  # ← FIX: explicit (SQLite onupdate doesn't auto-trigger)
         self._db.commit()
+        _invalidate_result_caches(owner_id, cred.name)
+        get_connector_cache().invalidate(cred_id)
         logger.info(f"Updated credential {cred_id}")
 
     def delete(self, cred_id: str, owner_id: str):
@@ -186,6 +479,8 @@ class CredentialManager:
             raise KeyError(f"Credential '{cred_id}' not found for owner {owner_id}")
         self._db.delete(cred)
         self._db.commit()
+        _invalidate_result_caches(owner_id, cred.name)
+        get_connector_cache().invalidate(cred_id)
         logger.info(f"Deleted credential {cred_id}")
 
     def rotate_encryption(self, cred_id: str, owner_id: str):
@@ -198,13 +493,15 @@ class CredentialManager:
         cred.encrypted_data = encrypt_fields(fields)
         cred.updated_at     = datetime.utcnow()
         self._db.commit()
+        get_connector_cache().invalidate(cred_id)
 
     # ── Connector factory ─────────────────────────────────────────────────────
 
     def build_connector(self, credential_name: str, owner_id: str):
         """
         Build + return correct MCP connector by credential name.
-        Connector is instantiated with decrypted fields.
+        Connector is instantiated with decrypted fields — or reused from the
+        ConnectorCache for thread-safe connector types.
         """
         from database import Credential
         cred = (
@@ -214,7 +511,7 @@ class CredentialManager:
         )
         if not cred:
             raise KeyError(f"Credential '{credential_name}' not found for owner {owner_id}")
-        return self._instantiate(cred)
+        return get_connector_cache().get_or_build(cred, self._instantiate)
 
     def build_connector_by_id(self, cred_id: str) -> object:
         """
@@ -225,7 +522,7 @@ class CredentialManager:
         cred = self._db.query(Credential).filter_by(id=cred_id).first()
         if not cred:
             raise KeyError(f"Credential '{cred_id}' not found")
-        return self._instantiate(cred)
+        return get_connector_cache().get_or_build(cred, self._instantiate)
 
     def _instantiate(self, cred) -> object:
         """Internal: decrypt fields and build the correct connector."""
@@ -249,14 +546,17 @@ class CredentialManager:
                 username=fields.get("username"),
                 password=fields.get("password"),
                 credential_name=cred.name,
+                cache_ttl=float(fields.get("cache_ttl", 0) or 0),
             )
         elif stype == "http":
-            from connectors.http_mcp import HTTPConnector
+            from connectors.http_mcp import HTTPConnector, POOL_CONNECTIONS, POOL_MAXSIZE
             return HTTPConnector(
                 base_url=fields.get("base_url", ""),
                 bearer_token=fields.get("bearer_token"),
                 api_key=fields.get("api_key"),
                 credential_name=cred.name,
+                pool_connections=int(fields.get("pool_connections") or POOL_CONNECTIONS),
+                pool_maxsize=int(fields.get("pool_maxsize") or POOL_MAXSIZE),
             )
         elif stype == "s3":
             from connectors.s3_mcp import S3Connector
@@ -264,6 +564,7 @@ class CredentialManager:
                 access_key_id=fields.get("access_key_id"),
                 secret_access_key=fields.get("secret_access_key"),
                 region=fields.get("region", "us-east-1"),
+                endpoint_url=fields.get("endpoint_url") or None,
                 credential_name=cred.name,
             )
         elif stype == "azure":
@@ -285,3 +586,13 @@ class CredentialManager:
             )
         else:
             raise ValueError(f"Unknown service type: {stype!r}. Expected: airflow|mssql|http|s3|azure|sftp")
+
+
+if __name__ == "__main__":
+    # python credential_manager.py write-key-file /etc/flowforge/aes.key
+    if len(sys.argv) == 3 and sys.argv[1] == "write-key-file":
+        write_key_file(sys.argv[2])
+        print(f"Wrote derived key to {sys.argv[2]} — set FLOWFORGE_KEY_FILE={sys.argv[2]}")
+    else:
+        print("usage: python credential_manager.py write-key-file PATH")
+        sys.exit(2)
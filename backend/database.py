@@ -179,7 +179,7 @@ class WorkflowRun(Base):
     workflow_id      = Column(String(36), ForeignKey("workflows.id", ondelete="SET NULL"), nullable=True)
     triggered_by     = Column(String(50), default="manual")    # manual|scheduled|webhook|api
     trigger_data     = Column(JSON, default=dict)              # webhook payload, schedule info
-    status           = Column(String(20), default="pending")   # pending|running|success|failed|cancelled
+    status           = Column(String(20), default="pending")   # pending|running|waiting|success|failed|cancelled
     started_at       = Column(DateTime, nullable=True)
     completed_at     = Column(DateTime, nullable=True)
     duration_seconds = Column(Float, nullable=True)
@@ -206,7 +206,7 @@ class NodeRun(Base):
     node_id          = Column(String(100), nullable=False)
     node_type        = Column(String(50), nullable=False)
     node_title       = Column(String(255), nullable=False)
-    status           = Column(String(20), default="pending")   # pending|running|success|failed|skipped
+    status           = Column(String(20), default="pending")   # pending|running|waiting|success|failed|skipped
     attempt          = Column(Integer, default=1)              # retry attempt number
     started_at       = Column(DateTime, nullable=True)
     completed_at     = Column(DateTime, nullable=True)
@@ -249,6 +249,39 @@ class WorkflowVariable(Base):
         self.updated_at = _now()
 
 
+class RunWait(Base):
+    """
+    A run parked on a sensor node. The engine stores what it needs to pick the
+    run up again (node outputs, finished nodes); the sensor service polls due
+    rows in batches and resumes the run from node_id once the condition holds
+    or timeout_at passes.
+    """
+    __tablename__ = "run_waits"
+
+    id              = Column(String(36), primary_key=True, default=_gen_id)
+    workflow_run_id = Column(String(36), ForeignKey("workflow_runs.id", ondelete="CASCADE"), nullable=False)
+    workflow_id     = Column(String(36), nullable=True)
+    owner_id        = Column(String(36), nullable=False)
+    node_id         = Column(String(100), nullable=False)
+    kind            = Column(String(20), nullable=False)          # s3_key|sftp_file|sql|http|airflow|timer
+    spec            = Column(JSON, default=dict)                  # what to check (resolved node props)
+    state           = Column(JSON, default=dict)                  # engine state to resume from
+    status          = Column(String(20), default="waiting")       # waiting|resuming|done|cancelled
+    next_check_at   = Column(DateTime, nullable=False)
+    timeout_at      = Column(DateTime, nullable=True)
+    poke_interval   = Column(Float, default=60)
+    checks          = Column(Integer, default=0)
+    last_error      = Column(Text, nullable=True)
+    result          = Column(JSON, nullable=True)                 # handed to the node on resume
+    claimed_at      = Column(DateTime, nullable=True)             # lease start while status is "resuming"
+    created_at      = Column(DateTime, default=_now, nullable=False)
+
+    __table_args__ = (
+        Index("ix_run_wait_due", "status", "next_check_at"),
+        Index("ix_run_wait_run", "workflow_run_id"),
+    )
+
+
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
 
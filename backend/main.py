@@ -10,6 +10,7 @@ Fixes from v1:
 - Added webhook trigger router
 """
 
+import asyncio
 import os
 import logging
 import time
@@ -37,10 +38,14 @@ logger = logging.getLogger("flowforge")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup + shutdown lifecycle."""
+    timings = {}
+    t0 = time.perf_counter()
     from database import engine, Base, SessionLocal, seed_default_user
     logger.info("Creating database tables…")
     Base.metadata.create_all(bind=engine)
+    timings["db_schema_ms"] = round((time.perf_counter() - t0) * 1000, 1)
 
+    t1 = time.perf_counter()
     db = SessionLocal()
     try:
         seed_default_user(db)
@@ -48,18 +53,46 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Seed user failed (may already exist): {e}")
     finally:
         db.close()
+    timings["seed_ms"] = round((time.perf_counter() - t1) * 1000, 1)
 
     # Start cron scheduler
+    t1 = time.perf_counter()
     from scheduler import get_scheduler
     scheduler = get_scheduler()
     await scheduler.start()
     app.state.scheduler = scheduler
+    timings["scheduler_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+
+    # Sensor service resumes runs parked on sensor nodes
+    from sensor_service import get_sensor_service
+    await get_sensor_service().start()
+
+    # Credential key derivation is lazy — warm it off the event loop so startup
+    # doesn't wait for PBKDF2 and the first credential lookup doesn't either
+    from credential_manager import warm_key, crypto_stats
+    asyncio.get_running_loop().run_in_executor(None, warm_key)
+
+    timings["total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    app.state.startup_timings = timings
+    logger.info(
+        f"Startup timing: db {timings['db_schema_ms']}ms, seed {timings['seed_ms']}ms, "
+        f"scheduler {timings['scheduler_ms']}ms, total {timings['total_ms']}ms "
+        f"(credential key: {crypto_stats()['key_source'] or 'deriving in background'})"
+    )
     logger.info("FlowForge API started ✓")
 
     yield
 
     # Shutdown
     await scheduler.stop()
+    await get_sensor_service().stop()
+    from connectors.http_mcp import get_session_registry, get_async_client_registry
+    from connectors.sftp_mcp import get_sftp_pool
+    from credential_manager import get_connector_cache
+    get_connector_cache().close_all()
+    get_session_registry().close_all()
+    get_sftp_pool().close_all()
+    await get_async_client_registry().aclose_all()
     logger.info("FlowForge API shutting down")
 
 
@@ -127,7 +160,7 @@ async def rate_limit(request: Request, call_next):
 
 # ── Routers ───────────────────────────────────────────────────────────────────
 
-from routers import chat, workflows, executions, credentials, pytest_export, webhooks, variables, metrics, templates
+from routers import chat, workflows, executions, credentials, pytest_export, webhooks, variables, metrics, templates, cache
 from auth import router as auth_router
 
 app.include_router(auth_router,           prefix="/api/auth",        tags=["Auth"])
@@ -140,6 +173,7 @@ app.include_router(webhooks.router,       prefix="/api/webhooks",    tags=["Webh
 app.include_router(variables.router,      prefix="/api/variables",   tags=["Variables"])
 app.include_router(metrics.router,        prefix="/api/metrics",     tags=["Metrics"])
 app.include_router(templates.router,      prefix="/api/templates",   tags=["Templates"])
+app.include_router(cache.router,          prefix="/api/cache",       tags=["Cache"])
 
 
 # ── Health check ──────────────────────────────────────────────────────────────
@@ -157,6 +191,9 @@ async def health(request: Request):
     scheduler = getattr(request.app.state, "scheduler", None)
     scheduled = scheduler.get_scheduled_workflows() if scheduler else []
 
+    from credential_manager import crypto_stats
+    from sensor_service import get_sensor_service
+
     return {
         "status":     "ok" if db_status == "ok" else "degraded",
         "database":   db_status,
@@ -164,6 +201,8 @@ async def health(request: Request):
         "dev_mode":   os.getenv("FLOWFORGE_DEV_MODE", "true"),
         "scheduled_workflows": len(scheduled),
         "scheduler":  [s for s in scheduled],
+        "sensors":    get_sensor_service().stats(),
+        "startup":    {**getattr(request.app.state, "startup_timings", {}), "credentials": crypto_stats()},
     }
 
 
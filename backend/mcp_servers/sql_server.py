@@ -86,6 +86,17 @@ TOOLS = [
             "required": ["table_name"],
         },
     },
+    {
+        "name": "sql_describe_schema",
+        "description": "Get columns, types, primary keys and row-count estimates for all tables in one call.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "schema": {"type": "string", "description": "Optional: only tables in this schema"},
+            },
+            "required": [],
+        },
+    },
     {
         "name": "sql_execute_scalar",
         "description": "Execute a query and return a single scalar value (e.g. COUNT, MAX, SUM).",
@@ -155,6 +166,10 @@ def execute_tool(name: str, args: dict) -> dict:
             cols = connector.describe_table(args["table_name"])
             return {"table": args["table_name"], "columns": cols}
 
+        elif name == "sql_describe_schema":
+            tables = connector.describe_schema(args.get("schema"))
+            return {"tables": tables, "count": len(tables)}
+
         elif name == "sql_execute_scalar":
             value = connector.execute_scalar(args["query"])
             return {"value": value, "query": args["query"]}
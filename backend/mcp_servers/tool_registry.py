@@ -253,6 +253,22 @@ TOOL_DEFINITIONS = [
             "required": ["credential", "table_name"],
         },
     },
+    {
+        "name": "sql_describe_schema",
+        "description": (
+            "Get columns, types, primary keys and row-count estimates for ALL tables in one call. "
+            "Prefer this over calling sql_describe_table repeatedly when exploring a database."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "credential": {"type": "string"},
+                "schema":     {"type": "string", "description": "Optional: only tables in this schema (e.g. dbo)"},
+                "refresh":    {"type": "boolean", "default": False, "description": "Bypass the cached schema"},
+            },
+            "required": ["credential"],
+        },
+    },
 
     # ── HTTP ──────────────────────────────────────────────────────────────────
     {
@@ -317,9 +333,10 @@ TOOL_DEFINITIONS = [
         "input_schema": {
             "type": "object",
             "properties": {
-                "credential": {"type": "string"},
-                "container":  {"type": "string"},
-                "prefix":     {"type": "string", "default": ""},
+                "credential":  {"type": "string"},
+                "container":   {"type": "string"},
+                "prefix":      {"type": "string", "default": ""},
+                "max_results": {"type": "integer", "default": 50},
             },
             "required": ["credential", "container"],
         },
@@ -827,12 +844,11 @@ def execute_tool(
 
         # ── SQL tools ─────────────────────────────────────────────────────────
         elif name == "sql_execute_query":
+            from sql_cache import cached_query
             c     = _build("mssql", cred)
             max_r = int(args.get("max_rows", 100))
-            c.connect()
             try:
-                rows = c.execute_query(args["query"])
-                cols = c.last_column_names
+                rows, cols, hit = cached_query(c, args["query"], owner_id=owner_id or "")
                 row_dicts = [
                     dict(zip([str(col) for col in cols],
                              [str(v) if v is not None else None for v in row]))
@@ -843,6 +859,7 @@ def execute_tool(
                     "rows":          row_dicts,
                     "rows_returned": len(rows),
                     "truncated":     len(rows) > max_r,
+                    "cache_hit":     hit,
                 }
             finally:
                 c.disconnect()
@@ -870,14 +887,31 @@ def execute_tool(
                 c.disconnect()
 
         elif name == "sql_describe_table":
+            from sql_cache import get_schema_cache
             c = _build("mssql", cred)
-            c.connect()
             try:
+                # Served from the per-credential schema cache (one batched fetch per TTL)
+                table = get_schema_cache().lookup_table(c, args["table_name"], owner_id or "")
+                if table:
+                    return {"table": args["table_name"], "columns": table["columns"],
+                            "primary_key": table["primary_key"], "row_count": table["row_count"]}
                 cols = c.describe_table(args["table_name"])
                 return {"table": args["table_name"], "columns": cols}
             finally:
                 c.disconnect()
 
+        elif name == "sql_describe_schema":
+            from sql_cache import get_schema_cache
+            c      = _build("mssql", cred)
+            schema = args.get("schema")
+            try:
+                tables = get_schema_cache().get_schema(c, owner_id or "", refresh=bool(args.get("refresh")))
+                if schema:
+                    tables = {k: v for k, v in tables.items() if v["schema"].lower() == schema.lower()}
+                return {"tables": tables, "count": len(tables)}
+            finally:
+                c.disconnect()
+
         # ── HTTP tools ────────────────────────────────────────────────────────
         elif name == "http_get":
             c    = _build("http", cred)
@@ -910,7 +944,8 @@ def execute_tool(
         # ── Azure tools ───────────────────────────────────────────────────────
         elif name == "azure_list_blobs":
             c     = _build("azure", cred)
-            blobs = c.list_blobs(args["container"], args.get("prefix", ""))
+            blobs = c.list_blobs(args["container"], args.get("prefix", ""),
+                                 max_results=int(args.get("max_results", 50)))
             return {"container": args["container"], "blobs": blobs, "count": len(blobs)}
 
         elif name == "azure_blob_exists":
@@ -0,0 +1,96 @@
+"""
+FlowForge — Cache Router
+
+  GET    /api/cache/sql/stats        — SQL result cache size, hit ratio, bytes saved
+  POST   /api/cache/sql/invalidate   — drop cached results by table tag and/or credential
+  DELETE /api/cache/sql              — drop all of the current user's cached results
+
+  GET    /api/cache/schema/{credential}          — cached describe_schema() (fetched on miss)
+  POST   /api/cache/schema/{credential}/refresh  — re-introspect now, replacing the cached copy
+"""
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from auth import get_current_user
+from database import get_db
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class InvalidateRequest(BaseModel):
+    tags:       List[str]     = []     # table names, e.g. ["orders", "dbo.customers"]
+    credential: Optional[str] = None   # restrict to one credential name
+
+
+@router.get("/sql/stats")
+async def sql_cache_stats(current_user: dict = Depends(get_current_user)):
+    from sql_cache import get_query_cache
+    return get_query_cache().stats()
+
+
+@router.post("/sql/invalidate")
+async def invalidate_sql_cache(
+    body:         InvalidateRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    from sql_cache import get_query_cache
+    removed = get_query_cache().invalidate(
+        tags=body.tags, owner_id=current_user["sub"], credential=body.credential,
+    )
+    return {"invalidated": removed, "tags": body.tags, "credential": body.credential}
+
+
+@router.delete("/sql")
+async def clear_sql_cache(current_user: dict = Depends(get_current_user)):
+    from sql_cache import get_query_cache
+    removed = get_query_cache().invalidate(owner_id=current_user["sub"])
+    return {"invalidated": removed}
+
+
+# ── Schema cache ──────────────────────────────────────────────────────────────
+
+def _load_schema(credential: str, db: Session, owner_id: str, refresh: bool) -> dict:
+    from credential_manager import CredentialManager
+    from sql_cache import get_schema_cache
+    mgr = CredentialManager(db)
+    try:
+        connector = mgr.build_connector(credential, owner_id)
+    except KeyError as e:
+        raise HTTPException(404, str(e))
+    if not hasattr(connector, "describe_schema"):
+        raise HTTPException(400, f"Credential {credential!r} is not an mssql credential")
+    try:
+        tables = get_schema_cache().get_schema(connector, owner_id, refresh=refresh)
+    finally:
+        connector.disconnect()
+    return {
+        "credential": credential.upper(),
+        "cache":      get_schema_cache().info(owner_id, credential),
+        "tables":     tables,
+    }
+
+
+@router.get("/schema/{credential}")
+def get_cached_schema(
+    credential:   str,
+    db:           Session = Depends(get_db),
+    current_user: dict    = Depends(get_current_user),
+):
+    return _load_schema(credential, db, current_user["sub"], refresh=False)
+
+
+@router.post("/schema/{credential}/refresh")
+def refresh_schema(
+    credential:   str,
+    db:           Session = Depends(get_db),
+    current_user: dict    = Depends(get_current_user),
+):
+    result = _load_schema(credential, db, current_user["sub"], refresh=True)
+    return {"refreshed": True, "credential": result["credential"],
+            "cache": result["cache"], "table_count": len(result["tables"])}
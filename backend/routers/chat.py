@@ -77,17 +77,87 @@ VALID NODE TYPES AND PROPS:
   sql          → query (full SQL), credential
                  optional: extract_column, output_as, assert_greater_than,
                    assert_less_than, expected_row_count, min_row_count
+                 cache_ttl (seconds, caches identical SELECT results), cache_tags,
+                 return_rows (bool: full result as "rows", raw values, for bulk_insert)
+                 operation "bulk_insert": table, credential, source_node (upstream title)
+                   + source_field (required, e.g. "rows"; rows_sample is a truncated preview
+                   and is rejected) OR source_file (.csv/.json/.jsonl), columns, chunk_size (default 1000)
   http         → method, url, expected_status (int), headers (JSON), body (JSON)
-  s3           → bucket, key, operation ("list"|"exists"|"upload"|"download"|"delete"), credential
+                 optional: transport ("sync"|"async"), stream (bool) + max_bytes,
+                   preview_bytes, spill_to_file (bool or path) for large bodies
+                   paginate: {"style": "page"|"offset"|"link"|"cursor", "max_pages": 100,
+                     "concurrency": 4, "page_size": 100, "items_path": "data"} — merges every
+                     page into output_file (JSONL); output has pages, total_items, items (sample)
+                   hedge (true = after the URL's p95 latency, or seconds; GET/HEAD only),
+                   deadline (seconds, caps total time across retries and hedges)
+                   conditional (bool, GET: ETag/Last-Modified revalidation — 304 replays the
+                     cached body; output cache_status "hit"|"miss"|"bypass")
+  s3           → bucket, key, operation ("list"|"exists"|"upload"|"download"|"delete"|
+                   "delete_prefix"|"copy_prefix"|"exists_many"|"sync"), credential
+                 delete_prefix / copy_prefix: key is the prefix; dry_run, max_concurrency,
+                   dest_bucket + dest_prefix (copy), suffix/pattern/modified_since filters
+                 exists_many: keys (list or comma/newline separated), strategy ("auto"|"head"|"list")
+                 sync: key is the prefix, local_path a directory, direction ("up"|"down"),
+                   compare ("auto"|"checksum"|"size"), delete (bool), dry_run, max_concurrency
+                 upload/download optional: local_path, multipart_threshold, part_size (e.g. "64MB"),
+                   max_concurrency, max_bandwidth; output has bytes, duration_s, mb_per_s
+                 list optional: max_results, start_after, delimiter ("/"), suffix, pattern (regex),
+                   modified_since (ISO date or "24h"/"7d"), aggregate (bool: exact count + bytes)
   azure        → container, blob_name, operation, credential
+                 upload/download optional: local_path, max_concurrency (default 4), block_size
+                   and max_single_put_size (upload), chunk_size (download); output has bytes,
+                   duration_s, mb_per_s
+                 list optional: prefix, max_results, results_per_page (1-5000), suffix, pattern (regex),
+                   modified_since (ISO date or "24h"/"7d"), count_only (bool: count + bytes, no blob list)
   sftp         → remote_path, operation, credential
-  wait         → duration (int), unit ("seconds"|"minutes"|"hours")
+                 upload/download: local_path; either side may be a file, a directory (mirrored,
+                   recursive (bool, default true)) or a glob ("/out/*.csv", "/data/**/*.gz");
+                   optional pattern (fnmatch on relative paths), max_concurrency (parallel files,
+                   default 4), max_prefetch, request_size (e.g. "128KB"), allow_failures;
+                   output has count, bytes, duration_s, mb_per_s and per-file stats in files
+  s3/azure/sftp list: since "watermark" returns only objects newer than the last run's
+                   high-water mark (LastModified + key, kept in a workflow variable, oldest first);
+                   watermark_key (default "__watermark:<node title>"), watermark_commit ("success":
+                   advance when the whole run succeeds | "node"), key_order "chronological" (S3: keys
+                   sort in arrival order, so listing starts after the last key); output has watermark
+  transfer     → source, destination (s3://bucket/key, azure://container/blob, sftp:///path or a
+                   local path; a trailing "/" or a glob makes it multi-file), streamed through a
+                   bounded buffer with no temp file
+                 optional: source_credential, dest_credential (or credential for both), checksum
+                   ("md5"|"sha256"|"crc32"|"crc32c", comma separated, "none"), pattern, recursive,
+                   max_concurrency (parallel files, default 4), buffer_size (default "16MB"),
+                   part_size / block_size, part_concurrency, verify (default true), allow_failures;
+                   output has count, bytes, duration_s, mb_per_s, checksums (single file)
+  verify       → path (location as for transfer; prefix/glob = batch) or paths (list), credential
+                 optional: checksum ("md5"|"sha256"|"crc32"|"crc32c", comma separated), expected
+                   (hex or {"md5": ..., "size": n}), manifest (batch: {path or relative path: hex}),
+                   compare_to (location or prefix) + compare_credential, prefer_server (default true:
+                   S3 ETag/checksums and Azure Content-MD5 instead of downloading), max_concurrency
+                   (default 8), assert_match (default true), allow_failures;
+                   output has count, matched, mismatched, server_side, bytes_read, checksums + match
+  sensor       → kind ("s3_key"|"sftp_file"|"sql"|"http"|"airflow"), credential (optional for http)
+                 s3_key: bucket, key (or keys) · sftp_file: remote_path · sql: query (met when the
+                   first column of the first row is truthy) · http: url, expected_status, body_contains,
+                   json_field + json_value · airflow: dag_id, dag_run_id (default latest run),
+                   target_states ("success"), failed_states ("failed", fails the node)
+                 optional: poke_interval (seconds, default 60), timeout (seconds, default 86400),
+                   mode ("reschedule": park the run as "waiting" until the sensor service sees the
+                   condition | "poke": check in-process)
+  wait         → duration (int), unit ("seconds"|"minutes"|"hours");
+                 waits over FLOWFORGE_DURABLE_WAIT_THRESHOLD (300s) park the run and resume at the due time
   if           → left_value, operator, right_value
                  operators: equals, not_equals, greater_than, less_than, contains, is_empty, not_empty
   set_variable → key, value, scope ("workflow"|"global")
   get_variable → key, default
   code         → code (Python; reads input_data dict, writes to output dict), timeout (int)
   call_workflow → workflow_id
+  map          → items ("$node.Title.output.rows_sample" style list expression, or a JSON list) or
+                   items_file (.jsonl/.json), plus workflow_id (sub-workflow per item, gets trigger data
+                   {"item", "index"} + input_data) or template (one node: {"type": ..., "props": {...}}
+                   using {{$item}}, {{$item.field}}, {{$index}})
+                 optional: max_concurrency (default 4), failure_policy ("fail_fast"|"collect"|"threshold"),
+                   max_failures (threshold: count or "10%"), artifact ("auto": JSONL artifact above
+                   100 items | true | false)
 
 EXPRESSION SYNTAX (use in any prop value to wire nodes together):
   {{$node.Node Title.output.field}}   — upstream node output field
@@ -100,6 +170,8 @@ NODE OUTPUT FIELDS:
   http     → status_code, response_time, response
   s3/azure/sftp → exists (bool), count (int), items (list)
   if       → branch ("true"|"false"), condition_result (bool)
+  sensor   → condition_met, checks, waited_seconds
+  map      → count, succeeded, failed, not_run, failures, results (or artifact + results_sample)
 
 TRIGGER CHOICE:
   - No schedule words in prompt → use cron: "manual"
@@ -661,7 +733,8 @@ def _describe_dsl(dsl: dict) -> str:
 
 VALID_NODE_TYPES = {
     "trigger", "webhook", "airflow", "sql", "http", "s3", "azure",
-    "sftp", "wait", "if", "set_variable", "get_variable", "code", "call_workflow",
+    "sftp", "transfer", "verify", "sensor", "wait", "if", "set_variable", "get_variable", "code", "call_workflow",
+    "map",
 }
 
 VALID_OPERATORS = {
@@ -677,12 +750,16 @@ REQUIRED_PROPS: dict = {
     "s3":           ["bucket", "operation", "credential"],
     "azure":        ["container", "operation", "credential"],
     "sftp":         ["remote_path", "operation", "credential"],
+    "transfer":     ["source", "destination"],
+    "verify":       ["path"],
+    "sensor":       ["kind"],
     "wait":         ["duration", "unit"],
     "if":           ["left_value", "operator", "right_value"],
     "set_variable": ["key", "value"],
     "get_variable": ["key"],
     "code":         ["code"],
     "call_workflow":["workflow_id"],
+    "map":          ["items"],
 }
 
 
@@ -764,7 +841,16 @@ def validate_dsl(dsl: dict) -> list[str]:
                           f"Valid: {sorted(VALID_NODE_TYPES)}")
 
         # Required props per type
-        for req in REQUIRED_PROPS.get(ntype, []):
+        required = REQUIRED_PROPS.get(ntype, [])
+        if ntype == "sql" and props.get("operation") == "bulk_insert":
+            required = ["table", "credential"]
+        if ntype == "map" and props.get("items_file"):
+            required = ["items_file"]
+        if ntype == "verify" and props.get("paths"):
+            required = ["paths"]
+        if ntype == "sftp" and props.get("operation") in ("upload", "download"):
+            required = required + ["local_path"]
+        for req in required:
             if req not in props or props[req] in (None, "", [], {}):
                 errors.append(f"Node '{ntitle or nid}' ({ntype}): missing required prop '{req}'")
 
@@ -1,13 +1,14 @@
 """FlowForge — Executions Router (v2, fixed)"""
 
+import os
 import uuid
 import logging
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from database import get_db, Workflow, WorkflowRun, NodeRun
+from database import get_db, Workflow, WorkflowRun, NodeRun, RunWait
 from auth import get_current_user
 
 router  = APIRouter()
@@ -138,6 +139,8 @@ async def get_execution(
         .order_by(NodeRun.started_at)
         .all()
     )
+    wait = (db.query(RunWait).filter_by(workflow_run_id=run_id, status="waiting").first()
+            if run.status == "waiting" else None)
     return {
         "id":               run.id,
         "workflow_id":      run.workflow_id,
@@ -148,6 +151,15 @@ async def get_execution(
         "completed_at":     run.completed_at.isoformat() if run.completed_at else None,
         "duration_seconds": run.duration_seconds,
         "error_message":    run.error_message,
+        "artifacts":        sorted(run.artifacts or {}),
+        "waiting": {
+            "node_id":       wait.node_id,
+            "kind":          wait.kind,
+            "checks":        wait.checks,
+            "next_check_at": wait.next_check_at.isoformat(),
+            "timeout_at":    wait.timeout_at.isoformat() if wait.timeout_at else None,
+            "last_error":    wait.last_error,
+        } if wait else None,
         "node_runs": [
             {
                 "node_id":          nr.node_id,
@@ -174,8 +186,10 @@ async def cancel_execution(
     run = db.query(WorkflowRun).filter_by(id=run_id).first()
     if not run:
         raise HTTPException(404, "Execution not found")
-    if run.status not in ("pending", "running"):
+    if run.status not in ("pending", "running", "waiting"):
         raise HTTPException(400, f"Cannot cancel execution with status {run.status!r}")
+    if run.status == "waiting":
+        db.query(RunWait).filter_by(workflow_run_id=run_id, status="waiting").update({"status": "cancelled"})
     run.status        = "cancelled"
     run.completed_at  = datetime.utcnow()
     if run.started_at:
@@ -225,6 +239,22 @@ async def download_logs(
     )
 
 
+@router.get("/{run_id}/artifacts/{name}")
+async def download_artifact(
+    run_id:       str,
+    name:         str,
+    db:           Session = Depends(get_db),
+    current_user: dict    = Depends(get_current_user),
+):
+    run = db.query(WorkflowRun).filter_by(id=run_id).first()
+    if not run:
+        raise HTTPException(404, "Execution not found")
+    path = (run.artifacts or {}).get(name)
+    if not path or not os.path.exists(path):
+        raise HTTPException(404, f"Artifact {name!r} not found")
+    return FileResponse(path, filename=name)
+
+
 # ── Sprint 3: Bulk Execution ──────────────────────────────────────────────────
 
 class BulkExecuteRequest(BaseModel):
@@ -6,6 +6,11 @@ FlowForge — Metrics Router (Sprint 3)
   GET /api/metrics/workflows        — per-workflow breakdown sorted by run count
   GET /api/metrics/nodes            — bottleneck analysis: slowest + most-failed nodes
   GET /api/metrics/workflows/{id}   — single-workflow detail with node breakdown
+  GET /api/metrics/cache            — in-process cache stats (SQL result cache hit ratio, bytes saved)
+  GET /api/metrics/connections      — cached connector instances, shared connection pools (HTTP keep-alive sessions,
+                                      pooled SFTP transports),
+                                      per-URL latency percentiles, hedge win rates and
+                                      the ETag / Last-Modified conditional cache
 """
 
 import logging
@@ -242,6 +247,32 @@ async def get_node_metrics(
     }
 
 
+# ── Cache stats ───────────────────────────────────────────────────────────────
+
+@router.get("/cache")
+async def get_cache_metrics(current_user: dict = Depends(get_current_user)):
+    """Process-local cache counters (each uvicorn worker keeps its own caches)."""
+    from sql_cache import get_query_cache, get_schema_cache
+    return {"sql_results": get_query_cache().stats(), "sql_schema": get_schema_cache().stats()}
+
+
+# ── Connection pools ──────────────────────────────────────────────────────────
+
+@router.get("/connections")
+async def get_connection_metrics(current_user: dict = Depends(get_current_user)):
+    """Process-local connection pool counters (per uvicorn worker)."""
+    from connectors.http_mcp import (
+        get_session_registry, get_async_client_registry, get_latency_tracker, get_conditional_cache,
+    )
+    from connectors.sftp_mcp import get_sftp_pool
+    from credential_manager import get_connector_cache
+    return {"connectors": get_connector_cache().stats(),
+            "http": get_session_registry().stats(), "http_async": get_async_client_registry().stats(),
+            "http_latency": get_latency_tracker().stats(),
+            "http_conditional_cache": get_conditional_cache().stats(),
+            "sftp": get_sftp_pool().stats()}
+
+
 # ── Single-workflow detail ────────────────────────────────────────────────────
 
 @router.get("/workflows/{workflow_id}")
@@ -0,0 +1,375 @@
+"""
+FlowForge — Sensor Service
+
+Deferrable sensors. A sensor node checks its condition once; if it doesn't
+hold yet the engine parks the run (WorkflowRun.status = "waiting", state in a
+RunWait row) and returns, so a waiting run holds no coroutine, thread or DB
+session. This service wakes every FLOWFORGE_SENSOR_TICK seconds, loads the
+due RunWait rows and checks them in batches:
+
+  s3_key     : keys grouped per bucket → one exists_many call (HEADs or a listing)
+  sftp_file  : paths grouped per credential → one pooled SFTP session
+  sql        : queries grouped per credential → one connection; met when the
+               first row's first column is truthy
+  http       : GET/HEAD per URL on the shared session pool; status / body / JSON field
+  airflow    : DAG run states, the latest run fetched once per dag_id
+
+Long wait nodes park the same way with kind "timer": next_check_at is the
+resume time and the run resumes once it is due, with no check at all.
+
+Met (or failed, or past timeout_at) waits are claimed with a conditional
+UPDATE — so two API processes never resume the same run — and the run is
+resumed from the sensor node with the check result.
+
+Usage:
+    from sensor_service import get_sensor_service
+    await get_sensor_service().start()      # lifespan startup
+    await get_sensor_service().stop()       # lifespan shutdown
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SENSOR_TICK        = float(os.getenv("FLOWFORGE_SENSOR_TICK", "5"))
+SENSOR_BATCH       = int(os.getenv("FLOWFORGE_SENSOR_BATCH", "500"))
+SENSOR_MAX_RESUMES = int(os.getenv("FLOWFORGE_SENSOR_MAX_RESUMES", "8"))
+CLAIM_TIMEOUT      = float(os.getenv("FLOWFORGE_SENSOR_CLAIM_TIMEOUT", "600"))   # a "resuming" claim older than this is stale
+
+KINDS = ("s3_key", "sftp_file", "sql", "http", "airflow")
+
+
+# ── Sensor specs ──────────────────────────────────────────────────────────────
+
+def _as_list(value) -> List[str]:
+    if isinstance(value, str):
+        value = json.loads(value) if value.strip().startswith("[") else re.split(r"[,\n]", value)
+    return [str(v).strip() for v in (value or []) if v and str(v).strip()]
+
+
+def sensor_spec(props: dict) -> dict:
+    """Validate sensor node props into the spec stored on the RunWait row."""
+    kind = str(props.get("kind") or "").lower()
+    if kind not in KINDS:
+        raise ValueError(f"Sensor kind must be one of {', '.join(KINDS)}, got {kind!r}")
+    spec = {"kind": kind, "credential": props.get("credential") or ""}
+    if kind != "http" and not spec["credential"]:
+        raise ValueError(f"Sensor {kind} missing credential")
+
+    if kind == "s3_key":
+        spec.update(bucket=props.get("bucket", ""), keys=_as_list(props.get("keys") or props.get("key")))
+        if not spec["bucket"] or not spec["keys"]:
+            raise ValueError("s3_key sensor needs bucket and key (or keys)")
+    elif kind == "sftp_file":
+        spec["remote_path"] = props.get("remote_path", "")
+        if not spec["remote_path"]:
+            raise ValueError("sftp_file sensor needs remote_path")
+    elif kind == "sql":
+        spec["query"] = props.get("query", "")
+        if not spec["query"]:
+            raise ValueError("sql sensor needs query")
+    elif kind == "http":
+        spec.update(url=props.get("url", ""), method=str(props.get("method") or "GET").upper(),
+                    expected_status=int(props.get("expected_status") or 200),
+                    body_contains=props.get("body_contains") or None,
+                    json_field=props.get("json_field") or None,
+                    json_value=props.get("json_value") if props.get("json_value") not in (None, "") else None)
+        if not spec["url"]:
+            raise ValueError("http sensor needs url")
+    elif kind == "airflow":
+        spec.update(dag_id=props.get("dag_id", ""), dag_run_id=props.get("dag_run_id") or None,
+                    target_states=_as_list(props.get("target_states") or "success"),
+                    failed_states=_as_list(props.get("failed_states") or "failed"))
+        if not spec["dag_id"]:
+            raise ValueError("airflow sensor needs dag_id")
+    return spec
+
+
+def describe(spec: dict) -> str:
+    kind = spec["kind"]
+    if kind == "s3_key":    return f"s3://{spec['bucket']}/{spec['keys'][0]}" + (f" (+{len(spec['keys']) - 1})" if len(spec["keys"]) > 1 else "")
+    if kind == "sftp_file": return f"sftp://{spec['remote_path']}"
+    if kind == "sql":       return spec["query"].strip().splitlines()[0][:80]
+    if kind == "http":      return f"{spec['method']} {spec['url']} → {spec['expected_status']}"
+    return f"DAG {spec['dag_id']} {spec['dag_run_id'] or '(latest run)'} in {'/'.join(spec['target_states'])}"
+
+
+def build_sensor_connector(creds, owner_id: str, spec: dict):
+    """Connector for a spec; an http sensor without a credential gets a plain HTTPConnector."""
+    if spec["kind"] == "http" and not spec["credential"]:
+        from connectors.http_mcp import HTTPConnector
+        return HTTPConnector()
+    return creds.build_connector(spec["credential"], owner_id)
+
+
+# ── Batched checks ────────────────────────────────────────────────────────────
+# Each returns one (status, detail) per spec: status "met" | "pending" | "failed".
+
+def _check_s3(connector, specs):
+    by_bucket = defaultdict(set)
+    for s in specs:
+        by_bucket[s["bucket"]].update(s["keys"])
+    missing = {}
+    for bucket, keys in by_bucket.items():
+        missing[bucket] = set(connector.exists_many(bucket, sorted(keys))["missing_keys"])
+    out = []
+    for s in specs:
+        gone = [k for k in s["keys"] if k in missing[s["bucket"]]]
+        out.append(("pending", {"missing": gone[:20]}) if gone else ("met", {"keys": s["keys"]}))
+    return out
+
+
+def _check_sftp(connector, specs):
+    with connector:
+        return [("met", {"remote_path": s["remote_path"]}) if connector.file_exists(s["remote_path"])
+                else ("pending", {}) for s in specs]
+
+
+def _check_sql(connector, specs):
+    connector.connect()
+    try:
+        out = []
+        for s in specs:
+            rows = connector.execute_query(s["query"])
+            value = rows[0][0] if rows and len(rows[0]) else None
+            out.append(("met" if value not in (None, 0, False, "", "0") else "pending", {"value": value}))
+        return out
+    finally:
+        connector.disconnect()
+
+
+def _check_http(connector, specs):
+    from connectors.http_mcp import walk_json_path
+    out = []
+    for s in specs:
+        resp = connector.request(s["method"], s["url"])
+        if resp.status_code != s["expected_status"]:
+            out.append(("pending", {"status_code": resp.status_code}))
+            continue
+        if s["body_contains"] and s["body_contains"] not in resp.text:
+            out.append(("pending", {"status_code": resp.status_code}))
+            continue
+        if s["json_field"]:
+            try:    value = walk_json_path(resp.json(), s["json_field"])
+            except ValueError: value = None
+            if value is None or (s["json_value"] is not None and str(value) != str(s["json_value"])):
+                out.append(("pending", {"status_code": resp.status_code, "json_value": value}))
+                continue
+        out.append(("met", {"status_code": resp.status_code}))
+    return out
+
+
+def _check_airflow(connector, specs):
+    latest = {}
+    for dag_id in {s["dag_id"] for s in specs if not s["dag_run_id"]}:
+        runs = connector.list_dag_runs(dag_id, limit=1)
+        latest[dag_id] = runs[0] if runs else {}
+    out = []
+    for s in specs:
+        run   = connector.get_dag_run(s["dag_id"], s["dag_run_id"]) if s["dag_run_id"] else latest[s["dag_id"]]
+        state = run.get("state")
+        detail = {"dag_run_id": run.get("dag_run_id"), "state": state}
+        if state in s["target_states"]:   out.append(("met", detail))
+        elif state in s["failed_states"]: out.append(("failed", detail))
+        else:                             out.append(("pending", detail))
+    return out
+
+
+_CHECKS = {"s3_key": _check_s3, "sftp_file": _check_sftp, "sql": _check_sql,
+           "http": _check_http, "airflow": _check_airflow}
+
+
+def check_batch(kind: str, connector, specs: List[dict]) -> List[Tuple[str, dict]]:
+    """Check specs of one kind sharing one connector. Blocking — run in a thread."""
+    return _CHECKS[kind](connector, specs)
+
+
+# ── Service ───────────────────────────────────────────────────────────────────
+
+class SensorService:
+    """Background poller for parked runs. One asyncio task per process."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._resumes: set = set()
+        self._sem = asyncio.Semaphore(SENSOR_MAX_RESUMES)
+        self._stats = {"ticks": 0, "checks": 0, "batches": 0, "met": 0, "failed": 0,
+                       "timed_out": 0, "timers": 0, "resumed": 0, "errors": 0, "last_tick_ms": None}
+
+    async def start(self):
+        self._release_stale_claims()
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Sensor service started (tick {SENSOR_TICK}s, batch {SENSOR_BATCH})")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("Sensor service stopped")
+
+    async def _loop(self):
+        last_sweep = time.monotonic()
+        while True:
+            try:
+                # Claims stranded by a process that died after startup are swept up here
+                if time.monotonic() - last_sweep >= CLAIM_TIMEOUT:
+                    last_sweep = time.monotonic()
+                    self._release_stale_claims()
+                await self.tick()
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Sensor tick failed: {e}", exc_info=True)
+            await asyncio.sleep(SENSOR_TICK)
+
+    def _release_stale_claims(self):
+        """
+        Waits claimed by a process that died before the run restarted go back to
+        waiting. Only claims older than FLOWFORGE_SENSOR_CLAIM_TIMEOUT count — a
+        younger one may belong to another live process that is resuming it now.
+        """
+        from database import SessionLocal, RunWait, WorkflowRun
+        from sqlalchemy import or_
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT)
+            stale = (db.query(RunWait).join(WorkflowRun, RunWait.workflow_run_id == WorkflowRun.id)
+                     .filter(RunWait.status == "resuming", WorkflowRun.status == "waiting",
+                             or_(RunWait.claimed_at.is_(None), RunWait.claimed_at < cutoff)).all())
+            for w in stale:
+                w.status = "waiting"
+            db.commit()
+            if stale:
+                logger.info(f"Sensor service: released {len(stale)} stale claim(s)")
+        finally:
+            db.close()
+
+    async def tick(self) -> int:
+        """Check every due wait once. Returns how many were due."""
+        from database import SessionLocal, RunWait
+        from credential_manager import CredentialManager
+        t0  = time.perf_counter()
+        db  = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            due = (db.query(RunWait)
+                   .filter(RunWait.status == "waiting", RunWait.next_check_at <= now)
+                   .order_by(RunWait.next_check_at).limit(SENSOR_BATCH).all())
+            ready, groups = [], defaultdict(list)
+            for w in due:
+                if w.kind == "timer":
+                    # Durable wait node: due means done, nothing to check
+                    w.result = {"status": "met", "checks": 0, "detail": {}}
+                    self._stats["timers"] += 1
+                    ready.append(w)
+                elif w.timeout_at and now >= w.timeout_at:
+                    w.result = {"status": "timed_out", "checks": w.checks, "detail": {"last_error": w.last_error}}
+                    self._stats["timed_out"] += 1
+                    ready.append(w)
+                else:
+                    groups[(w.owner_id, w.spec.get("credential") or "", w.kind)].append(w)
+
+            creds = CredentialManager(db)
+            loop  = asyncio.get_running_loop()
+            for (owner_id, _, kind), waits in groups.items():
+                self._stats["batches"] += 1
+                try:
+                    connector = build_sensor_connector(creds, owner_id, waits[0].spec)
+                    results = await loop.run_in_executor(None, check_batch, kind, connector, [w.spec for w in waits])
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.warning(f"Sensor batch {kind} ({len(waits)} wait(s)) failed: {e}")
+                    results = [("pending", {"error": str(e)})] * len(waits)
+                for w, (status, detail) in zip(waits, results):
+                    w.checks = (w.checks or 0) + 1
+                    self._stats["checks"] += 1
+                    if status == "pending":
+                        w.last_error    = detail.get("error")
+                        w.next_check_at = now + timedelta(seconds=w.poke_interval or 60)
+                        continue
+                    w.result = {"status": status, "checks": w.checks, "detail": detail}
+                    self._stats[status] += 1
+                    ready.append(w)
+            for w in ready:
+                w.result = {**w.result, "waited_seconds": round((now - w.created_at).total_seconds(), 1)}
+            db.commit()
+
+            for w in ready:
+                claimed_at = datetime.utcnow()
+                claimed = (db.query(RunWait).filter(RunWait.id == w.id, RunWait.status == "waiting")
+                           .update({"status": "resuming", "claimed_at": claimed_at}, synchronize_session=False))
+                db.commit()
+                if claimed:
+                    task = asyncio.create_task(self._resume(w.id, w.workflow_id, w.owner_id, w.workflow_run_id,
+                                                            claimed_at))
+                    self._resumes.add(task)
+                    task.add_done_callback(self._resumes.discard)
+            self._stats["ticks"] += 1
+            self._stats["last_tick_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+            return len(due)
+        finally:
+            db.close()
+
+    async def _resume(self, wait_id: str, workflow_id: str, owner_id: str, run_id: str, claimed_at: datetime):
+        from database import SessionLocal, RunWait, WorkflowRun
+        from credential_manager import CredentialManager
+        from workflow_engine import WorkflowEngine
+        async with self._sem:
+            db = SessionLocal()
+            try:
+                # Renew the lease; if it expired while queued and was released (maybe re-claimed
+                # elsewhere), this claim no longer holds and the run must not be resumed twice.
+                renewed = (db.query(RunWait)
+                           .filter(RunWait.id == wait_id, RunWait.status == "resuming", RunWait.claimed_at == claimed_at)
+                           .update({"claimed_at": datetime.utcnow()}, synchronize_session=False))
+                db.commit()
+                if not renewed:
+                    logger.warning(f"Claim on wait {wait_id} (run {run_id}) lapsed before resuming — skipped")
+                    return
+                engine = WorkflowEngine(db_session=db, credential_manager=CredentialManager(db))
+                result = await engine.execute(workflow_id, owner_id, run_id, resume_wait_id=wait_id)
+                self._stats["resumed"] += 1
+                logger.info(f"Resumed run {run_id}: {result['status']}")
+            except Exception as e:
+                logger.error(f"Resuming run {run_id} crashed: {e}", exc_info=True)
+                run = db.query(WorkflowRun).filter_by(id=run_id).first()
+                if run:
+                    run.status        = "failed"
+                    run.error_message = str(e)
+                    run.completed_at  = datetime.utcnow()
+                    db.commit()
+            finally:
+                db.close()
+
+    def stats(self) -> dict:
+        from database import SessionLocal, RunWait
+        from sqlalchemy import func
+        db = SessionLocal()
+        try:
+            waiting = dict(db.query(RunWait.kind, func.count(RunWait.id))
+                           .filter(RunWait.status == "waiting").group_by(RunWait.kind).all())
+        finally:
+            db.close()
+        return {"running": self._task is not None, "waiting": waiting,
+                "resuming": len(self._resumes), **self._stats}
+
+
+# Singleton
+_sensor_service_instance: Optional[SensorService] = None
+
+def get_sensor_service() -> SensorService:
+    global _sensor_service_instance
+    if _sensor_service_instance is None:
+        _sensor_service_instance = SensorService()
+    return _sensor_service_instance
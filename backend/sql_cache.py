@@ -0,0 +1,311 @@
+"""
+FlowForge — SQL Result Cache
+
+Process-wide, size-bounded LRU cache for read-only query results.
+Used by the sql workflow node and the chat agent's sql_execute_query tool so
+identical lookup queries against slow reporting databases hit the server once
+per TTL window.
+
+  Key        : owner + credential + normalized query text + params
+  TTL        : node prop cache_ttl  >  credential field cache_ttl  >  0 (disabled)
+  Storage    : rows pickled + zlib-compressed; LRU eviction by compressed bytes
+  Tags       : table names parsed from FROM/JOIN clauses (+ explicit cache_tags),
+               used for manual invalidation via /api/cache/sql/invalidate
+
+A second, much smaller cache holds describe_schema() results per credential
+(TTL FLOWFORGE_SCHEMA_CACHE_TTL, refreshable via /api/cache/schema/{credential}/refresh)
+so schema discovery by the chat agent costs two queries instead of one per table.
+
+Usage:
+    from sql_cache import cached_query, get_schema_cache
+    rows, cols, hit = cached_query(connector, query, owner_id=owner_id, ttl=60)
+    tables = get_schema_cache().get_schema(connector, owner_id)
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES  = int(float(os.getenv("FLOWFORGE_SQL_CACHE_MB", "64")) * 1024 * 1024)
+SCHEMA_CACHE_TTL   = float(os.getenv("FLOWFORGE_SCHEMA_CACHE_TTL", "600"))
+
+_READ_ONLY = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+# A SELECT/WITH that still writes: WITH … DELETE/UPDATE/INSERT/MERGE, SELECT … INTO, EXEC
+_WRITES    = re.compile(r"\b(insert|update|delete|merge|into|exec|execute)\b", re.IGNORECASE)
+_LITERALS  = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_TABLE_REF = re.compile(r"\b(?:from|join)\s+((?:\[[^\]]+\]|[\w#]+)(?:\.(?:\[[^\]]+\]|\w+)){0,2})", re.IGNORECASE)
+
+
+# ── Query normalisation ───────────────────────────────────────────────────────
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and lowercase everything outside string literals."""
+    parts = re.split(r"('(?:[^']|'')*')", query.strip().rstrip(";"))
+    return "".join(p if p.startswith("'") else re.sub(r"\s+", " ", p).lower() for p in parts).strip()
+
+
+def extract_table_tags(query: str) -> List[str]:
+    """Table tags for a query: both 'schema.table' and bare 'table', lowercased, unbracketed."""
+    tags = set()
+    for ref in _TABLE_REF.findall(query):
+        parts = [p.strip("[]").lower() for p in ref.split(".")]
+        tags.add(parts[-1])
+        if len(parts) > 1:
+            tags.add(".".join(parts[-2:]))
+    return sorted(tags)
+
+
+def is_cacheable(query: str) -> bool:
+    """Only pure reads: starts with SELECT/WITH and has no DML keyword outside literals and comments."""
+    code = _LITERALS.sub(" ", query or "")
+    return bool(_READ_ONLY.match(code)) and not _WRITES.search(code)
+
+
+# ── Cache ─────────────────────────────────────────────────────────────────────
+
+class _Entry:
+    __slots__ = ("blob", "raw_bytes", "expires_at", "tags", "owner_id", "credential")
+
+    def __init__(self, blob, raw_bytes, expires_at, tags, owner_id, credential):
+        self.blob       = blob
+        self.raw_bytes  = raw_bytes
+        self.expires_at = expires_at
+        self.tags       = tags
+        self.owner_id   = owner_id
+        self.credential = credential
+
+
+class QueryResultCache:
+    """Thread-safe LRU of compressed (columns, rows) results bounded by total compressed bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes    = 0
+        self._hits     = 0
+        self._misses   = 0
+        self._evictions   = 0
+        self._bytes_saved = 0     # uncompressed result bytes served without a DB round trip
+
+    @staticmethod
+    def make_key(owner_id: str, credential: str, query: str, params: tuple = None) -> str:
+        raw = "\x1f".join([owner_id or "", (credential or "").upper(), normalize_query(query), repr(tuple(params or ()))])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[List[str], List[tuple]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry.expires_at <= time.time():
+                self._drop(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits        += 1
+            self._bytes_saved += entry.raw_bytes
+            blob = entry.blob
+        return pickle.loads(zlib.decompress(blob))
+
+    def put(self, key: str, columns: List[str], rows: Iterable, ttl: float,
+            tags: Iterable[str] = (), owner_id: str = "", credential: str = ""):
+        raw  = pickle.dumps((list(columns), [tuple(r) for r in rows]), protocol=pickle.HIGHEST_PROTOCOL)
+        blob = zlib.compress(raw, 6)
+        if len(blob) > self.max_bytes:
+            logger.info(f"SQL cache: result too large to cache ({len(blob)} bytes compressed)")
+            return
+        entry = _Entry(blob, len(raw), time.time() + ttl,
+                       frozenset(t.lower() for t in tags), owner_id, (credential or "").upper())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes       += len(blob)
+            while self._bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, tags: Iterable[str] = (), owner_id: str = None, credential: str = None) -> int:
+        """
+        Drop entries matching ANY of tags (or all entries when tags is empty),
+        optionally restricted to one owner and/or credential. Returns count removed.
+        """
+        wanted = {t.strip("[]").lower() for t in tags}
+        cred   = credential.upper() if credential else None
+        with self._lock:
+            doomed = [
+                k for k, e in self._entries.items()
+                if (owner_id is None or e.owner_id == owner_id)
+                and (cred is None or e.credential == cred)
+                and (not wanted or e.tags & wanted)
+            ]
+            for k in doomed:
+                self._drop(k)
+        if doomed:
+            logger.info(f"SQL cache: invalidated {len(doomed)} entr{'y' if len(doomed) == 1 else 'ies'} (tags={sorted(wanted) or '*'})")
+        return len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries":       len(self._entries),
+                "bytes":         self._bytes,
+                "max_bytes":     self.max_bytes,
+                "hits":          self._hits,
+                "misses":        self._misses,
+                "hit_ratio":     round(self._hits / lookups, 4) if lookups else None,
+                "evictions":     self._evictions,
+                "bytes_saved":   self._bytes_saved,
+            }
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= len(entry.blob)
+
+
+# Singleton
+_cache_instance: Optional[QueryResultCache] = None
+
+def get_query_cache() -> QueryResultCache:
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = QueryResultCache()
+    return _cache_instance
+
+
+# ── Helper used by the engine and tool registry ──────────────────────────────
+
+def cached_query(
+    connector,
+    query: str,
+    params: tuple = None,
+    owner_id: str = "",
+    ttl: Optional[float] = None,
+    tags: Iterable[str] = (),
+) -> Tuple[List[Any], List[str], bool]:
+    """
+    Run query through the result cache. Returns (rows, column_names, cache_hit).
+
+    ttl=None falls back to the connector's credential-level cache_ttl.
+    Non-SELECT statements and ttl <= 0 bypass the cache entirely.
+    The connector is connected lazily — a cache hit never opens a DB connection.
+    """
+    if ttl is None:
+        ttl = float(getattr(connector, "cache_ttl", 0) or 0)
+    cred = getattr(connector, "credential_name", "") or ""
+
+    if ttl <= 0 or not is_cacheable(query):
+        rows = connector.execute_query(query, params)
+        return rows, list(connector.last_column_names), False
+
+    cache = get_query_cache()
+    key   = cache.make_key(owner_id, cred, query, params)
+    hit   = cache.get(key)
+    if hit is not None:
+        cols, rows = hit
+        connector.last_column_names = list(cols)
+        return rows, cols, True
+
+    rows = connector.execute_query(query, params)
+    cols = list(connector.last_column_names)
+    cache.put(key, cols, rows, ttl, tags=[*extract_table_tags(query), *tags],
+              owner_id=owner_id, credential=cred)
+    return rows, cols, False
+
+
+# ── Schema cache ──────────────────────────────────────────────────────────────
+
+class SchemaCache:
+    """Per-(owner, credential) cache of MSSQLMCP.describe_schema() results."""
+
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL):
+        self.ttl     = ttl
+        self._lock   = threading.Lock()
+        self._fetch_locks: dict = {}
+        self._entries: dict = {}   # (owner_id, CREDENTIAL) → (fetched_at, tables)
+        self._hits   = 0
+        self._misses = 0
+
+    def get_schema(self, connector, owner_id: str = "", refresh: bool = False) -> dict:
+        """Return cached tables for the connector's credential, fetching on miss/expiry/refresh."""
+        key = (owner_id or "", (getattr(connector, "credential_name", "") or "").upper())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not refresh and time.time() - entry[0] < self.ttl:
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        # One fetch per credential at a time — concurrent callers wait and reuse it
+        with fetch_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and not refresh and time.time() - entry[0] < self.ttl:
+                    return entry[1]
+            t0     = time.time()
+            tables = connector.describe_schema()
+            with self._lock:
+                self._entries[key] = (time.time(), tables)
+            logger.info(f"Schema cache: loaded {len(tables)} tables for {key[1] or '(env)'} in {time.time() - t0:.2f}s")
+            return tables
+
+    def lookup_table(self, connector, table_name: str, owner_id: str = "") -> Optional[dict]:
+        """Find one table ('name' or 'schema.name', case-insensitive) in the cached schema."""
+        tables = self.get_schema(connector, owner_id)
+        wanted = ".".join(p.strip("[]") for p in table_name.split(".")).lower()
+        for full, t in tables.items():
+            if full.lower() == wanted or t["table"].lower() == wanted:
+                return t
+        return None
+
+    def invalidate(self, owner_id: str = None, credential: str = None) -> int:
+        cred = credential.upper() if credential else None
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if (owner_id is None or k[0] == owner_id) and (cred is None or k[1] == cred)]
+            for k in doomed:
+                del self._entries[k]
+        return len(doomed)
+
+    def info(self, owner_id: str, credential: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get((owner_id or "", credential.upper()))
+        if not entry:
+            return None
+        return {"fetched_at": entry[0], "age_s": round(time.time() - entry[0], 1),
+                "ttl_s": self.ttl, "tables": len(entry[1])}
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {"credentials": len(self._entries), "ttl_s": self.ttl,
+                    "hits": self._hits, "misses": self._misses,
+                    "hit_ratio": round(self._hits / lookups, 4) if lookups else None}
+
+
+_schema_cache_instance: Optional[SchemaCache] = None
+
+def get_schema_cache() -> SchemaCache:
+    global _schema_cache_instance
+    if _schema_cache_instance is None:
+        _schema_cache_instance = SchemaCache()
+    return _schema_cache_instance
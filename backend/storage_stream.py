@@ -0,0 +1,624 @@
+"""
+FlowForge — Cross-store Streaming
+
+Moves and checksums bytes between S3, Azure Blob, SFTP and the local disk
+without staging them in temp files. Used by the transfer and verify nodes.
+
+  Locations  : s3://bucket/key · azure://container/blob · sftp:///remote/path ·
+               file:///local/path (or a bare local path). A trailing "/" or a
+               glob (*, ?, [) makes a multi-file source / a destination prefix.
+  Pipe       : a reader thread pulls CHUNK_SIZE blocks from the source into a
+               BoundedPipe (at most buffer_size bytes queued) while the sink's
+               SDK consumes it — S3 multipart, Azure block staging, pipelined
+               SFTP writes. The slower side sets the pace and memory stays
+               flat whatever the object size.
+  Checksums  : md5 / sha256 / crc32 / crc32c (google-crc32c, optional) are
+               updated as bytes pass through. The written copy is checked
+               against the sink's own values (S3 ETag, Azure Content-MD5,
+               size) without reading it back, and verify uses those values
+               instead of downloading whenever they cover what was asked for.
+
+Usage:
+    from storage_stream import parse_location, copy_one, verify_one
+    res = copy_one(parse_location("sftp:///in/a.csv"), sftp, parse_location("s3://bkt/a.csv"), s3)
+"""
+
+import fnmatch
+import glob
+import hashlib
+import logging
+import os
+import posixpath
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+try:
+    import google_crc32c
+    CRC32C_AVAILABLE = True
+except ImportError:
+    CRC32C_AVAILABLE = False   # crc32c checksums only — everything else works without it
+
+CHUNK_SIZE     = 1024 * 1024
+RESULT_SAMPLE  = 100        # per-file results / errors kept in a batch summary
+DEFAULT_BUFFER = int(float(os.getenv("FLOWFORGE_STREAM_BUFFER_MB", "16")) * 1024 * 1024)
+ALGORITHMS     = ("md5", "sha256", "crc32", "crc32c")
+
+_SCHEMES    = {"s3": "s3", "azure": "azure", "az": "azure", "sftp": "sftp", "file": "local", "": "local"}
+_GLOB_CHARS = set("*?[")
+
+
+# ── Locations ─────────────────────────────────────────────────────────────────
+
+class Location(NamedTuple):
+    kind:      str     # s3 | azure | sftp | local
+    container: str     # bucket / container; "" for sftp and local
+    path:      str     # key / blob name / remote path / local path
+
+    @property
+    def uri(self) -> str:
+        if self.kind in ("s3", "azure"):
+            return f"{self.kind}://{self.container}/{self.path}"
+        return f"sftp://{self.path}" if self.kind == "sftp" else self.path
+
+    @property
+    def is_multi(self) -> bool:
+        """Names a prefix / directory / glob rather than one object."""
+        return self.path == "" or self.path.endswith("/") or bool(set(self.path) & _GLOB_CHARS)
+
+    def join(self, rel: str) -> "Location":
+        if self.kind == "local":
+            return self._replace(path=os.path.join(self.path, *rel.split("/")))
+        base = self.path if self.path.endswith("/") or not self.path else self.path + "/"
+        return self._replace(path=base + rel)
+
+
+def parse_location(uri: str) -> Location:
+    """'s3://bucket/key' · 'azure://container/blob' · 'sftp:///path' · 'file:///path' · '/path'."""
+    text = (uri or "").strip()
+    if not text:
+        raise ValueError("empty storage location")
+    parts  = urlsplit(text) if "://" in text else None
+    scheme = parts.scheme.lower() if parts else ""
+    if scheme not in _SCHEMES:
+        raise ValueError(f"unsupported location scheme {scheme!r} in {uri!r} (use s3://, azure://, sftp://, file://)")
+    kind = _SCHEMES[scheme]
+    if parts is None:
+        return Location("local", "", text)
+    path = unquote(parts.path)
+    if kind in ("s3", "azure"):
+        if not parts.netloc:
+            raise ValueError(f"{uri!r}: missing bucket/container")
+        return Location(kind, parts.netloc, path.lstrip("/"))
+    return Location(kind, "", path or "/")
+
+
+# ── Checksums ─────────────────────────────────────────────────────────────────
+
+class _Crc32:
+    def __init__(self):
+        self.value = 0
+
+    def update(self, data):
+        self.value = zlib.crc32(data, self.value)
+
+    def hexdigest(self) -> str:
+        return f"{self.value:08x}"
+
+
+class _Crc32c:
+    def __init__(self):
+        self._c = google_crc32c.Checksum()
+
+    def update(self, data):
+        self._c.update(data)
+
+    def hexdigest(self) -> str:
+        return self._c.digest().hex()
+
+
+def normalize_algorithms(value) -> List[str]:
+    """'md5' / 'md5,sha256' / ['md5'] → validated, lowercase list."""
+    if not value:
+        return ["md5"]
+    names = value if isinstance(value, (list, tuple)) else str(value).replace(";", ",").split(",")
+    algos = [n.strip().lower().replace("-", "") for n in names if str(n).strip()]
+    for a in algos:
+        if a not in ALGORITHMS:
+            raise ValueError(f"unknown checksum algorithm {a!r} (supported: {', '.join(ALGORITHMS)})")
+        if a == "crc32c" and not CRC32C_AVAILABLE:
+            raise RuntimeError("crc32c checksums need google-crc32c. Run: pip install google-crc32c")
+    return algos
+
+
+class Checksummer:
+    """Several running checksums fed from the same byte stream."""
+
+    def __init__(self, algorithms):
+        self._h = {}
+        for a in normalize_algorithms(algorithms):
+            self._h[a] = (hashlib.md5() if a == "md5" else hashlib.sha256() if a == "sha256"
+                          else _Crc32() if a == "crc32" else _Crc32c())
+
+    def update(self, data):
+        for h in self._h.values():
+            h.update(data)
+
+    def hexdigests(self) -> Dict[str, str]:
+        return {a: h.hexdigest() for a, h in self._h.items()}
+
+
+# ── Bounded pipe ──────────────────────────────────────────────────────────────
+
+class PipeCancelled(Exception):
+    pass
+
+
+class BoundedPipe:
+    """
+    Single-producer / single-consumer byte pipe holding at most max_bytes.
+    The producer blocks while it is full; the consumer blocks while it is
+    empty; an error on either side is surfaced to the other.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_BUFFER):
+        self.max_bytes  = max(int(max_bytes), CHUNK_SIZE)
+        self._cond      = threading.Condition()
+        self._chunks    = deque()
+        self._buffered  = 0
+        self._eof       = False
+        self._error     = None
+        self._cancelled = False
+        self.high_water = 0
+
+    # producer side
+    def write(self, data: bytes):
+        with self._cond:
+            while self._buffered and self._buffered + len(data) > self.max_bytes and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                raise PipeCancelled()
+            self._chunks.append(data)
+            self._buffered += len(data)
+            self.high_water = max(self.high_water, self._buffered)
+            self._cond.notify_all()
+
+    def close(self, error: BaseException = None):
+        with self._cond:
+            self._eof   = True
+            self._error = error
+            self._cond.notify_all()
+
+    # consumer side
+    def read(self, n: int = -1) -> bytes:
+        """Blocking full read: returns n bytes, or fewer only at end of stream (n < 0 reads to the end)."""
+        out, want = [], n if n is not None and n >= 0 else float("inf")
+        with self._cond:
+            while want > 0:
+                while not self._chunks and not self._eof:
+                    self._cond.wait()
+                if self._error is not None:
+                    raise IOError(f"source read failed: {self._error}") from self._error
+                if not self._chunks:
+                    break
+                taken = 0
+                while self._chunks and want > 0:
+                    chunk = self._chunks[0]
+                    if len(chunk) <= want:
+                        out.append(self._chunks.popleft())
+                    else:
+                        out.append(chunk[:int(want)])
+                        self._chunks[0] = chunk[int(want):]
+                    taken += len(out[-1])
+                    want  -= len(out[-1])
+                self._buffered -= taken
+                self._cond.notify_all()
+        return b"".join(out)
+
+    def readable(self) -> bool:
+        return True
+
+    def cancel(self):
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+
+def _pump(reader, pipe: BoundedPipe, sums: Optional[Checksummer], progress: Optional[Callable], counter: list):
+    try:
+        for block in iter(lambda: reader.read(CHUNK_SIZE), b""):
+            if sums is not None:
+                sums.update(block)
+            counter[0] += len(block)
+            pipe.write(block)
+            if progress:
+                progress(len(block))
+        pipe.close()
+    except PipeCancelled:
+        pass
+    except BaseException as e:
+        pipe.close(error=e)
+
+
+# ── Per-backend readers, writers and listings ─────────────────────────────────
+
+@contextmanager
+def open_reader(loc: Location, connector, tuning: dict = None):
+    """(reader, size) for one object; reader.read(n) streams from the backend."""
+    tuning = tuning or {}
+    if loc.kind == "s3":
+        body, size = connector.open_stream(loc.container, loc.path)
+        try:
+            yield body, size
+        finally:
+            body.close()
+    elif loc.kind == "azure":
+        yield connector.open_stream(loc.container, loc.path, chunk_size=tuning.get("chunk_size"),
+                                    max_concurrency=tuning.get("max_concurrency"))
+    elif loc.kind == "sftp":
+        with connector.open_stream(loc.path, max_prefetch=tuning.get("max_prefetch")) as (f, size):
+            yield f, size
+    else:
+        with open(loc.path, "rb") as f:
+            yield f, os.fstat(f.fileno()).st_size
+
+
+def write_stream(loc: Location, connector, reader, size: int, tuning: dict = None):
+    """Drain reader into loc (object store upload, pipelined SFTP write, or local file)."""
+    tuning = tuning or {}
+    if loc.kind == "s3":
+        connector.upload_stream(reader, loc.container, loc.path, config=tuning.get("s3_config"))
+    elif loc.kind == "azure":
+        connector.upload_stream(loc.container, loc.path, reader, length=size,
+                                block_size=tuning.get("block_size"), max_concurrency=tuning.get("max_concurrency"))
+    elif loc.kind == "sftp":
+        parent = posixpath.dirname(loc.path)
+        if parent not in ("", "/"):
+            connector.make_dirs(parent)
+        connector.upload_stream(reader, loc.path, size, request_size=tuning.get("request_size"))
+    else:
+        os.makedirs(os.path.dirname(loc.path) or ".", exist_ok=True)
+        partial = loc.path + ".part"
+        try:
+            with open(partial, "wb") as f:
+                for block in iter(lambda: reader.read(CHUNK_SIZE), b""):
+                    f.write(block)
+            os.replace(partial, loc.path)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+
+def server_checksums(loc: Location, connector) -> dict:
+    """Checksums the backend already holds (hex), plus size. Local files and SFTP have none."""
+    if loc.kind in ("s3", "azure"):
+        return connector.get_checksums(loc.container, loc.path)
+    if loc.kind == "sftp":
+        return connector.get_checksums(loc.path)
+    return {"size": os.path.getsize(loc.path)}
+
+
+def list_sources(loc: Location, connector, pattern: str = None, recursive: bool = True) -> List[Tuple[Location, str, Optional[int]]]:
+    """
+    Expand a source location to [(object_location, relative_path, size)].
+    A single object lists as itself with its base name as relative path.
+    Prefixes / directories are walked (recursive), globs are matched against
+    the path below their literal leading directory, and pattern further
+    filters relative paths (fnmatch).
+    """
+    if loc.kind == "sftp":
+        return [(loc._replace(path=p), rel, size) for p, rel, size in connector.list_files(loc.path, pattern, recursive)]
+
+    if loc.kind == "local":
+        if set(loc.path) & _GLOB_CHARS:
+            base  = _glob_base(loc.path, os.sep)
+            paths = [p for p in glob.glob(loc.path, recursive=True) if os.path.isfile(p)]
+        elif os.path.isdir(loc.path):
+            base, paths = loc.path, []
+            for root, dirs, names in os.walk(loc.path):
+                paths.extend(os.path.join(root, n) for n in names)
+                if not recursive:
+                    break
+        else:
+            return [(loc, os.path.basename(loc.path), os.path.getsize(loc.path))]
+        out = []
+        for p in sorted(paths):
+            rel = os.path.relpath(p, base).replace(os.sep, "/")
+            if pattern and not fnmatch.fnmatch(rel, pattern):
+                continue
+            out.append((loc._replace(path=p), rel, os.path.getsize(p)))
+        return out
+
+    # Object stores: one key, a prefix, or a glob over keys
+    if not loc.is_multi:
+        return [(loc, posixpath.basename(loc.path), None)]
+    if set(loc.path) & _GLOB_CHARS:
+        base    = _glob_base(loc.path, "/")
+        base    = "" if base in (".", "/") else base.rstrip("/") + "/"
+        matcher = loc.path[len(base):]
+    else:
+        base, matcher = loc.path, None
+    listing = (connector.iter_objects(loc.container, prefix=base) if loc.kind == "s3"
+               else connector.iter_blobs(loc.container, base))
+    out = []
+    for obj in listing:
+        name = obj.get("key") or obj.get("name")
+        if not name or name.endswith("/"):
+            continue
+        rel = name[len(base):]
+        if matcher and not fnmatch.fnmatch(rel, matcher):        continue
+        if not recursive and not matcher and "/" in rel:         continue
+        if pattern and not fnmatch.fnmatch(rel, pattern):        continue
+        out.append((loc._replace(path=name), rel, obj.get("size")))
+    return out
+
+
+def _glob_base(path: str, sep: str) -> str:
+    parts = path.split(sep)
+    for i, part in enumerate(parts):
+        if set(part) & _GLOB_CHARS:
+            return sep.join(parts[:i]) or (sep if path.startswith(sep) else ".")
+    return path
+
+
+# ── Operations ────────────────────────────────────────────────────────────────
+
+def copy_one(
+    src: Location,
+    src_conn,
+    dst: Location,
+    dst_conn,
+    algorithms=("md5",),
+    buffer_size: int = DEFAULT_BUFFER,
+    progress: Callable = None,
+    tuning: dict = None,
+    verify: bool = True,
+) -> dict:
+    """
+    Stream one object from src to dst through a BoundedPipe, checksumming in
+    flight. With verify, the destination's server-side checksum (S3 single-part
+    ETag; Azure Content-MD5, which is stamped here from the streamed MD5) is
+    compared against the streamed one.
+    """
+    t0    = time.time()
+    sums  = Checksummer(algorithms) if algorithms else None
+    count = [0]
+    with open_reader(src, src_conn, tuning) as (reader, size):
+        pipe     = BoundedPipe(buffer_size)
+        producer = threading.Thread(target=_pump, args=(reader, pipe, sums, progress, count),
+                                    name="stream-pump", daemon=True)
+        producer.start()
+        try:
+            write_stream(dst, dst_conn, pipe, size, tuning)
+        except BaseException:
+            pipe.cancel()
+            raise
+        finally:
+            producer.join()
+    if size is not None and count[0] != size:
+        raise IOError(f"{src.uri}: read {count[0]} of {size} bytes")
+
+    checksums = sums.hexdigests() if sums else {}
+    verified  = None
+    if dst.kind == "azure" and "md5" in checksums:
+        dst_conn.set_content_md5(dst.container, dst.path, bytes.fromhex(checksums["md5"]))
+    if verify and dst.kind in ("s3", "azure"):
+        remote   = server_checksums(dst, dst_conn)
+        common   = [a for a in checksums if a in remote]
+        verified = all(remote[a] == checksums[a] for a in common) if common else None
+        if remote.get("size") != count[0]:
+            verified = False
+        if verified is False:
+            raise IOError(f"{dst.uri}: destination checksum/size mismatch after transfer "
+                          f"(sent {count[0]} bytes {checksums}, server reports {remote})")
+    elapsed = max(time.time() - t0, 1e-6)
+    return {"source": src.uri, "dest": dst.uri, "bytes": count[0], "duration_s": round(elapsed, 3),
+            "mb_per_s": round(count[0] / 1_048_576 / elapsed, 2), "checksums": checksums,
+            "verified": verified, "buffer_high_water": pipe.high_water}
+
+
+def _copy_workers(pairs, src_conn, dst_conn, max_workers: int) -> int:
+    """Clamp workers to the SFTP channel cap; an SFTP→SFTP copy on one host holds two channels per worker."""
+    kinds = {pairs[0][0].kind, pairs[0][1].kind} if pairs else set()
+    if "sftp" not in kinds:
+        return max(1, int(max_workers))
+    from connectors.sftp_mcp import get_sftp_pool
+    pool = get_sftp_pool()
+    same_host = (pairs[0][0].kind == pairs[0][1].kind == "sftp"
+                 and pool.make_key(src_conn)[:2] == pool.make_key(dst_conn)[:2])
+    return pool.worker_cap(max_workers, 2 if same_host else 1)
+
+
+def copy_many(
+    pairs: List[Tuple[Location, Location]],
+    src_conn,
+    dst_conn,
+    max_workers: int = 4,
+    **kwargs,
+) -> dict:
+    """copy_one over (src, dst) pairs, max_workers at a time. Returns per-file samples plus totals."""
+    def _one(pair):
+        try:
+            return copy_one(pair[0], src_conn, pair[1], dst_conn, **kwargs)
+        except Exception as e:
+            return {"source": pair[0].uri, "dest": pair[1].uri, "error": str(e)}
+
+    t0 = time.time()
+    files, errors, total = [], [], 0
+    with ThreadPoolExecutor(max_workers=_copy_workers(pairs, src_conn, dst_conn, max_workers)) as pool:
+        for res in pool.map(_one, pairs):
+            if "error" in res:
+                errors.append(res)
+                continue
+            total += res["bytes"]
+            if len(files) < RESULT_SAMPLE:
+                files.append(res)
+    elapsed = max(time.time() - t0, 1e-6)
+    return {"files": files, "transferred": len(pairs) - len(errors), "failed": len(errors),
+            "errors": errors[:RESULT_SAMPLE], "bytes": total, "duration_s": round(elapsed, 3),
+            "mb_per_s": round(total / 1_048_576 / elapsed, 2)}
+
+
+# ── Verification ──────────────────────────────────────────────────────────────
+
+def stream_checksums(loc: Location, connector, algorithms, tuning: dict = None,
+                     progress: Callable = None) -> Tuple[Dict[str, str], int]:
+    """Read the whole object once, computing every requested checksum. Returns (checksums, bytes)."""
+    sums, total = Checksummer(algorithms), 0
+    with open_reader(loc, connector, tuning) as (reader, size):
+        for block in iter(lambda: reader.read(CHUNK_SIZE), b""):
+            sums.update(block)
+            total += len(block)
+            if progress:
+                progress(len(block))
+    if size is not None and total != size:
+        raise IOError(f"{loc.uri}: read {total} of {size} bytes")
+    return sums.hexdigests(), total
+
+
+def checksum_one(loc: Location, connector, algorithms, tuning: dict = None, prefer_server: bool = True,
+                 progress: Callable = None, meta: dict = None) -> dict:
+    """
+    Checksums of one object: taken from server-side metadata when it covers
+    every requested algorithm (no bytes read), otherwise streamed. meta is a
+    server_checksums() result the caller already has.
+    """
+    algos = normalize_algorithms(algorithms)
+    t0    = time.time()
+    if prefer_server and loc.kind in ("s3", "azure"):
+        remote = meta if meta is not None else server_checksums(loc, connector)
+        if all(a in remote for a in algos):
+            return {"path": loc.uri, "size": remote.get("size"), "checksums": {a: remote[a] for a in algos},
+                    "source": "server", "bytes_read": 0, "duration_s": round(time.time() - t0, 3)}
+    checksums, total = stream_checksums(loc, connector, algos, tuning, progress)
+    elapsed = max(time.time() - t0, 1e-6)
+    return {"path": loc.uri, "size": total, "checksums": checksums, "source": "streamed",
+            "bytes_read": total, "duration_s": round(elapsed, 3),
+            "mb_per_s": round(total / 1_048_576 / elapsed, 2)}
+
+
+def _etag_shortcut(loc: Location, meta: dict, ref: Location, ref_meta: dict) -> Optional[Tuple[bool, str, int]]:
+    """
+    Decide a comparison from S3 ETags alone: identical ETags on two S3 objects
+    of equal size, or a multipart ETag recomputed from a local file (only the
+    local side is read). Returns (match, etag, bytes_read), or None when the
+    ETags can't settle it.
+    """
+    if loc.kind == ref.kind == "s3" and meta.get("etag") and meta["etag"] == ref_meta.get("etag"):
+        return True, meta["etag"], 0
+    for s3_meta, other, other_meta in ((meta, ref, ref_meta), (ref_meta, loc, meta)):
+        if s3_meta.get("multipart") and other.kind == "local":
+            from connectors.s3_mcp import local_etag
+            candidate = local_etag(other.path, s3_meta["etag"])
+            if candidate is not None:
+                return candidate == s3_meta["etag"], s3_meta["etag"], other_meta["size"]
+    return None
+
+
+def verify_one(
+    loc: Location,
+    connector,
+    algorithms=("md5",),
+    expected: dict = None,
+    reference: Location = None,
+    ref_conn=None,
+    prefer_server: bool = True,
+    tuning: dict = None,
+    progress: Callable = None,
+) -> dict:
+    """
+    Checksum loc and, when given, compare it against expected values
+    ({algo: hex, "size": n}) or against a reference object. Sizes are compared
+    from metadata first, so a truncated copy fails without reading either side.
+    match is True / False, or None when there was nothing to compare.
+    """
+    algos  = normalize_algorithms(list(algorithms) + [a for a in (expected or {}) if a in ALGORITHMS])
+    algos  = list(dict.fromkeys(algos))
+    t0     = time.time()
+    meta   = server_checksums(loc, connector)
+    out    = {"path": loc.uri, "size": meta.get("size"), "match": None, "mismatch": [], "bytes_read": 0}
+
+    size_compared = False
+    if reference is not None:
+        ref_meta         = server_checksums(reference, ref_conn)
+        out["reference"] = reference.uri
+        size_compared    = meta.get("size") is not None and ref_meta.get("size") is not None
+        if size_compared and meta["size"] != ref_meta["size"]:
+            out.update(match=False, mismatch=["size"], source="metadata", checksums={},
+                       duration_s=round(time.time() - t0, 3))
+            return out
+        if prefer_server:
+            decided = _etag_shortcut(loc, meta, reference, ref_meta)
+            if decided is not None:
+                match, etag, read = decided
+                out.update(match=match, mismatch=[] if match else ["etag"], source="etag",
+                           checksums={"etag": etag}, bytes_read=read, duration_s=round(time.time() - t0, 3))
+                return out
+        mine   = checksum_one(loc, connector, algos, tuning, prefer_server, progress, meta)
+        theirs = checksum_one(reference, ref_conn, algos, tuning, prefer_server, progress, ref_meta)
+        want   = theirs["checksums"]
+        out["reference_source"] = theirs["source"]
+        out["bytes_read"]      += theirs["bytes_read"]
+    else:
+        mine = checksum_one(loc, connector, algos, tuning, prefer_server, progress, meta)
+        want = {a: str(v).lower() for a, v in (expected or {}).items() if a in ALGORITHMS}
+        if expected and expected.get("size") is not None:
+            size_compared = True
+            if int(expected["size"]) != mine["size"]:
+                out["mismatch"].append("size")
+
+    out.update(size=mine["size"], checksums=mine["checksums"], source=mine["source"])
+    out["bytes_read"] += mine["bytes_read"]
+    compared           = [a for a in algos if a in want]
+    out["mismatch"]   += [a for a in compared if want[a] != mine["checksums"][a]]
+    if size_compared or compared:
+        out["match"] = not out["mismatch"]
+    out["duration_s"] = round(time.time() - t0, 3)
+    return out
+
+
+def verify_many(
+    items: List[Tuple[Location, Optional[dict], Optional[Location]]],
+    connector,
+    ref_conn=None,
+    max_workers: int = 8,
+    **kwargs,
+) -> dict:
+    """verify_one over (location, expected, reference) triples, max_workers at a time."""
+    def _one(item):
+        loc, expected, reference = item
+        try:
+            return verify_one(loc, connector, expected=expected, reference=reference, ref_conn=ref_conn, **kwargs)
+        except Exception as e:
+            return {"path": loc.uri, "error": str(e)}
+
+    t0 = time.time()
+    files, mismatches, errors = [], [], []
+    matched = server_side = bytes_read = 0
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+        for res in pool.map(_one, items):
+            if "error" in res:
+                errors.append(res)
+                continue
+            bytes_read  += res["bytes_read"]
+            server_side += res["bytes_read"] == 0
+            if res["match"] is False:
+                mismatches.append(res)
+            elif res["match"]:
+                matched += 1
+            if len(files) < RESULT_SAMPLE:
+                files.append(res)
+    elapsed = max(time.time() - t0, 1e-6)
+    return {"files": files, "checked": len(items) - len(errors), "matched": matched,
+            "mismatched": len(mismatches), "mismatches": mismatches[:RESULT_SAMPLE],
+            "failed": len(errors), "errors": errors[:RESULT_SAMPLE], "server_side": server_side,
+            "bytes_read": bytes_read, "duration_s": round(elapsed, 3),
+            "mb_per_s": round(bytes_read / 1_048_576 / elapsed, 2)}
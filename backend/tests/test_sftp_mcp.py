@@ -0,0 +1,285 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("paramiko")
+
+from connectors import sftp_mcp
+from connectors.sftp_mcp import SFTPConnector, SFTPSessionPool, _glob_base
+
+
+class _FakeFile:
+    def __init__(self, fh):
+        self._fh = fh
+        self.MAX_REQUEST_SIZE = 32768
+
+    def set_pipelined(self, flag=True): pass
+    def prefetch(self, size=None, max_concurrent_requests=None): pass
+    def stat(self): return os.fstat(self._fh.fileno())
+    def read(self, n): return self._fh.read(n)
+    def write(self, data): self._fh.write(data)
+    def __enter__(self): return self
+    def __exit__(self, *a): self._fh.close()
+
+
+class _Attr:
+    def __init__(self, filename, st):
+        self.filename, self.st_mode, self.st_size, self.st_mtime = filename, st.st_mode, st.st_size, st.st_mtime
+
+
+class _Channel:
+    closed = False
+    def get_transport(self): return self
+    def is_active(self): return True
+
+
+class FakeSFTP:
+    """The slice of paramiko.SFTPClient the connector uses, backed by a local directory."""
+
+    def __init__(self, root):
+        self.root = str(root)
+
+    def get_channel(self):
+        return _Channel()
+
+    def _p(self, path):
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def open(self, path, mode="rb"):
+        return _FakeFile(open(self._p(path), mode))
+
+    def stat(self, path):
+        return os.stat(self._p(path))
+
+    def mkdir(self, path):
+        os.mkdir(self._p(path))
+
+    def listdir_attr(self, path):
+        return [_Attr(n, os.stat(os.path.join(self._p(path), n))) for n in os.listdir(self._p(path))]
+
+
+class FakePool(SFTPSessionPool):
+    """Real slot accounting in lease(); channels come from FakeSFTP instead of a transport."""
+
+    def __init__(self, root, max_channels=8):
+        super().__init__(idle_ttl=0, max_channels=max_channels)
+        self.root   = root
+        self.active = 0
+        self.peak   = 0
+
+    def _borrow(self, key, connector):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        return FakeSFTP(self.root)
+
+    def _release(self, key, sftp, reusable):
+        with self._lock:
+            self.active -= 1
+
+
+def _tree(base, files):
+    for rel, data in files.items():
+        path = base / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+@pytest.fixture
+def remote(tmp_path):
+    root = tmp_path / "remote"
+    root.mkdir()
+    return root
+
+
+@pytest.fixture
+def pool(remote, monkeypatch):
+    pool = FakePool(remote)
+    monkeypatch.setattr(sftp_mcp, "get_sftp_pool", lambda: pool)
+    return pool
+
+
+@pytest.fixture
+def conn():
+    return SFTPConnector(host="sftp.example", username="u", password="p")
+
+
+# ── _glob_base ────────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("path, base", [
+    ("/outbound/*.csv", "/outbound"),
+    ("/data/**/*.gz", "/data"),
+    ("/a/b/c?.txt", "/a/b"),
+    ("/*.csv", "/"),
+    ("*.csv", "."),
+    ("reports/2024-[01]*/x.csv", "reports"),
+    ("/plain/file.txt", "/plain/file.txt"),
+])
+def test_glob_base(path, base):
+    assert _glob_base(path, "/") == base
+
+
+# ── _plan_upload ──────────────────────────────────────────────────────────────
+
+def test_plan_upload_single_file(tmp_path, conn):
+    _tree(tmp_path, {"a.csv": b"123"})
+    src = str(tmp_path / "a.csv")
+    assert conn._plan_upload(src, "/in/", None, True) == [(src, "/in/a.csv", 3)]
+    assert conn._plan_upload(src, "/in/renamed.csv", None, True) == [(src, "/in/renamed.csv", 3)]
+
+
+def test_plan_upload_directory_mirrors_tree(tmp_path, conn):
+    _tree(tmp_path / "out", {"a.csv": b"1", "sub/b.csv": b"22", "sub/c.txt": b"333"})
+    plan = conn._plan_upload(str(tmp_path / "out"), "/in", None, True)
+    assert [(dst, size) for _, dst, size in plan] == [("/in/a.csv", 1), ("/in/sub/b.csv", 2), ("/in/sub/c.txt", 3)]
+
+    flat = conn._plan_upload(str(tmp_path / "out"), "/in", None, False)
+    assert [dst for _, dst, _ in flat] == ["/in/a.csv"]
+
+    csv = conn._plan_upload(str(tmp_path / "out"), "/in", "*.csv", True)
+    assert [dst for _, dst, _ in csv] == ["/in/a.csv", "/in/sub/b.csv"]
+
+
+def test_plan_upload_glob_keeps_paths_below_base(tmp_path, conn):
+    _tree(tmp_path / "out", {"a.csv": b"1", "x/b.csv": b"22", "x/y/c.csv": b"333", "x/d.txt": b"4"})
+    plan = conn._plan_upload(str(tmp_path / "out" / "**" / "*.csv"), "/in", None, True)
+    assert [dst for _, dst, _ in plan] == ["/in/a.csv", "/in/x/b.csv", "/in/x/y/c.csv"]
+
+
+# ── _plan_download ────────────────────────────────────────────────────────────
+
+def test_plan_download_single_file(tmp_path, remote, pool, conn):
+    _tree(remote, {"out/a.csv": b"123"})
+    dest = tmp_path / "local"
+    dest.mkdir()
+    assert conn._plan_download(str(dest), "/out/a.csv", None, True) == [("/out/a.csv", str(dest / "a.csv"), 3)]
+    assert conn._plan_download(str(dest / "b.csv"), "/out/a.csv", None, True) == \
+        [("/out/a.csv", str(dest / "b.csv"), 3)]
+
+
+def test_plan_download_directory_and_glob(tmp_path, remote, pool, conn):
+    _tree(remote, {"out/a.csv": b"1", "out/sub/b.csv": b"22", "out/sub/c.txt": b"333"})
+    dest = str(tmp_path / "local")
+
+    plan = conn._plan_download(dest, "/out", None, True)
+    assert [(src, dst) for src, dst, _ in plan] == [
+        ("/out/a.csv", os.path.join(dest, "a.csv")),
+        ("/out/sub/b.csv", os.path.join(dest, "sub", "b.csv")),
+        ("/out/sub/c.txt", os.path.join(dest, "sub", "c.txt")),
+    ]
+    assert [src for src, _, _ in conn._plan_download(dest, "/out", None, False)] == ["/out/a.csv"]
+    assert [src for src, _, _ in conn._plan_download(dest, "/out/*.csv", None, True)] == ["/out/a.csv"]
+    assert [src for src, _, _ in conn._plan_download(dest, "/out/*/*.csv", None, True)] == ["/out/sub/b.csv"]
+
+
+# ── lease slot accounting ─────────────────────────────────────────────────────
+
+def test_nested_lease_on_same_host_rides_outer_slot(remote, conn):
+    pool = FakePool(remote, max_channels=1)
+    with pool.lease(conn):
+        with pool.lease(conn):           # would deadlock if it waited for a second slot
+            assert pool.active == 2
+    assert pool._held.depth[("sftp.example", 22)] == 0
+    slots = pool._slots(pool.make_key(conn))
+    assert slots.acquire(blocking=False)  # the one slot was given back exactly once
+    slots.release()
+
+
+def test_lease_waits_for_a_slot_held_by_another_thread(remote, conn):
+    pool      = FakePool(remote, max_channels=1)
+    entered   = threading.Event()
+    release   = threading.Event()
+    got_slot  = threading.Event()
+
+    def holder():
+        with pool.lease(conn):
+            entered.set()
+            release.wait(5)
+
+    def waiter():
+        with pool.lease(conn):
+            got_slot.set()
+
+    t1 = threading.Thread(target=holder); t1.start()
+    entered.wait(5)
+    t2 = threading.Thread(target=waiter); t2.start()
+    assert not got_slot.wait(0.2)        # another thread's lease is not treated as nested
+    release.set()
+    assert got_slot.wait(5)
+    t1.join(); t2.join()
+    assert pool.peak == 1
+
+
+def test_failed_nested_lease_still_unwinds_depth(remote, conn):
+    pool = FakePool(remote, max_channels=1)
+    with pytest.raises(RuntimeError):
+        with pool.lease(conn):
+            with pool.lease(conn):
+                raise RuntimeError("boom")
+    assert pool._held.depth[("sftp.example", 22)] == 0
+    with pool.lease(conn):
+        pass
+
+
+def test_worker_cap():
+    pool = SFTPSessionPool(max_channels=8)
+    assert pool.worker_cap(4) == 4
+    assert pool.worker_cap(32) == 8
+    assert pool.worker_cap(8, leases_per_worker=2) == 4
+    assert SFTPSessionPool(max_channels=1).worker_cap(4, leases_per_worker=2) == 1
+
+
+# ── transfer ──────────────────────────────────────────────────────────────────
+
+def test_transfer_upload_directory(tmp_path, remote, pool, conn):
+    files = {f"d{i % 3}/f{i}.bin": os.urandom(1000 + i) for i in range(12)}
+    _tree(tmp_path / "out", files)
+    seen = []
+    res = conn.transfer("up", str(tmp_path / "out"), "/in", max_workers=4, callback=seen.append)
+    assert (res["transferred"], res["failed"]) == (12, 0)
+    assert res["bytes"] == sum(len(d) for d in files.values()) == sum(seen)
+    for rel, data in files.items():
+        assert (remote / "in" / rel).read_bytes() == data
+    assert pool.peak <= 4
+
+
+def test_transfer_download_glob(tmp_path, remote, pool, conn):
+    files = {"out/a.csv": b"a" * 10, "out/b.csv": b"b" * 20, "out/c.txt": b"c"}
+    _tree(remote, files)
+    dest = tmp_path / "local"
+    res = conn.transfer("down", str(dest), "/out/*.csv", max_workers=2)
+    assert (res["transferred"], res["bytes"]) == (2, 30)
+    assert sorted(os.listdir(dest)) == ["a.csv", "b.csv"]
+    assert (dest / "b.csv").read_bytes() == b"b" * 20
+
+
+def test_transfer_reports_per_file_errors(tmp_path, remote, pool, conn, monkeypatch):
+    _tree(tmp_path / "out", {"ok.bin": b"1", "bad.bin": b"2"})
+    real_put = sftp_mcp._put
+
+    def flaky_put(sftp, src, dst, *a, **kw):
+        if src.endswith("bad.bin"):
+            raise PermissionError("denied")
+        return real_put(sftp, src, dst, *a, **kw)
+
+    monkeypatch.setattr(sftp_mcp, "_put", flaky_put)
+    res = conn.transfer("up", str(tmp_path / "out"), "/in")
+    assert (res["transferred"], res["failed"]) == (1, 1)
+    assert res["errors"][0]["path"].endswith("bad.bin") and "denied" in res["errors"][0]["error"]
+    assert (remote / "in" / "ok.bin").read_bytes() == b"1"
+    assert pool.active == 0
+
+
+def test_transfer_caps_workers_at_channel_limit(tmp_path, remote, conn, monkeypatch):
+    pool = FakePool(remote, max_channels=2)
+    monkeypatch.setattr(sftp_mcp, "get_sftp_pool", lambda: pool)
+    _tree(tmp_path / "out", {f"f{i}": b"x" * 100 for i in range(10)})
+    res = conn.transfer("up", str(tmp_path / "out"), "/in", max_workers=16)
+    assert res["transferred"] == 10
+    assert pool.peak <= 2
+
+
+def test_transfer_rejects_bad_direction(conn):
+    with pytest.raises(ValueError):
+        conn.transfer("sideways", "/tmp/x", "/in")
@@ -0,0 +1,36 @@
+import pytest
+
+from sql_cache import is_cacheable
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * FROM orders",
+    "  with recent AS (SELECT id FROM orders) SELECT * FROM recent",
+    "SELECT note FROM audit WHERE note = 'delete into update'",
+    "SELECT id -- insert later\nFROM t",
+])
+def test_plain_reads_are_cacheable(query):
+    assert is_cacheable(query)
+
+
+@pytest.mark.parametrize("query", [
+    "WITH stale AS (SELECT id FROM orders WHERE age > 30) DELETE FROM orders WHERE id IN (SELECT id FROM stale)",
+    "WITH x AS (SELECT 1 AS id) UPDATE t SET flag = 1 FROM t JOIN x ON x.id = t.id",
+    "WITH x AS (SELECT 1 AS id) INSERT INTO t SELECT id FROM x",
+    "WITH src AS (SELECT * FROM s) MERGE INTO t USING src ON t.id = src.id WHEN MATCHED THEN DELETE;",
+])
+def test_cte_with_dml_bypasses_cache(query):
+    assert not is_cacheable(query)
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * INTO #tmp FROM orders",
+    "select id, name into archive.orders_2024 from orders",
+])
+def test_select_into_bypasses_cache(query):
+    assert not is_cacheable(query)
+
+
+def test_non_select_bypasses_cache():
+    assert not is_cacheable("EXEC dbo.refresh_stats")
+    assert not is_cacheable("")
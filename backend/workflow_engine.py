@@ -5,20 +5,25 @@ Sprint 2 additions:
   - set_variable / get_variable nodes  — persistent key-value store per workflow
   - code node                          — inline Python execution in sandbox
   - call_workflow node                 — execute a sub-workflow inline, chain output
+  - map node                           — fan a sub-workflow / node template out over a list
   - Error workflow routing             — on failure, fire Workflow.settings.error_workflow_id
   - All blocking I/O in asyncio.to_thread (_t helper) — unchanged from Sprint 1
 """
 
+import ast
 import asyncio
 import builtins
 import functools
+import itertools
 import json
 import logging
+import os
 import re
 import textwrap
+import threading
 import time
 import traceback
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, AsyncGenerator, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
@@ -43,6 +48,28 @@ def node_handler(t):
     return dec
 
 
+class NodeSuspended(Exception):
+    """
+    Raised by a handler to park the run instead of blocking: the engine stores
+    its state in a RunWait row and returns with status "waiting". The sensor
+    service resumes the run later, calling the same handler with resume=result.
+    """
+
+    def __init__(self, kind: str, spec: dict, next_check_at: datetime, timeout_at: Optional[datetime] = None,
+                 poke_interval: float = 60, checks: int = 0):
+        super().__init__(f"waiting on {kind}")
+        self.kind          = kind
+        self.spec          = spec
+        self.next_check_at = next_check_at
+        self.timeout_at    = timeout_at
+        self.poke_interval = poke_interval
+        self.checks        = checks
+
+
+def _json_safe(value):
+    return json.loads(json.dumps(value, default=str))
+
+
 # ── Node Logger ───────────────────────────────────────────────────────────────
 
 def _ts():
@@ -178,8 +205,9 @@ class WorkflowEngine:
         run_id: str,
         trigger_data: dict = None,
         _depth: int = 0,             # call_workflow recursion guard
+        resume_wait_id: str = None,  # RunWait to resume a parked run from
     ) -> dict:
-        from database import Workflow, WorkflowRun, NodeRun
+        from database import Workflow, WorkflowRun, NodeRun, RunWait
 
         if _depth > 5:
             raise RecursionError("call_workflow depth limit (5) exceeded")
@@ -196,8 +224,9 @@ class WorkflowEngine:
         run = self._db.query(WorkflowRun).filter_by(id=run_id).first()
         if not run:
             raise ValueError(f"Run {run_id!r} not found")
-        run.status     = "running"
-        run.started_at = datetime.utcnow()
+        run.status = "running"
+        if not resume_wait_id:
+            run.started_at = datetime.utcnow()
         self._db.commit()
 
         # Load persisted variables for expression resolution
@@ -209,6 +238,9 @@ class WorkflowEngine:
         failed        = False
         fail_error    = None
         fail_node     = None
+        done: list    = []             # node IDs finished (kept when the run parks)
+        resume_node   = None
+        resume_result = None
 
         # ── Branch-aware execution setup ──────────────────────────────────
         # Build two indexes from the edge list:
@@ -260,9 +292,24 @@ class WorkflowEngine:
             return True           # no matching branch -> suppress
         # ──────────────────────────────────────────────────────────────────
 
+        # ── Resuming a parked run: restore state, skip finished nodes ──────
+        if resume_wait_id:
+            wait  = self._db.query(RunWait).filter_by(id=resume_wait_id).first()
+            if wait is None:
+                raise ValueError(f"Cannot resume run {run_id!r}: wait {resume_wait_id!r} not found")
+            state = wait.state or {}
+            node_outputs.update(state.get("node_outputs", {}))
+            done = list(state.get("done", []))
+            suppressed.update(state.get("suppressed", []))
+            _if_outputs.update(state.get("if_outputs", {}))
+            failed, fail_error, fail_node = state.get("failed", False), state.get("fail_error"), state.get("fail_node")
+            resume_node, resume_result    = wait.node_id, wait.result or {}
+            wait.status = "done"
+            self._db.commit()
+
         for node_id in order:
             node = nodes.get(node_id)
-            if not node:
+            if not node or node_id in done:
                 continue
 
             # ── Skip suppressed branch nodes ──────────────────────────────
@@ -281,6 +328,7 @@ class WorkflowEngine:
                 )
                 self._db.add(nr_skip)
                 self._db.commit()
+                done.append(node_id)
                 continue
             # ─────────────────────────────────────────────────────────────
 
@@ -288,24 +336,33 @@ class WorkflowEngine:
             on_fail   = props.get("on_failure", "stop")
             max_retry = int(props.get("retries", 0))
 
-            nr = NodeRun(
-                workflow_run_id=run_id,
-                node_id=node_id,
-                node_type=node["type"],
-                node_title=node.get("title", node_id),
-                status="running",
-                started_at=datetime.utcnow(),
-                attempt=1,
-            )
-            self._db.add(nr)
+            nr = None
+            if node_id == resume_node:
+                nr = self._db.query(NodeRun).filter_by(
+                    workflow_run_id=run_id, node_id=node_id, status="waiting").first()
+            if nr:
+                nr.status = "running"
+            else:
+                nr = NodeRun(
+                    workflow_run_id=run_id,
+                    node_id=node_id,
+                    node_type=node["type"],
+                    node_title=node.get("title", node_id),
+                    status="running",
+                    started_at=datetime.utcnow(),
+                    attempt=1,
+                )
+                self._db.add(nr)
             self._db.commit()
 
-            resolver = ExpressionResolver(node_outputs, wf.name, run_id, variables)
-            rnode    = {**node, "props": resolver.resolve_props(props)}
-            nlog     = NodeLogger()
-            t0       = time.time()
-            output   = None
-            last_err = None
+            resolver  = ExpressionResolver(node_outputs, wf.name, run_id, variables)
+            rnode     = {**node, "props": resolver.resolve_props(props)}
+            nlog      = NodeLogger()
+            t0        = time.time() - (datetime.utcnow() - nr.started_at).total_seconds()
+            log_head  = f"{nr.stdout_log}\n" if nr.stdout_log else ""
+            output    = None
+            last_err  = None
+            suspended = None
 
             for attempt in range(max_retry + 1):
                 nr.attempt = attempt + 1
@@ -320,25 +377,57 @@ class WorkflowEngine:
                         output = await handler(
                             rnode, self._creds, owner_id,
                             node_outputs, nlog,
-                            engine=self, db=self._db, workflow_id=workflow_id, depth=_depth,
+                            engine=self, db=self._db, workflow_id=workflow_id, depth=_depth, run_id=run_id,
+                            resume=resume_result if node_id == resume_node else None,
                         )
                     else:
                         nlog.warn(f"No handler for node type {node['type']!r}")
                         output = {"warning": f"no handler for {node['type']}"}
                     last_err = None
                     break
+                except NodeSuspended as exc:
+                    suspended = exc
+                    last_err  = None
+                    break
                 except Exception as exc:
                     last_err = exc
                     nlog.error(f"Attempt {attempt + 1} failed: {exc}")
 
+            # ── Park the run: the sensor service resumes it at this node ──
+            if suspended is not None:
+                nr.status     = "waiting"
+                nr.stdout_log = log_head + nlog.stdout()
+                self._db.add(RunWait(
+                    workflow_run_id=run_id, workflow_id=workflow_id, owner_id=owner_id, node_id=node_id,
+                    kind=suspended.kind, spec=_json_safe(suspended.spec), poke_interval=suspended.poke_interval,
+                    next_check_at=suspended.next_check_at, timeout_at=suspended.timeout_at,
+                    checks=suspended.checks,
+                    state=_json_safe({
+                        "node_outputs": node_outputs, "done": done, "suppressed": sorted(suppressed),
+                        "if_outputs": _if_outputs, "failed": failed,
+                        "fail_error": str(fail_error) if fail_error else None, "fail_node": fail_node,
+                    }),
+                ))
+                run.status = "waiting"
+                self._db.commit()
+                logger.info(f"Run {run_id} parked at node {node.get('title', node_id)!r} ({suspended.kind})")
+                return {
+                    "run_id":     run_id,
+                    "status":     "waiting",
+                    "duration":   (datetime.utcnow() - run.started_at).total_seconds(),
+                    "outputs":    node_outputs,
+                    "waiting_on": node.get("title", node_id),
+                }
+
             nr.duration_seconds = round(time.time() - t0, 3)
             nr.completed_at     = datetime.utcnow()
+            done.append(node_id)
 
             if last_err:
                 nlog.error(f"Node FAILED after {nr.attempt} attempt(s)")
                 nr.status        = "failed"
                 nr.error_message = str(last_err)
-                nr.stdout_log    = nlog.stdout()
+                nr.stdout_log    = log_head + nlog.stdout()
                 self._db.commit()
                 failed     = True
                 fail_error = last_err
@@ -349,7 +438,7 @@ class WorkflowEngine:
                 nlog.ok(f"Completed in {nr.duration_seconds}s")
                 nr.status      = "success"
                 nr.output_data = output or {}
-                nr.stdout_log  = nlog.stdout()
+                nr.stdout_log  = log_head + nlog.stdout()
                 # If set_variable handler updated variables dict, reload
                 if node["type"] == "set_variable" and output:
                     variables[output.get("key", "")] = output.get("value")
@@ -359,6 +448,12 @@ class WorkflowEngine:
                 node_outputs[node.get("title", node_id)] = output or {}
                 self._db.commit()
 
+        # Listing watermarks advance only once every node has succeeded
+        watermarks = node_outputs.pop("__watermarks", {})
+        if not failed:
+            for _key, _mark in watermarks.items():
+                _set_variable(self._db, owner_id, workflow_id, _key, _mark)
+
         run.status           = "failed" if failed else "success"
         run.completed_at     = datetime.utcnow()
         run.duration_seconds = (run.completed_at - run.started_at).total_seconds()
@@ -435,7 +530,7 @@ class WorkflowEngine:
                         "attempt":  nr.attempt,
                         "log":      (nr.stdout_log or "")[-1200:],
                     }
-            if run.status in ("success", "failed", "cancelled"):
+            if run.status in ("success", "failed", "cancelled", "waiting"):
                 yield {
                     "type":     "run_complete",
                     "run_id":   run.id,
@@ -450,7 +545,7 @@ class WorkflowEngine:
 # NODE HANDLERS
 # ─────────────────────────────────────────────────────────────────────────────
 # All handlers have signature:
-#   async def handle_X(node, creds, owner_id, ctx, nlog, *, engine, db, workflow_id, depth)
+#   async def handle_X(node, creds, owner_id, ctx, nlog, *, engine, db, workflow_id, depth, run_id, resume)
 
 @node_handler("trigger")
 async def handle_trigger(node, creds, owner_id, ctx, nlog, **kw):
@@ -466,16 +561,90 @@ async def handle_webhook(node, creds, owner_id, ctx, nlog, **kw):
     return {"webhook_received": True, "payload": payload}
 
 
+# Waits longer than this park the run (durable across restarts) instead of sleeping in memory
+DURABLE_WAIT_THRESHOLD = float(os.getenv("FLOWFORGE_DURABLE_WAIT_THRESHOLD", "300"))
+
+
 @node_handler("wait")
 async def handle_wait(node, creds, owner_id, ctx, nlog, **kw):
     props   = node.get("props", {})
     dur     = float(props.get("duration", 30))
     unit    = props.get("unit", "seconds")
     seconds = dur * (60 if unit == "minutes" else 3600 if unit == "hours" else 1)
+    if kw.get("resume"):
+        waited = kw["resume"].get("waited_seconds", seconds)
+        nlog.ok(f"Wait complete — resumed after {waited}s")
+        return {"waited_seconds": waited, "durable": True}
+
+    # Only top-level runs can be parked; a nested run would otherwise hold its parent
+    # in memory for the whole wait, so long waits there are rejected instead
+    if seconds > DURABLE_WAIT_THRESHOLD and kw.get("depth"):
+        raise ValueError(f"Wait of {seconds:.0f}s exceeds FLOWFORGE_DURABLE_WAIT_THRESHOLD "
+                         f"({DURABLE_WAIT_THRESHOLD:.0f}s) inside a sub-workflow or map item — "
+                         f"move the wait to the top-level workflow")
+    if seconds > DURABLE_WAIT_THRESHOLD and kw.get("db") is not None:
+        resume_at = datetime.utcnow() + timedelta(seconds=seconds)
+        nlog.info(f"Waiting {dur} {unit} ({seconds:.0f}s) — parking run until {resume_at.isoformat()}Z")
+        raise NodeSuspended("timer", {"kind": "timer", "credential": "", "seconds": seconds},
+                            next_check_at=resume_at, poke_interval=seconds)
     nlog.info(f"Waiting {dur} {unit} ({seconds:.0f}s)…")
-    await asyncio.sleep(min(seconds, 300))
+    await asyncio.sleep(seconds)
     nlog.ok("Wait complete")
-    return {"waited_seconds": seconds}
+    return {"waited_seconds": seconds, "durable": False}
+
+
+# ── Sensor (deferrable wait on an external condition) ─────────────────────────
+
+def _sensor_outcome(spec_kind: str, result: dict, nlog) -> dict:
+    status, detail = result["status"], result.get("detail") or {}
+    if status == "timed_out":
+        last = f" (last error: {detail['last_error']})" if detail.get("last_error") else ""
+        raise TimeoutError(f"Sensor {spec_kind}: condition not met after {result.get('checks', 0)} check(s){last}")
+    if status == "failed":
+        raise AssertionError(f"Sensor {spec_kind}: reached a failed state {detail}")
+    nlog.ok(f"Condition met after {result.get('checks', 1)} check(s), {result.get('waited_seconds', 0)}s")
+    return {"condition_met": True, "kind": spec_kind, "checks": result.get("checks", 1),
+            "waited_seconds": result.get("waited_seconds", 0), **detail}
+
+
+@node_handler("sensor")
+async def handle_sensor(node, creds, owner_id, ctx, nlog, **kw):
+    from sensor_service import sensor_spec, describe, check_batch, build_sensor_connector
+    props   = node.get("props", {})
+    spec    = sensor_spec(props)
+    poke    = float(props.get("poke_interval") or 60)
+    timeout = float(props.get("timeout") or 86400)
+    if kw.get("resume"):
+        nlog.info(f"Resumed by sensor service: {kw['resume'].get('status')}")
+        return _sensor_outcome(spec["kind"], kw["resume"], nlog)
+
+    nlog.section(f"SENSOR {spec['kind']} — {describe(spec)}")
+    connector = build_sensor_connector(creds, owner_id, spec)
+    t0, checks = time.time(), 0
+    # Park unless asked to poke in-process; sub-workflows and runs without a DB always poke
+    park = props.get("mode", "reschedule") != "poke" and kw.get("db") is not None and not kw.get("depth")
+    while True:
+        checks += 1
+        try:
+            status, detail = (await _t(check_batch, spec["kind"], connector, [spec]))[0]
+        except Exception as e:
+            status, detail = "pending", {"error": str(e)}
+            nlog.warn(f"Check failed: {e}")
+        waited = round(time.time() - t0, 1)
+        if status != "pending":
+            return _sensor_outcome(spec["kind"], {"status": status, "detail": detail, "checks": checks,
+                                                  "waited_seconds": waited}, nlog)
+        if waited >= timeout:
+            return _sensor_outcome(spec["kind"], {"status": "timed_out", "checks": checks,
+                                                  "detail": {"last_error": detail.get("error")}}, nlog)
+        if park:
+            now = datetime.utcnow()
+            nlog.info(f"Not met yet — parking run; sensor service re-checks every {poke:.0f}s "
+                      f"for up to {timeout:.0f}s")
+            raise NodeSuspended(spec["kind"], spec, next_check_at=now + timedelta(seconds=poke),
+                                timeout_at=now + timedelta(seconds=timeout), poke_interval=poke, checks=checks)
+        nlog.info(f"Not met yet ({checks} check(s)) — poking again in {poke:.0f}s")
+        await asyncio.sleep(min(poke, max(timeout - waited, 0)))
 
 
 @node_handler("if")
@@ -740,6 +909,313 @@ async def handle_call_workflow(node, creds, owner_id, ctx, nlog, **kw):
     }
 
 
+# ── MAP (fan-out over an upstream list) ───────────────────────────────────────
+
+MAP_MAX_CONCURRENCY = int(os.getenv("FLOWFORGE_MAP_MAX_CONCURRENCY", "32"))
+MAP_INLINE_RESULTS  = int(os.getenv("FLOWFORGE_MAP_INLINE_RESULTS", "100"))  # more → JSONL artifact
+ARTIFACT_DIR        = os.getenv("FLOWFORGE_ARTIFACT_DIR", "./artifacts")
+
+
+def _map_items(props: dict, ctx: dict, db=None, owner_id: str = "", workflow_id: str = None):
+    """
+    Resolve the item source for a map node. Returns (iterable, count or None, description).
+
+      items       — "$node.Title.output.field" (braces optional), "$var.key", or a JSON list
+      items_file  — local .jsonl (read lazily) / .json array
+    """
+    src_file = props.get("items_file")
+    if src_file:
+        if src_file.lower().endswith(".jsonl"):
+            def _lines():
+                with open(src_file, encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip():
+                            yield json.loads(line)
+            return _lines(), None, f"file {src_file}"
+        with open(src_file, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if not isinstance(data, list):
+            raise ValueError(f"map: {src_file} does not contain a JSON array")
+        return data, len(data), f"file {src_file}"
+
+    value = props.get("items")
+    if isinstance(value, list):
+        return value, len(value), f"{len(value)} literal item(s)"
+    expr = str(value or "").strip()
+    if expr.startswith("{{") and expr.endswith("}}"):
+        expr = expr[2:-2].strip()
+    if not expr:
+        raise ValueError("map requires 'items' (list expression) or 'items_file'")
+    n = re.match(r"\$node\.(.+?)\.output\.(.+)$", expr)
+    if n:
+        data = ctx.get(n.group(1), {})
+        for part in n.group(2).split("."):
+            data = data.get(part) if isinstance(data, dict) else None
+        source = f"node {n.group(1)!r}.{n.group(2)}"
+    elif expr.startswith("$var."):
+        data, source = _load_variables(db, owner_id, workflow_id).get(expr[5:]) if db else None, expr
+    else:
+        # A JSON list, or a {{$node...}} list the engine already resolved (rendered as a Python literal)
+        try:
+            data, source = json.loads(expr), "JSON literal"
+        except ValueError:
+            try:
+                data, source = ast.literal_eval(expr), "resolved expression"
+            except (ValueError, SyntaxError):
+                raise ValueError(f"map: 'items' must be a $node.<Title>.output.<field> expression or a JSON list, "
+                                 f"got {expr[:80]!r}")
+    if isinstance(data, str):
+        # $var values arrive as JSON text
+        try:
+            data = json.loads(data)
+        except ValueError:
+            pass
+    if not isinstance(data, list):
+        raise ValueError(f"map: {source} is not a list ({type(data).__name__})")
+    return data, len(data), f"{source} ({len(data)} item(s))"
+
+
+def _item_subst(value, item, index: int):
+    """Substitute {{$item}}, {{$item.field}} and {{$index}} in a template value (recursively)."""
+    if isinstance(value, dict):
+        return {k: _item_subst(v, item, index) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_item_subst(v, item, index) for v in value]
+    if not isinstance(value, str) or "{{" not in value:
+        return value
+
+    def _lookup(expr):
+        if expr == "$index":
+            return index
+        out = item
+        for part in expr[len("$item"):].split(".")[1:]:
+            out = out.get(part, "") if isinstance(out, dict) else \
+                  out[int(part)] if isinstance(out, list) and part.isdigit() and int(part) < len(out) else ""
+        return out
+
+    pattern = r"\{\{\s*(\$item(?:\.[^}\s]+)?|\$index)\s*\}\}"
+    whole = re.fullmatch(pattern, value.strip())
+    if whole:
+        return _lookup(whole.group(1))      # keep lists / dicts / numbers intact
+    return re.sub(pattern, lambda m: (lambda v: v if isinstance(v, str) else json.dumps(v, default=str))(
+        _lookup(m.group(1))), value)
+
+
+def _map_template(props: dict) -> Optional[dict]:
+    template = props.get("template")
+    if not template:
+        return None
+    if isinstance(template, str):
+        try:
+            template = json.loads(template)
+        except ValueError:
+            raise ValueError("map: 'template' must be a node object, e.g. {\"type\": \"http\", \"props\": {...}}")
+    if not isinstance(template, dict) or not template.get("type"):
+        raise ValueError("map: 'template' needs a 'type'")
+    if template["type"] in ("trigger", "webhook") or template["type"] not in _HANDLERS:
+        raise ValueError(f"map: template type {template['type']!r} can't be mapped")
+    return template
+
+
+def _max_failures(policy: str, props: dict, count: Optional[int]) -> Optional[int]:
+    """Failures tolerated before the map stops: 0 for fail_fast, None (unbounded) for collect."""
+    if policy == "fail_fast":
+        return 0
+    if policy == "collect":
+        return None
+    raw = str(props.get("max_failures", "10%")).strip()
+    if raw.endswith("%"):
+        if count is None:
+            raise ValueError("map: a percentage max_failures needs a list, not a .jsonl items_file")
+        return int(count * float(raw[:-1]) / 100)
+    return int(raw)
+
+
+def _register_artifact(db, run_id: str, name: str, path: str) -> None:
+    from database import WorkflowRun
+    run = db.query(WorkflowRun).filter_by(id=run_id).first()
+    if run:
+        run.artifacts = {**(run.artifacts or {}), name: path}
+        db.commit()
+
+
+@node_handler("map")
+async def handle_map(node, creds, owner_id, ctx, nlog, **kw):
+    """
+    Run a sub-workflow or an inline node template once per item of an upstream
+    list, at most max_concurrency items at a time. Per-item results are
+    aggregated in item order, or streamed to a JSONL artifact for large lists.
+    """
+    import uuid
+    from database import SessionLocal, Workflow, WorkflowRun, NodeRun
+    from credential_manager import CredentialManager
+
+    props       = node.get("props", {})
+    engine      = kw.get("engine")
+    db          = kw.get("db")
+    depth       = kw.get("depth", 0)
+    run_id      = kw.get("run_id")
+    sub_wf_id   = props.get("workflow_id", "")
+    template    = _map_template(props)
+    input_data  = props.get("input_data") or {}
+    concurrency = max(1, min(int(props.get("max_concurrency") or 4), MAP_MAX_CONCURRENCY))
+    policy      = str(props.get("failure_policy", "fail_fast")).lower()
+
+    if bool(sub_wf_id) == bool(template):
+        raise ValueError("map node needs exactly one of 'workflow_id' or 'template'")
+    if policy not in ("fail_fast", "collect", "threshold"):
+        raise ValueError(f"map: failure_policy must be fail_fast, collect or threshold, got {policy!r}")
+    if sub_wf_id and (not engine or not db):
+        raise RuntimeError("map with workflow_id requires engine and db context")
+    if depth + 1 > 5:
+        raise RecursionError("map depth limit (5) exceeded")
+
+    items, count, source = _map_items(props, ctx, db, owner_id, kw.get("workflow_id"))
+    max_failures = _max_failures(policy, props, count)
+    if sub_wf_id:
+        sub_wf = db.query(Workflow).filter_by(id=sub_wf_id).first()
+        if not sub_wf:
+            raise ValueError(f"Sub-workflow {sub_wf_id!r} not found")
+        target = f"workflow {sub_wf.name!r}"
+    else:
+        target = f"{template['type']} template"
+        resolver = ExpressionResolver(ctx, variables=_load_variables(db, owner_id, kw.get("workflow_id"))
+                                      if db else {})
+
+    artifact     = str(props.get("artifact", "auto")).lower()   # auto | true | false
+    use_artifact = bool(run_id) and (_is_true(artifact) or
+                                     (artifact == "auto" and (count is None or count > MAP_INLINE_RESULTS)))
+    nlog.section(f"MAP {target} over {source}")
+    nlog.info(f"Concurrency     : {concurrency}")
+    nlog.info(f"Failure policy  : {policy}" + (f" (max {max_failures} failure(s))" if policy == "threshold" else ""))
+
+    async def _run_workflow(index, item):
+        # Own session per item: concurrent sub-runs must not share the parent's session
+        sdb = SessionLocal()
+        try:
+            sub_run_id = f"run-{str(uuid.uuid4())[:8]}"
+            trigger    = {**input_data, "item": item, "index": index}
+            sdb.add(WorkflowRun(id=sub_run_id, workflow_id=sub_wf_id, triggered_by="map",
+                                trigger_data=_json_safe(trigger), status="pending", started_at=datetime.utcnow()))
+            sdb.commit()
+            sub_engine = WorkflowEngine(db_session=sdb, credential_manager=CredentialManager(sdb))
+            result = await sub_engine.execute(sub_wf_id, owner_id, sub_run_id, trigger_data=trigger,
+                                              _depth=depth + 1)
+            outputs = {k: v for k, v in result.get("outputs", {}).items() if not k.startswith("__")}
+            if result["status"] != "success":
+                failed_nr = sdb.query(NodeRun).filter_by(workflow_run_id=sub_run_id, status="failed").first()
+                reason    = failed_nr.error_message if failed_nr else result["status"]
+                raise RuntimeError(f"sub-run {sub_run_id} {result['status']}: {reason}")
+            return {"sub_run_id": sub_run_id, "outputs": outputs}
+        finally:
+            sdb.close()
+
+    async def _run_template(index, item):
+        tnode = _item_subst(template, item, index)
+        tnode = {"id": f"{node.get('id', 'map')}[{index}]", "title": f"{node.get('title', 'map')}[{index}]",
+                 **tnode, "props": resolver.resolve_props(tnode.get("props") or {})}
+        if db is None:
+            return await _HANDLERS[tnode["type"]](
+                tnode, creds, owner_id, {**ctx, "__item": item, "__index": index}, NodeLogger(),
+                engine=engine, db=None, workflow_id=kw.get("workflow_id"), depth=depth + 1, run_id=run_id,
+            )
+        # Own session (and engine / credential manager on it) per item, as for sub-runs
+        sdb = SessionLocal()
+        try:
+            sub_creds  = CredentialManager(sdb)
+            sub_engine = WorkflowEngine(db_session=sdb, credential_manager=sub_creds)
+            return await _HANDLERS[tnode["type"]](
+                tnode, sub_creds, owner_id, {**ctx, "__item": item, "__index": index}, NodeLogger(),
+                engine=sub_engine, db=sdb, workflow_id=kw.get("workflow_id"), depth=depth + 1, run_id=run_id,
+            )
+        finally:
+            sdb.close()
+
+    run_one  = _run_workflow if sub_wf_id else _run_template
+    it       = iter(enumerate(items))
+    stop     = asyncio.Event()
+    results  = {} if not use_artifact else None
+    sample   = []
+    failures = []
+    stats    = {"succeeded": 0, "failed": 0}
+    t0       = time.time()
+
+    artifact_path = None
+    fh = None
+    if use_artifact:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", node.get("title", node.get("id", "map"))).strip("_") or "map"
+        artifact_path = os.path.join(ARTIFACT_DIR, run_id, f"{slug}.jsonl")
+        os.makedirs(os.path.dirname(artifact_path), exist_ok=True)
+        fh = open(artifact_path, "w", encoding="utf-8")
+
+    def _record(index, item, status, output=None, error=None):
+        rec = {"index": index, "status": status}
+        if status == "success":
+            rec["output"] = output
+            stats["succeeded"] += 1
+        else:
+            rec["item"], rec["error"] = item, error
+            stats["failed"] += 1
+            if len(failures) < 50:
+                failures.append({"index": index, "item": str(item)[:200], "error": error[:500]})
+            if len(failures) <= 10:
+                nlog.warn(f"Item {index} failed: {error[:300]}")
+            if max_failures is not None and stats["failed"] > max_failures:
+                stop.set()
+        if fh:
+            fh.write(json.dumps(rec, default=str) + "\n")
+            if len(sample) < 20:
+                sample.append(rec)
+        else:
+            results[index] = rec
+        done_n = stats["succeeded"] + stats["failed"]
+        if count and count >= 20 and done_n % max(count // 10, 1) == 0:
+            nlog.info(f"Progress {done_n}/{count} — {stats['failed']} failed")
+
+    async def _worker():
+        for index, item in it:
+            if stop.is_set():
+                break
+            try:
+                _record(index, item, "success", output=_json_safe(await run_one(index, item)))
+            except Exception as e:
+                _record(index, item, "failed", error=str(e) or type(e).__name__)
+
+    try:
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+    finally:
+        if fh:
+            fh.close()
+    if fh:
+        _register_artifact(db, run_id, os.path.basename(artifact_path), artifact_path)
+
+    processed = stats["succeeded"] + stats["failed"]
+    total     = count if count is not None else processed + sum(1 for _ in it)
+    elapsed   = round(time.time() - t0, 3)
+    summary = {
+        "count":       total,
+        "succeeded":   stats["succeeded"],
+        "failed":      stats["failed"],
+        "not_run":     total - processed,
+        "failures":    failures,
+        "duration_s":  elapsed,
+        "items_per_s": round(processed / elapsed, 2) if elapsed else None,
+    }
+    if fh:
+        summary.update({"artifact": artifact_path, "results_sample": sample})
+        nlog.info(f"Results streamed to {artifact_path}")
+    else:
+        summary["results"] = [results[i] for i in sorted(results)]
+
+    if stop.is_set():
+        nlog.error(f"Stopped after {stats['failed']} failure(s) — {summary['not_run']} item(s) not run")
+        first = failures[0]
+        raise RuntimeError(f"map: {stats['failed']} of {processed} item(s) failed ({policy}); "
+                           f"first: item {first['index']}: {first['error']}")
+    nlog.ok(f"Mapped {processed} item(s) in {elapsed}s — {stats['succeeded']} succeeded, {stats['failed']} failed")
+    return summary
+
+
 # ── AIRFLOW ───────────────────────────────────────────────────────────────────
 
 @node_handler("airflow")
@@ -1305,6 +1781,128 @@ async def handle_airflow(node, creds, owner_id, ctx, nlog, **kw):
 
 # ── SQL ───────────────────────────────────────────────────────────────────────
 
+def _iter_bulk_rows(props: dict, ctx: dict):
+    """
+    Resolve the row source for a sql bulk_insert node.
+    Returns (columns, row_iterable, source_description).
+
+      source_node  + source_field — complete rows from an upstream node output, e.g. "rows"
+                     from a sql node with return_rows (rows_sample is a truncated, stringified
+                     preview and is rejected)
+      source_file  — local .csv (header row) / .json (array) / .jsonl file
+    """
+    import csv
+    columns = props.get("columns") or []
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(",") if c.strip()]
+
+    def _from_records(records):
+        records = iter(records)
+        first   = next(records, None)
+        if first is None:
+            return list(columns), iter(())
+        cols = list(columns) or (list(first.keys()) if isinstance(first, dict) else [])
+        if not cols:
+            raise ValueError("bulk_insert: 'columns' required when rows are lists")
+        rows = ([r.get(c) for c in cols] if isinstance(r, dict) else list(r)
+                for r in itertools.chain([first], records))
+        return cols, rows
+
+    src_file = props.get("source_file")
+    src_node = props.get("source_node")
+    if src_file:
+        if src_file.lower().endswith(".csv"):
+            with open(src_file, newline="", encoding="utf-8") as fh:
+                header = next(csv.reader(fh), [])
+            cols = list(columns) or header
+            missing = [c for c in cols if c not in header]
+            if missing:
+                raise ValueError(f"bulk_insert: {src_file} has no column(s) {missing}")
+            idx  = [header.index(c) for c in cols]
+            need = max(idx) + 1 if idx else 0
+            def _csv_rows():
+                with open(src_file, newline="", encoding="utf-8") as fh:
+                    reader = csv.reader(fh)
+                    next(reader, None)
+                    for r in reader:
+                        if len(r) < need:
+                            raise ValueError(f"bulk_insert: {src_file} line {reader.line_num}: expected "
+                                             f"{len(header)} fields, got {len(r)}")
+                        yield [r[i] if r[i] != "" else None for i in idx]
+            return cols, _csv_rows(), f"file {src_file}"
+        if src_file.lower().endswith(".jsonl"):
+            def _lines():
+                with open(src_file, encoding="utf-8") as fh:
+                    for line in fh:
+                        if line.strip():
+                            yield json.loads(line)
+            cols, rows = _from_records(_lines())
+            return cols, rows, f"file {src_file}"
+        with open(src_file, encoding="utf-8") as fh:
+            data = json.load(fh)
+        cols, rows = _from_records(data if isinstance(data, list) else data.get("rows", []))
+        return cols, rows, f"file {src_file}"
+    if src_node:
+        field = props.get("source_field")
+        if not field or field == "rows_sample":
+            raise ValueError("bulk_insert: source_field must name a field holding complete rows, e.g. 'rows' "
+                             "from a sql node with return_rows: true (rows_sample is a truncated preview)")
+        upstream = ctx.get(src_node, {})
+        data     = upstream
+        for part in field.split("."):
+            data = data.get(part, []) if isinstance(data, dict) else []
+        if not isinstance(data, list):
+            raise ValueError(f"bulk_insert: {src_node}.{field} is not a list")
+        total = upstream.get("rows_returned", upstream.get("row_count")) if isinstance(upstream, dict) else None
+        if (isinstance(upstream, dict) and _is_true(upstream.get("truncated"))) or \
+                (isinstance(total, int) and len(data) < total):
+            raise ValueError(f"bulk_insert: {src_node}.{field} holds {len(data)} of "
+                             f"{total if total is not None else 'more'} rows — it is truncated")
+        cols, rows = _from_records(data)
+        return cols, rows, f"node {src_node!r}.{field} ({len(data)} rows)"
+    raise ValueError("bulk_insert requires source_node or source_file")
+
+
+async def _sql_bulk_insert(node, connector, ctx, nlog):
+    props      = node.get("props", {})
+    table      = props.get("table", "")
+    chunk_size = int(props.get("chunk_size", 1000))
+    if not table: raise ValueError("bulk_insert requires table")
+
+    columns, rows, src = _iter_bulk_rows(props, ctx)
+    nlog.section(f"SQL Bulk Insert → {table}")
+    nlog.info(f"Source     : {src}")
+    nlog.info(f"Columns    : {', '.join(columns)}")
+    nlog.info(f"Chunk size : {chunk_size}")
+
+    last_log = [0.0]
+
+    def _progress(done, elapsed):
+        if elapsed - last_log[0] < 2:   # throttle: one progress line per ~2s
+            return
+        last_log[0] = elapsed
+        rate = done / elapsed if elapsed > 0 else 0
+        nlog.info(f"  committed {done:>10,} rows  ({rate:,.0f} rows/s)")
+
+    def _run():
+        connector.connect()
+        try:
+            return connector.bulk_insert(table, columns, rows, chunk_size=chunk_size, on_progress=_progress)
+        finally:
+            connector.disconnect()
+
+    stats = await _t(_run)
+    nlog.ok(f"Inserted {stats['rows_inserted']:,} rows in {stats['duration_s']}s "
+            f"({stats['rows_per_sec']:,} rows/s, {stats['chunks']} chunk(s), driver={stats['driver']})")
+
+    min_rows = props.get("min_row_count")
+    if min_rows is not None and stats["rows_inserted"] < int(min_rows):
+        nlog.error(f"FAIL: inserted {stats['rows_inserted']} rows, expected >= {min_rows}")
+        raise AssertionError(f"bulk_insert: inserted {stats['rows_inserted']} rows, expected >= {min_rows}")
+
+    return {"operation": "bulk_insert", "table": table, "columns": columns, **stats}
+
+
 @node_handler("sql")
 async def handle_sql(node, creds, owner_id, ctx, nlog, **kw):
     props = node.get("props", {})
@@ -1312,11 +1910,16 @@ async def handle_sql(node, creds, owner_id, ctx, nlog, **kw):
     query = props.get("query", "SELECT 1")
     fmt   = props.get("export_format", "none")
 
+    if props.get("operation") == "bulk_insert":
+        if not cred: raise ValueError("SQL node missing credential")
+        return await _sql_bulk_insert(node, creds.build_connector(cred, owner_id), ctx, nlog)
+
     expected_row_count  = props.get("expected_row_count")
     min_row_count       = props.get("min_row_count")
     assert_no_rows_flag = props.get("assert_no_rows", False)
     assert_scalar       = props.get("assert_scalar")
     max_sample          = int(props.get("max_sample_rows", 50))
+    return_rows         = _is_true(props.get("return_rows", False))
 
     if not cred: raise ValueError("SQL node missing credential")
 
@@ -1326,13 +1929,23 @@ async def handle_sql(node, creds, owner_id, ctx, nlog, **kw):
 
     connector = creds.build_connector(cred, owner_id)
 
+    # Result cache: per-node cache_ttl overrides the credential's cache_ttl.
+    # Exports always hit the database so the file reflects live data.
+    cache_ttl  = props.get("cache_ttl")
+    cache_ttl  = float(cache_ttl) if cache_ttl not in (None, "") else None
+    cache_tags = props.get("cache_tags") or []
+    if isinstance(cache_tags, str):
+        cache_tags = [t.strip() for t in cache_tags.split(",") if t.strip()]
+    if fmt in ("csv", "xlsx"):
+        cache_ttl = 0
+
     def _run_sql():
-        connector.connect()
+        from sql_cache import cached_query
         try:
             t0   = time.time()
-            rows = connector.execute_query(query)
+            rows, cols, hit = cached_query(connector, query, owner_id=owner_id,
+                                           ttl=cache_ttl, tags=cache_tags)
             qt   = round(time.time() - t0, 3)
-            cols = list(connector.last_column_names)
             output_path = None
             if fmt == "csv":
                 output_path = f"/tmp/sql_{int(time.time())}.csv"
@@ -1340,12 +1953,13 @@ async def handle_sql(node, creds, owner_id, ctx, nlog, **kw):
             elif fmt == "xlsx":
                 output_path = f"/tmp/sql_{int(time.time())}.xlsx"
                 connector.export_to_xlsx(query, output_path)
-            return rows, cols, qt, output_path
+            return rows, cols, qt, output_path, hit
         finally:
             connector.disconnect()
 
-    rows, col_names, qt, output_path = await _t(_run_sql)
-    nlog.ok(f"Executed in {qt}s → {len(rows)} row(s)")
+    rows, col_names, qt, output_path, cache_hit = await _t(_run_sql)
+    if cache_hit: nlog.ok(f"Cache hit in {qt}s → {len(rows)} row(s)")
+    else:         nlog.ok(f"Executed in {qt}s → {len(rows)} row(s)")
 
     if rows:
         nlog.section("Result Sample")
@@ -1567,17 +2181,274 @@ async def handle_sql(node, creds, owner_id, ctx, nlog, **kw):
         "query_time_s":  qt,
         "columns":       [str(c) for c in col_names],
         "rows_sample":   row_sample,
+        **({"rows": _json_safe([dict(zip([str(c) for c in col_names], row)) if col_names else list(row)
+                                for row in rows])} if return_rows else {}),
         "export_path":   output_path,
         "query":         query[:200],
+        "cache_hit":     cache_hit,
         **extracted,        # ← extracted column values promoted to top-level output keys
     }
 
 
 # ── HTTP ──────────────────────────────────────────────────────────────────────
 
+def _is_true(value) -> bool:
+    """Props arrive as real booleans from the editor or as strings after expression resolution."""
+    return value is True or str(value).strip().lower() in ("true", "1", "yes", "on")
+
+
+async def _http_streamed(connector, method, url, req_kwargs, props, nlog, use_async):
+    """
+    stream: true — read the body in chunks under a max_bytes budget, keep only a
+    bounded preview, optionally spill the full body to a file, and evaluate
+    assert_json_field / assert_body_contains incrementally.
+    """
+    from connectors.http_mcp import ResponseStream, STREAM_CHUNK_SIZE
+    exp_status = int(props.get("expected_status", 200))
+    max_bytes  = int(props.get("max_bytes", 100 * 1024 * 1024))
+    preview    = int(props.get("preview_bytes", 3000))
+    spill      = props.get("spill_to_file")
+    if isinstance(spill, str) and spill.strip() and not _is_true(spill) and spill.strip().lower() != "false":
+        spill_path = spill.strip()
+    else:
+        spill_path = f"/tmp/http_{int(time.time() * 1000)}.body" if _is_true(spill) else None
+
+    assert_json_field    = props.get("assert_json_field")
+    assert_json_value    = props.get("assert_json_value")
+    assert_body_contains = props.get("assert_body_contains")
+
+    rs = ResponseStream(max_bytes, preview_bytes=preview, spill_path=spill_path,
+                        json_field=assert_json_field, contains=assert_body_contains)
+    nlog.info(f"Streaming body (max_bytes={max_bytes:,}, preview={preview:,}"
+              f"{', spill → ' + spill_path if spill_path else ''})")
+
+    t0 = time.time()
+    if use_async:
+        resp = await connector.arequest(method, url, stream=True, **req_kwargs)
+        try:
+            async for chunk in resp.aiter_bytes(STREAM_CHUNK_SIZE):
+                rs.feed(chunk)
+        finally:
+            await resp.aclose()
+    else:
+        def _consume():
+            r = connector.request(method, url, stream=True, **req_kwargs)
+            try:
+                for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+                    rs.feed(chunk)
+            finally:
+                r.close()
+            return r
+        resp = await _t(_consume)
+    rt     = round(time.time() - t0, 3)
+    result = rs.finish()
+    mb     = result["total_bytes"] / 1_048_576
+    nlog.info(f"Response: HTTP {resp.status_code}  ({rt}s, {result['total_bytes']:,} bytes, "
+              f"{mb / rt if rt else 0:.1f} MB/s{', async' if use_async else ''})")
+
+    nlog.section("Response Body (preview)")
+    nlog.raw(result["preview"])
+    if result["truncated"]: nlog.raw(f"… ({result['total_bytes'] - preview:,} bytes more)")
+    if spill_path: nlog.ok(f"Full body written → {spill_path}")
+
+    nlog.section("Assertions")
+    if resp.status_code != exp_status:
+        nlog.error(f"FAIL: status {resp.status_code} != {exp_status}")
+        raise AssertionError(
+            f"HTTP status mismatch: expected {exp_status}, got {resp.status_code}\n"
+            f"Body: {result['preview'][:500]}"
+        )
+    nlog.ok(f"PASS: status == {exp_status}")
+
+    if assert_body_contains:
+        if result["contains_found"]: nlog.ok(f"PASS: body contains {assert_body_contains!r}")
+        else:
+            nlog.error(f"FAIL: body missing {assert_body_contains!r}")
+            raise AssertionError(f"HTTP body missing: {assert_body_contains!r}")
+
+    if assert_json_field:
+        if result["json_error"] and not result["json_found"]:
+            nlog.warn(f"JSON assertion skipped — body not parseable: {result['json_error']}")
+        elif assert_json_value is not None:
+            val = result["json_value"]
+            if str(val) == str(assert_json_value): nlog.ok(f"PASS: {assert_json_field} == {assert_json_value!r}")
+            else:
+                nlog.error(f"FAIL: {assert_json_field} expected {assert_json_value!r}, got {val!r}")
+                raise AssertionError(f"JSON field {assert_json_field}={val!r}, expected {assert_json_value!r}")
+
+    response = result["preview"][:1000]
+    if not result["truncated"]:
+        try:    response = json.loads(result["preview"])
+        except ValueError: pass
+
+    nlog.ok("All HTTP assertions passed ✓")
+    return {"status_code": resp.status_code, "url": url, "method": method,
+            "response_time": rt, "response": response, "streamed": True,
+            "body_bytes": result["total_bytes"], "body_truncated": result["truncated"],
+            "body_path": spill_path, "json_field_value": result["json_value"],
+            "headers": dict(list(resp.headers.items())[:20])}
+
+
+_ITEM_KEYS = ("items", "data", "results", "records", "value", "entries")
+
+def _page_items(data, items_path):
+    """The list of records on one page: items_path, a bare list, or the first common envelope key."""
+    from connectors.http_mcp import walk_json_path
+    if items_path:
+        data = walk_json_path(data, items_path)
+    elif isinstance(data, dict):
+        data = next((data[k] for k in _ITEM_KEYS if isinstance(data.get(k), list)), None)
+    return data if isinstance(data, list) else []
+
+
+async def _http_paginated(connector, method, url, req_kwargs, props, nlog, use_async):
+    """
+    paginate: {style, max_pages, concurrency, ...} — fetch every page and merge the
+    records into one JSONL file, written in page order as pages arrive.
+
+      page / offset : page N's request is known up front, so up to `concurrency`
+                      pages are in flight at once; the first short or empty page
+                      (or total_path, when the API reports a total) ends the run.
+                      A 400/404/416/422 on a page past the first also ends it —
+                      speculative requests beyond the last page often get one.
+                      Without page_size or size_param the page size is learned
+                      from the first page, fetched on its own.
+      link / cursor : page N+1 depends on page N, so fetches are pipelined — the
+                      next request is issued as soon as the next link / cursor is
+                      known, and page N is merged and written while it runs.
+    """
+    from connectors.http_mcp import next_link, walk_json_path
+    cfg = props.get("paginate")
+    if isinstance(cfg, str):
+        cfg = json.loads(cfg) if cfg.strip().startswith("{") else {"style": cfg}
+    style       = str(cfg.get("style", "page")).lower()
+    max_pages   = int(cfg.get("max_pages", 100))
+    concurrency = max(1, int(cfg.get("concurrency", 4)))
+    items_path  = cfg.get("items_path")
+    size_known  = style == "offset" or any(cfg.get(k) for k in ("page_size", "limit", "size_param"))
+    page_size   = int(cfg.get("page_size", cfg.get("limit", 100)))
+    exp_status  = int(props.get("expected_status", 200))
+    if style not in ("page", "offset", "link", "cursor"):
+        raise ValueError(f"paginate.style must be page, offset, link or cursor — got {style!r}")
+
+    base_params = dict(req_kwargs.get("params") or {})
+    out_path    = cfg.get("output_file") or f"/tmp/http_pages_{int(time.time() * 1000)}.jsonl"
+    sample: list = []
+    total_items  = 0
+    pages_done   = 0
+
+    async def fetch(page_url, params, idx=0):
+        kw = {**req_kwargs, "params": params}
+        if use_async:
+            resp = await connector.arequest(method, page_url, **kw)
+        else:
+            resp = await _t(connector.request, method, page_url, **kw)
+        if idx > 0 and resp.status_code != exp_status and resp.status_code in (400, 404, 416, 422):
+            return resp, None          # past the last page
+        connector.assert_status(resp, exp_status)
+        try:    data = resp.json()
+        except ValueError: raise ValueError(f"Page from {page_url} is not JSON")
+        return resp, data
+
+    def write_page(fh, items):
+        nonlocal total_items, pages_done
+        for it in items:
+            fh.write(json.dumps(it, default=str) + "\n")
+        if len(sample) < 50: sample.extend(items[:50 - len(sample)])
+        total_items += len(items)
+        pages_done  += 1
+
+    nlog.info(f"Paginating ({style}, max_pages={max_pages}"
+              f"{f', concurrency={concurrency}' if style in ('page', 'offset') else ', pipelined'}) → {out_path}")
+    t0 = time.time()
+    with open(out_path, "w", encoding="utf-8") as fh:
+        if style in ("page", "offset"):
+            if style == "page":
+                param = cfg.get("page_param", "page"); start = int(cfg.get("start", 1))
+                def params_for(i): return {**base_params, param: start + i, **({cfg["size_param"]: page_size} if cfg.get("size_param") else {})}
+            else:
+                param = cfg.get("offset_param", "offset"); start = int(cfg.get("start", 0))
+                def params_for(i): return {**base_params, param: start + i * page_size, cfg.get("limit_param", "limit"): page_size}
+
+            last    = max_pages            # exclusive upper bound on page index; shrinks on a short page
+            pending = {}                   # page index → items, held until earlier pages are written
+            nxt_write, nxt_issue = 0, 0
+            in_flight = {}
+            while nxt_write < last:
+                # The page size isn't known until page 0 arrives, so it goes out alone
+                width = concurrency if size_known else 1
+                while nxt_issue < last and len(in_flight) < width:
+                    in_flight[asyncio.ensure_future(fetch(url, params_for(nxt_issue), nxt_issue))] = nxt_issue
+                    nxt_issue += 1
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    idx = in_flight.pop(task)
+                    if idx >= last:
+                        task.exception()   # past the end — a speculative fetch we no longer need
+                        continue
+                    try:
+                        resp, data = task.result()
+                    except Exception:
+                        for t in in_flight: t.cancel()
+                        await asyncio.gather(*in_flight, return_exceptions=True)
+                        raise
+                    if data is None:
+                        nlog.info(f"  page {idx} returned HTTP {resp.status_code} — treating it as the end of the data")
+                        last = min(last, idx)
+                        continue
+                    items = _page_items(data, items_path)
+                    if not size_known:
+                        page_size, size_known = max(len(items), 1), True
+                        nlog.info(f"  page size learned from the first page: {page_size}")
+                    if cfg.get("total_path") and idx == 0:
+                        total = walk_json_path(data, cfg["total_path"])
+                        if total is not None:
+                            last = min(last, max(1, -(-int(total) // page_size)))
+                    if len(items) < page_size:
+                        last = min(last, idx + 1)
+                        if idx == 0 and items and style == "page" and not cfg.get("size_param"):
+                            nlog.warn(f"First page had {len(items)} items, fewer than page_size={page_size} — "
+                                      f"stopping; set page_size to the API's page size if more pages exist")
+                    pending[idx] = items
+                while nxt_write in pending and nxt_write < last:
+                    write_page(fh, pending.pop(nxt_write))
+                    nxt_write += 1
+            for t in in_flight: t.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        else:
+            next_path    = cfg.get("next_path")
+            cursor_path  = cfg.get("cursor_path", "next_cursor")
+            cursor_param = cfg.get("cursor_param", "cursor")
+            task = asyncio.ensure_future(fetch(url, base_params or None))
+            while task is not None:
+                resp, data = await task
+                if style == "link":
+                    target = walk_json_path(data, next_path) if next_path else next_link(resp.headers)
+                    target = str(target) if target else None
+                    params = None       # the next link already carries its query string
+                else:
+                    cursor = walk_json_path(data, cursor_path)
+                    target = url if cursor not in (None, "") else None
+                    params = {**base_params, cursor_param: cursor}
+                task = (asyncio.ensure_future(fetch(target, params))
+                        if target and pages_done + 1 < max_pages else None)
+                write_page(fh, _page_items(data, items_path))
+                if pages_done % 10 == 0:
+                    nlog.info(f"  {pages_done} pages, {total_items:,} items")
+    elapsed = round(time.time() - t0, 3)
+
+    if pages_done >= max_pages:
+        nlog.warn(f"Stopped at max_pages={max_pages} — more pages may exist")
+    nlog.ok(f"{pages_done} pages, {total_items:,} items in {elapsed}s "
+            f"({pages_done / elapsed if elapsed else 0:.1f} pages/s) → {out_path}")
+    return {"status_code": exp_status, "url": url, "method": method, "response_time": elapsed,
+            "paginated": True, "style": style, "pages": pages_done, "total_items": total_items,
+            "output_file": out_path, "items": sample, "truncated": pages_done >= max_pages}
+
+
 @node_handler("http")
 async def handle_http(node, creds, owner_id, ctx, nlog, **kw):
-    from connectors.http_mcp import HTTPConnector
+    from connectors.http_mcp import HTTPConnector, POOL_CONNECTIONS, POOL_MAXSIZE
     props      = node.get("props", {})
     method     = props.get("method", "GET")
     url        = props.get("url", "")
@@ -1596,17 +2467,69 @@ async def handle_http(node, creds, owner_id, ctx, nlog, **kw):
     except: body = props.get("body") or None
 
     nlog.section(f"HTTP {method} {url}")
-    connector = creds.build_connector(cred_name, owner_id) if cred_name else HTTPConnector(headers=headers)
-
-    def _do():
-        return connector.request(
-            method, url,
-            json=body if method in ("POST","PUT","PATCH") and isinstance(body, dict) else None,
-            params=body if method == "GET" and isinstance(body, dict) else None,
+    if cred_name:
+        connector = creds.build_connector(cred_name, owner_id)
+    else:
+        connector = HTTPConnector(
+            headers=headers,
+            pool_connections=int(props.get("pool_connections") or POOL_CONNECTIONS),
+            pool_maxsize=int(props.get("pool_maxsize") or POOL_MAXSIZE),
         )
 
-    t0 = time.time(); resp = await _t(_do); rt = round(time.time() - t0, 3)
-    nlog.info(f"Response: HTTP {resp.status_code}  ({rt}s)")
+    req_kwargs = dict(
+        headers=headers or None,
+        json=body if method in ("POST","PUT","PATCH") and isinstance(body, dict) else None,
+        params=body if method == "GET" and isinstance(body, dict) else None,
+    )
+    # transport: "async" awaits httpx directly on the event loop (no executor thread)
+    use_async = str(props.get("transport", os.getenv("FLOWFORGE_HTTP_TRANSPORT", "sync"))).lower() == "async"
+
+    # conditional: revalidate with If-None-Match / If-Modified-Since; a 304 replays the cached body
+    if _is_true(props.get("conditional", False)) and method.upper() == "GET":
+        req_kwargs["conditional"] = True
+
+    # deadline: hard cap in seconds on the whole call, retries and hedges included
+    deadline = float(props["deadline"]) if props.get("deadline") not in (None, "") else None
+
+    async def _within_deadline(coro):
+        if deadline is None:
+            return await coro
+        try:
+            return await asyncio.wait_for(coro, deadline)
+        except asyncio.TimeoutError:
+            nlog.error(f"Deadline of {deadline}s exceeded")
+            raise TimeoutError(f"HTTP {method} {url} exceeded its {deadline}s deadline")
+
+    if props.get("paginate") or _is_true(props.get("stream", False)):
+        req_kwargs.pop("conditional", None)
+    if props.get("paginate"):
+        return await _within_deadline(_http_paginated(connector, method, url, req_kwargs, props, nlog, use_async))
+    if _is_true(props.get("stream", False)):
+        return await _within_deadline(_http_streamed(connector, method, url, req_kwargs, props, nlog, use_async))
+
+    # hedge: true (delay = this URL's observed p95) or a fixed delay in seconds; GET/HEAD only
+    hedge = props.get("hedge")
+    if hedge in (None, "", False) or str(hedge).lower() == "false":
+        hedge = None
+    elif method.upper() not in ("GET", "HEAD"):
+        nlog.warn(f"hedge ignored — {method} is not idempotent")
+        hedge = None
+    hedge_winner = None
+
+    t0 = time.time()
+    if hedge is not None:
+        hedge_after = None if _is_true(hedge) else float(hedge)
+        resp, hedge_winner = await _within_deadline(connector.hedged_request(
+            method, url, use_async=use_async, hedge_after=hedge_after, deadline=deadline, **req_kwargs))
+    elif use_async:
+        resp = await _within_deadline(connector.arequest(method, url, deadline=deadline, **req_kwargs))
+    else:
+        resp = await _within_deadline(_t(connector.request, method, url, deadline=deadline, **req_kwargs))
+    rt = round(time.time() - t0, 3)
+    cache_status = getattr(resp, "cache_status", None)
+    nlog.info(f"Response: HTTP {resp.status_code}  ({rt}s{', async' if use_async else ''}"
+              f"{f', {hedge_winner} won' if hedge_winner else ''}"
+              f"{', 304 → cached body' if cache_status == 'hit' else ''})")
 
     try:    resp_json = resp.json(); body_text = json.dumps(resp_json, indent=2)
     except: resp_json = None;       body_text = resp.text or ""
@@ -1638,9 +2561,199 @@ async def handle_http(node, creds, owner_id, ctx, nlog, **kw):
     nlog.ok("All HTTP assertions passed ✓")
     return {"status_code": resp.status_code, "url": url, "method": method,
             "response_time": rt, "response": resp_json if resp_json is not None else body_text[:1000],
+            "hedge_winner": hedge_winner, "cache_status": cache_status,
             "headers": dict(list(resp.headers.items())[:20])}
 
 
+# ── Storage transfer helpers ──────────────────────────────────────────────────
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2, "G": 1024 ** 3, "GB": 1024 ** 3}
+
+def _parse_bytes(value) -> Optional[int]:
+    """'64MB' / '512k' / 8388608 → bytes; None/'' → None."""
+    if value in (None, ""):
+        return None
+    m = re.fullmatch(r"\s*([\d.]+)\s*([A-Za-z]*)\s*", str(value))
+    if not m or m.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"Invalid size {value!r} — use bytes or e.g. '64MB'")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+
+class _TransferProgress:
+    """
+    Thread-safe byte counter for storage transfers. Pass as the SDK's progress
+    callback; writes a throughput line to the NodeLogger at most every
+    `interval` seconds and produces the bytes / duration / MB/s summary.
+    """
+
+    def __init__(self, nlog, label: str, total: int = None, interval: float = 2.0):
+        self.nlog     = nlog
+        self.label    = label
+        self.total    = total
+        self.interval = interval
+        self.bytes    = 0
+        self.t0       = time.time()
+        self._last    = self.t0
+        self._lock    = threading.Lock()
+
+    def __call__(self, n: int):
+        with self._lock:
+            self.bytes += n
+            now = time.time()
+            if now - self._last < self.interval:
+                return
+            self._last = now
+            done = self.bytes
+        rate = done / 1_048_576 / max(now - self.t0, 1e-6)
+        pct  = f" ({100 * done / self.total:.0f}%)" if self.total else ""
+        self.nlog.info(f"  {self.label}: {done / 1_048_576:,.1f} MB{pct} at {rate:.1f} MB/s")
+
+    def set_absolute(self, done: int):
+        """For SDKs that report cumulative bytes (Azure, paramiko) instead of increments."""
+        with self._lock:
+            delta = done - self.bytes
+        if delta > 0:
+            self(delta)
+
+    def summary(self) -> dict:
+        elapsed = max(time.time() - self.t0, 1e-6)
+        return {"bytes": self.bytes, "duration_s": round(elapsed, 3),
+                "mb_per_s": round(self.bytes / 1_048_576 / elapsed, 2)}
+
+
+_SINCE_UNITS = {"m": 60, "h": 3600, "d": 86400}
+
+def _parse_since(value) -> Optional[datetime]:
+    """'2025-01-31' / ISO-8601 timestamp / relative '30m' | '24h' | '7d' → tz-aware UTC datetime."""
+    from datetime import timezone, timedelta
+    if value in (None, ""):
+        return None
+    text = str(value).strip()
+    m = re.fullmatch(r"(\d+)\s*([mhd])", text)
+    if m:
+        return datetime.now(timezone.utc) - timedelta(seconds=int(m.group(1)) * _SINCE_UNITS[m.group(2)])
+    dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _listing_filters(props) -> dict:
+    """Common listing filter props shared by the storage nodes."""
+    return {
+        "suffix":         props.get("suffix") or None,
+        "pattern":        props.get("pattern") or None,
+        "modified_since": _parse_since(props.get("modified_since")),
+    }
+
+
+def _scan_listing(iterator, max_results: int, aggregate: bool):
+    """
+    Consume a lazy storage listing: keep the first max_results entries and stop —
+    or, with aggregate, keep walking to count objects / bytes in the same pass
+    without holding them. Returns (items, prefixes, aggregate_or_None, truncated).
+    """
+    items, prefixes = [], []
+    agg = {"count": 0, "bytes": 0, "oldest": None, "newest": None} if aggregate else None
+    truncated = False
+    for obj in iterator:
+        if obj.get("type") == "prefix":
+            if len(prefixes) < max_results: prefixes.append(obj["prefix"])
+            continue
+        if len(items) < max_results:
+            items.append(obj)
+        elif not aggregate:
+            truncated = True
+            break
+        else:
+            truncated = True
+        if agg is not None:
+            agg["count"] += 1
+            agg["bytes"] += obj.get("size") or 0
+            lm = obj.get("last_modified")
+            if lm and (agg["oldest"] is None or lm < agg["oldest"]): agg["oldest"] = lm
+            if lm and (agg["newest"] is None or lm > agg["newest"]): agg["newest"] = lm
+    return items, prefixes, agg, truncated
+
+
+# "since: watermark" — incremental listings. The high-water mark is the
+# (last_modified, key) of the newest object handed out, stored as a workflow
+# variable; a listing returns only objects strictly after it, oldest first.
+# By default the mark advances when the whole run succeeds, so a failed
+# downstream step sees the same files again on the next run.
+
+def _watermark_name(node, props) -> str:
+    return props.get("watermark_key") or f"__watermark:{node.get('title') or node.get('id', '')}"
+
+
+def _load_watermark(kw, owner_id: str, name: str) -> Optional[dict]:
+    db = kw.get("db")
+    if not db:
+        return None
+    from database import WorkflowVariable
+    row = db.query(WorkflowVariable).filter_by(owner_id=owner_id, workflow_id=kw.get("workflow_id"), key=name).first()
+    return row.value if row and isinstance(row.value, dict) else None
+
+
+def _after_watermark(iterator, mark: Optional[dict], name_field: str) -> list:
+    """Objects after mark in (last_modified, name) order, sorted oldest first."""
+    since = _parse_since(mark["last_modified"]) if mark else None
+    after = mark.get("key", "") if mark else ""
+    found = []
+    for obj in iterator:
+        if obj.get("type") == "prefix" or obj.get("is_dir"):
+            continue
+        stamp = _parse_since(obj["last_modified"])
+        if since is None or (stamp, obj[name_field]) > (since, after):
+            found.append((stamp, obj[name_field], obj))
+    found.sort(key=lambda t: t[:2])
+    return [obj for _, _, obj in found]
+
+
+def _advance_watermark(props, ctx, kw, owner_id: str, name: str, mark: Optional[dict],
+                       items: list, name_field: str, nlog) -> Optional[dict]:
+    """Record the mark after the last returned item — now, or when the run succeeds (watermark_commit)."""
+    if not items:
+        return mark
+    last = items[-1]
+    new  = {"last_modified": _parse_since(last["last_modified"]).isoformat(), "key": last[name_field]}
+    if props.get("watermark_commit", "success") == "node":
+        if kw.get("db"):
+            _set_variable(kw["db"], owner_id, kw.get("workflow_id"), name, new)
+    else:
+        ctx.setdefault("__watermarks", {})[name] = new
+    nlog.info(f"Watermark {name}: {new['last_modified']} / {new['key']}"
+              f"{'' if props.get('watermark_commit', 'success') == 'node' else ' (saved when the run succeeds)'}")
+    return new
+
+
+def _watermark_listing(node, props, ctx, kw, owner_id, nlog, list_fn, name_field: str, max_results: int):
+    """
+    Shared body of a "since: watermark" list: list_fn(mark) yields candidate
+    objects (narrowed server-side where the backend allows), the oldest
+    max_results after the mark are returned and the mark advanced past them.
+    Returns (items, output fields).
+    """
+    name  = _watermark_name(node, props)
+    mark  = _load_watermark(kw, owner_id, name)
+    nlog.info(f"Since watermark {name}: " + (f"{mark['last_modified']} / {mark['key']}" if mark else "none (first run)"))
+    fresh = _after_watermark(list_fn(mark), mark, name_field)
+    items = fresh[:max_results]
+    new   = _advance_watermark(props, ctx, kw, owner_id, name, mark, items, name_field, nlog)
+    nlog.ok(f"Found {len(items)} new object(s){f' ({len(fresh) - len(items)} more next run)' if len(fresh) > len(items) else ''}")
+    for i in items[:20]: nlog.info(f"  {i[name_field]}  ({i['size']:,} bytes, {i['last_modified']})")
+    return items, {"count": len(items), "truncated": len(fresh) > len(items), "since": "watermark",
+                   "watermark": new, "previous_watermark": mark}
+
+
+def _s3_transfer_config(connector, props):
+    knobs = {
+        "multipart_threshold": _parse_bytes(props.get("multipart_threshold")),
+        "part_size":           _parse_bytes(props.get("part_size")),
+        "max_concurrency":     int(props["max_concurrency"]) if props.get("max_concurrency") else None,
+        "max_bandwidth":       _parse_bytes(props.get("max_bandwidth")),
+    }
+    return connector.transfer_config(**knobs), {k: v for k, v in knobs.items() if v}
+
+
 # ── S3 ────────────────────────────────────────────────────────────────────────
 
 @node_handler("s3")
@@ -1653,19 +2766,57 @@ async def handle_s3(node, creds, owner_id, ctx, nlog, **kw):
     if not cred: raise ValueError("S3 node missing credential")
     nlog.section(f"S3 {op.upper()} — s3://{bucket}/{key}")
     c = creds.build_connector(cred, owner_id)
+    if op in ("upload", "download"):
+        config, knobs = _s3_transfer_config(c, props)
+        if knobs: nlog.info("TransferConfig: " + ", ".join(f"{k}={v:,}" for k, v in knobs.items()))
     if op == "upload":
-        uri = await _t(c.upload_file, props.get("local_path",""), bucket, key)
-        nlog.ok(f"Uploaded: {uri}")
-        return {"operation":"upload","uri":uri,"bucket":bucket,"key":key}
+        local_path = props.get("local_path","")
+        progress = _TransferProgress(nlog, "upload", total=os.path.getsize(local_path))
+        uri = await _t(c.upload_file, local_path, bucket, key, config=config, callback=progress)
+        stats = progress.summary()
+        nlog.ok(f"Uploaded: {uri}  ({stats['bytes']:,} bytes in {stats['duration_s']}s, {stats['mb_per_s']} MB/s)")
+        return {"operation":"upload","uri":uri,"bucket":bucket,"key":key,
+                "multipart": stats["bytes"] >= config.multipart_threshold, **stats}
     elif op == "download":
-        path = await _t(c.download_file, bucket, key, props.get("local_path","/tmp/"))
-        nlog.ok(f"Downloaded → {path}")
-        return {"operation":"download","local_path":path}
+        size = (await _t(c.get_object_metadata, bucket, key))["size"]
+        progress = _TransferProgress(nlog, "download", total=size)
+        path = await _t(c.download_file, bucket, key, props.get("local_path","/tmp/"), config=config, callback=progress)
+        stats = progress.summary()
+        nlog.ok(f"Downloaded → {path}  ({stats['bytes']:,} bytes in {stats['duration_s']}s, {stats['mb_per_s']} MB/s)")
+        return {"operation":"download","local_path":path,
+                "multipart": size >= config.multipart_threshold, **stats}
+    elif op == "list" and props.get("since") == "watermark":
+        # Keys that sort in arrival order (date-stamped names) let ListObjectsV2
+        # start after the last seen key, so a poll pages only through new keys.
+        chronological = props.get("key_order") == "chronological"
+        def _candidates(mark):
+            start = max(props.get("start_after") or "", mark["key"] if mark and chronological else "") or None
+            return c.iter_objects(bucket, prefix=key, start_after=start, page_size=1000,
+                                  **{**_listing_filters(props),
+                                     "modified_since": _parse_since(mark["last_modified"]) if mark else None})
+        items, res = await _t(_watermark_listing, node, props, ctx, kw, owner_id, nlog, _candidates, "key",
+                              int(props.get("max_results") or 1000))
+        return {"operation": "list", "items": items, **res}
     elif op == "list":
-        items = await _t(c.list_objects, bucket, prefix=key)
-        nlog.ok(f"Found {len(items)} objects")
-        for i in items[:20]: nlog.info(f"  {i.get('Key','?')}  ({i.get('Size',0)} bytes)")
-        return {"operation":"list","count":len(items),"items":items[:50]}
+        max_results = int(props.get("max_results") or 1000)
+        aggregate   = _is_true(props.get("aggregate", False))
+        iterator    = c.iter_objects(
+            bucket, prefix=key, start_after=props.get("start_after") or None,
+            delimiter=props.get("delimiter") or None,
+            page_size=1000 if aggregate or any(_listing_filters(props).values()) else min(max_results + 1, 1000),
+            **_listing_filters(props),
+        )
+        items, prefixes, agg, truncated = await _t(_scan_listing, iterator, max_results, aggregate)
+        nlog.ok(f"Found {len(items)} objects{' (stopped at max_results)' if truncated else ''}"
+                f"{f', {len(prefixes)} prefixes' if prefixes else ''}")
+        for p in prefixes[:20]: nlog.info(f"  {p}")
+        for i in items[:20]: nlog.info(f"  {i['key']}  ({i['size']:,} bytes)")
+        if agg: nlog.info(f"Aggregate: {agg['count']:,} objects, {agg['bytes']:,} bytes")
+        out_limit = max_results if props.get("max_results") else 50
+        return {"operation":"list","count":len(items),"items":items[:out_limit],
+                "prefixes":prefixes,"truncated":truncated,
+                "next_start_after":items[-1]["key"] if truncated and items else None,
+                **({"aggregate": agg} if agg else {})}
     elif op == "exists":
         exists = await _t(c.object_exists, bucket, key)
         if exists: nlog.ok(f"PASS: s3://{bucket}/{key} exists")
@@ -1676,6 +2827,70 @@ async def handle_s3(node, creds, owner_id, ctx, nlog, **kw):
     elif op == "delete":
         await _t(c.delete_object, bucket, key)
         nlog.ok(f"Deleted"); return {"operation":"delete"}
+    elif op in ("delete_prefix", "copy_prefix"):
+        if not key and not _is_true(props.get("allow_empty_prefix", False)):
+            raise ValueError(f"S3 {op} with an empty prefix affects the whole bucket — set allow_empty_prefix: true")
+        workers = int(props.get("max_concurrency") or (8 if op == "delete_prefix" else 16))
+        t0 = time.time()
+        if op == "delete_prefix":
+            dry = _is_true(props.get("dry_run", False))
+            res = await _t(c.delete_prefix, bucket, key, max_workers=workers, dry_run=dry, **_listing_filters(props))
+            if dry: nlog.ok(f"Dry run: {res['would_delete']:,} objects would be deleted")
+            else:   nlog.ok(f"Deleted {res['deleted']:,} objects in {res['batches']} batches ({time.time() - t0:.1f}s)")
+        else:
+            dest_bucket = props.get("dest_bucket") or bucket
+            dest_prefix = props.get("dest_prefix", "")
+            if dest_bucket == bucket and dest_prefix.startswith(key):
+                raise ValueError("copy_prefix destination lies inside the source prefix")
+            config, _ = _s3_transfer_config(c, props)
+            res = await _t(c.copy_prefix, bucket, key, dest_bucket, dest_prefix,
+                           max_workers=workers, config=config, **_listing_filters(props))
+            nlog.ok(f"Copied {res['copied']:,} objects ({res['bytes']:,} bytes) → s3://{dest_bucket}/{dest_prefix} "
+                    f"({time.time() - t0:.1f}s)")
+        for e in res["errors"][:10]: nlog.error(f"  {e['key']}: {e.get('message') or e.get('error')}")
+        if res["failed"] and not _is_true(props.get("allow_failures", False)):
+            raise RuntimeError(f"S3 {op}: {res['failed']} object(s) failed")
+        return {"operation": op, "prefix": key, "duration_s": round(time.time() - t0, 3), **res}
+    elif op == "sync":
+        local_dir = props.get("local_path", "")
+        direction = props.get("direction", "up")
+        dry       = _is_true(props.get("dry_run", False))
+        if not local_dir: raise ValueError("S3 sync needs local_path (a directory)")
+        config, knobs = _s3_transfer_config(c, props)
+        progress = _TransferProgress(nlog, "sync")
+        arrow    = f"{local_dir} → s3://{bucket}/{key}" if direction == "up" else f"s3://{bucket}/{key} → {local_dir}"
+        nlog.info(f"Sync {arrow} (compare={props.get('compare', 'auto')}, delete={_is_true(props.get('delete', False))}"
+                  f"{', DRY RUN' if dry else ''})")
+        res = await _t(c.sync_directory, local_dir, bucket, key, direction=direction,
+                       compare=props.get("compare", "auto"), delete=_is_true(props.get("delete", False)),
+                       dry_run=dry, max_workers=int(props.get("max_concurrency") or 16),
+                       config=config, callback=progress)
+        stats = progress.summary()
+        verb  = "would " if dry else ""
+        nlog.ok(f"{res['local_files']:,} local files — {verb}upload {res['uploaded']:,}, {verb}download {res['downloaded']:,}, "
+                f"{verb}delete {res['deleted']:,}, unchanged {res['unchanged']:,} "
+                f"({stats['bytes']:,} bytes in {stats['duration_s']}s, {stats['mb_per_s']} MB/s)")
+        for p in res["plan"][:20]: nlog.info(f"  {p['action']:<8} {p['key']}  ({p['reason']})")
+        for e in res["errors"][:10]: nlog.error(f"  {e['key']}: {e['error']}")
+        if res["failed"] and not _is_true(props.get("allow_failures", False)):
+            raise RuntimeError(f"S3 sync: {res['failed']} transfer(s) failed")
+        return {"operation": "sync", "direction": direction, "dry_run": dry, **res,
+                "bytes": stats["bytes"] if not dry else res["bytes"],
+                "duration_s": stats["duration_s"], "mb_per_s": stats["mb_per_s"]}
+    elif op == "exists_many":
+        keys = props.get("keys") or []
+        if isinstance(keys, str):
+            keys = json.loads(keys) if keys.strip().startswith("[") else re.split(r"[,\n]", keys)
+        keys = [k.strip() for k in keys if k and str(k).strip()]
+        if not keys: raise ValueError("S3 exists_many needs keys (list, JSON array or comma/newline separated)")
+        res = await _t(c.exists_many, bucket, keys, max_workers=int(props.get("max_concurrency") or 16),
+                       strategy=props.get("strategy", "auto"))
+        nlog.info(f"Checked {res['checked']} keys via {res['strategy']}: {res['present']} present, {res['missing']} missing")
+        for k in res["missing_keys"][:20]: nlog.error(f"  missing: s3://{bucket}/{k}")
+        if res["missing"] and props.get("assert_exists", True) not in (False, "false"):
+            raise AssertionError(f"{res['missing']} S3 object(s) missing, e.g. s3://{bucket}/{res['missing_keys'][0]}")
+        if not res["missing"]: nlog.ok(f"PASS: all {res['checked']} objects exist")
+        return {"operation": "exists_many", **res}
     else: raise ValueError(f"Unknown S3 op: {op!r}")
 
 
@@ -1691,17 +2906,56 @@ async def handle_azure(node, creds, owner_id, ctx, nlog, **kw):
     if not cred: raise ValueError("Azure node missing credential")
     nlog.section(f"Azure Blob {op.upper()} — {cont}/{blob}")
     c = creds.build_connector(cred, owner_id)
+    concurrency = int(props.get("max_concurrency") or 4)
     if op == "upload":
-        uri = await _t(c.upload_file, cont, blob, props.get("local_path",""))
-        nlog.ok(f"Uploaded: {uri}"); return {"operation":"upload","uri":uri}
+        local_path = props.get("local_path","")
+        size       = os.path.getsize(local_path)
+        block_size = _parse_bytes(props.get("block_size"))
+        put_limit  = _parse_bytes(props.get("max_single_put_size"))
+        nlog.info(f"Upload: {size:,} bytes, block_size={f'{block_size:,}' if block_size else 'default'}, max_concurrency={concurrency}")
+        progress = _TransferProgress(nlog, "upload", total=size)
+        uri = await _t(c.upload_file, cont, blob, local_path, block_size=block_size,
+                       max_single_put_size=put_limit, max_concurrency=concurrency,
+                       progress_hook=lambda done, total: progress.set_absolute(done))
+        stats = progress.summary()
+        nlog.ok(f"Uploaded: {uri}  ({stats['bytes']:,} bytes in {stats['duration_s']}s, {stats['mb_per_s']} MB/s)")
+        return {"operation":"upload","uri":uri,"container":cont,"blob_name":blob,
+                "block_upload": size > (put_limit or 64 * 1024 * 1024), **stats}
     elif op == "download":
-        path = await _t(c.download_file, cont, blob, props.get("local_path","/tmp/"))
-        nlog.ok(f"Downloaded → {path}"); return {"operation":"download","local_path":path}
+        chunk_size = _parse_bytes(props.get("chunk_size"))
+        progress = _TransferProgress(nlog, "download")
+        def _hook(done, total):
+            progress.total = total
+            progress.set_absolute(done)
+        path = await _t(c.download_file, cont, blob, props.get("local_path","/tmp/"),
+                        chunk_size=chunk_size, max_concurrency=concurrency, progress_hook=_hook)
+        stats = progress.summary()
+        nlog.ok(f"Downloaded → {path}  ({stats['bytes']:,} bytes in {stats['duration_s']}s, {stats['mb_per_s']} MB/s)")
+        return {"operation":"download","local_path":path, **stats}
     elif op == "list":
-        blobs = await _t(c.list_blobs, cont)
-        nlog.ok(f"Found {len(blobs)} blobs")
-        for b in blobs[:20]: nlog.info(f"  {b.get('name',b) if isinstance(b,dict) else b}")
-        return {"operation":"list","count":len(blobs),"blobs":blobs[:50]}
+        prefix      = props.get("prefix", "")
+        max_results = int(props.get("max_results") or 1000)
+        filters     = _listing_filters(props)
+        page_size   = props.get("results_per_page") or props.get("page_size")
+        count_only  = _is_true(props.get("count_only", False))
+        page_size   = int(page_size) if page_size else (
+            5000 if count_only or any(filters.values()) else min(max_results + 1, 5000))
+        if props.get("since") == "watermark":
+            def _candidates(mark):
+                return c.iter_blobs(cont, prefix, page_size=5000,
+                                    **{**filters, "modified_since": _parse_since(mark["last_modified"]) if mark else None})
+            blobs, res = await _t(_watermark_listing, node, props, ctx, kw, owner_id, nlog, _candidates, "name", max_results)
+            return {"operation": "list", "blobs": blobs, **res}
+        if count_only:
+            agg = await _t(c.count_blobs, cont, prefix, page_size=page_size, **filters)
+            nlog.ok(f"Counted {agg['count']:,} blobs, {agg['bytes']:,} bytes under {cont}/{prefix}")
+            return {"operation":"list","count":agg["count"],"aggregate":agg}
+        iterator = c.iter_blobs(cont, prefix, page_size=page_size, **filters)
+        blobs, _, _, truncated = await _t(_scan_listing, iterator, max_results, False)
+        nlog.ok(f"Found {len(blobs)} blobs{' (stopped at max_results)' if truncated else ''}")
+        for b in blobs[:20]: nlog.info(f"  {b['name']}  ({b['size']:,} bytes)")
+        out_limit = max_results if props.get("max_results") else 50
+        return {"operation":"list","count":len(blobs),"blobs":blobs[:out_limit],"truncated":truncated}
     elif op == "exists":
         exists = await _t(c.blob_exists, cont, blob)
         if exists: nlog.ok(f"PASS: {cont}/{blob} exists")
@@ -1720,16 +2974,48 @@ async def handle_sftp(node, creds, owner_id, ctx, nlog, **kw):
     cred   = props.get("credential", "")
     op     = props.get("operation", "list")
     remote = props.get("remote_path", "/")
-    local  = props.get("local_path", "/tmp/")
+    local  = props.get("local_path", "")
     if not cred: raise ValueError("SFTP node missing credential")
+    if op in ("upload", "download") and not local:
+        raise ValueError(f"SFTP {op} requires local_path")
     nlog.section(f"SFTP {op.upper()} — {remote}")
     c = creds.build_connector(cred, owner_id)
 
+    if op in ("upload", "download"):
+        direction = "up" if op == "upload" else "down"
+        progress  = _TransferProgress(nlog, op)
+        result = await _t(
+            c.transfer, direction, local, remote,
+            pattern=props.get("pattern") or None,
+            recursive=_is_true(props.get("recursive", True)),
+            max_workers=int(props.get("max_concurrency") or 4),
+            max_prefetch=int(props["max_prefetch"]) if props.get("max_prefetch") else None,
+            request_size=_parse_bytes(props.get("request_size")),
+            callback=progress,
+        )
+        for f in result["files"][:20]:
+            nlog.info(f"  {f['path']} → {f['dest']}  ({f['bytes']:,} bytes, {f['mb_per_s']} MB/s)")
+        for e in result["errors"][:20]:
+            nlog.error(f"  {e['path']}: {e['error']}")
+        nlog.ok(f"SFTP {op}: {result['transferred']} file(s), {result['bytes']:,} bytes in "
+                f"{result['duration_s']}s ({result['mb_per_s']} MB/s aggregate)")
+        if result["failed"] and not _is_true(props.get("allow_failures", False)):
+            raise RuntimeError(f"SFTP {op}: {result['failed']} file(s) failed, first: {result['errors'][0]['error']}")
+        if result["transferred"] == 0 and not result["failed"]:
+            nlog.warn(f"SFTP {op}: nothing matched {local if op == 'upload' else remote}")
+        single = result["files"][0] if result["transferred"] == 1 and len(result["files"]) == 1 else None
+        return {"operation": op, "remote_path": remote,
+                "local_path": single["dest"] if single and op == "download" else local,
+                "count": result["transferred"], **result}
+
+    if op == "list" and props.get("since") == "watermark":
+        items, res = await _t(_watermark_listing, node, props, ctx, kw, owner_id, nlog,
+                              lambda mark: c.list_directory(remote), "name", int(props.get("max_results") or 1000))
+        return {"operation": "list", "remote_path": remote, "items": items, **res}
+
     def _sftp_op():
         with c:
-            if op == "upload":   c.upload(local, remote);   return {"operation":"upload","remote_path":remote}
-            elif op == "download": c.download(remote, local); return {"operation":"download","local_path":local}
-            elif op == "list":
+            if op == "list":
                 items = c.list_directory(remote)
                 return {"operation":"list","count":len(items),"items":items[:50]}
             elif op == "exists":
@@ -1746,3 +3032,163 @@ async def handle_sftp(node, creds, owner_id, ctx, nlog, **kw):
             raise AssertionError(f"SFTP file missing: {remote}")
     nlog.ok(f"SFTP {op} done: {result}")
     return result
+
+
+# ── Transfer (cross-store streaming) ──────────────────────────────────────────
+
+def _storage_connector(creds, owner_id, loc, credential, role: str):
+    if loc.kind == "local":
+        return None
+    if not credential:
+        raise ValueError(f"{loc.uri} needs a {role}_credential (or credential) prop")
+    return creds.build_connector(credential, owner_id)
+
+
+@node_handler("transfer")
+async def handle_transfer(node, creds, owner_id, ctx, nlog, **kw):
+    from storage_stream import DEFAULT_BUFFER, parse_location, list_sources, copy_many, normalize_algorithms
+    props = node.get("props", {})
+    src   = parse_location(props.get("source", ""))
+    dst   = parse_location(props.get("destination", ""))
+    algos = normalize_algorithms(props.get("checksum") or "md5") if props.get("checksum") != "none" else []
+    nlog.section(f"TRANSFER {src.uri} → {dst.uri}")
+    src_conn = _storage_connector(creds, owner_id, src, props.get("source_credential") or props.get("credential"), "source")
+    dst_conn = _storage_connector(creds, owner_id, dst, props.get("dest_credential") or props.get("credential"), "dest")
+
+    tuning = {
+        "chunk_size":      _parse_bytes(props.get("chunk_size")),
+        "block_size":      _parse_bytes(props.get("block_size")),
+        "max_prefetch":    int(props["max_prefetch"]) if props.get("max_prefetch") else None,
+        "request_size":    _parse_bytes(props.get("request_size")),
+        "max_concurrency": int(props["part_concurrency"]) if props.get("part_concurrency") else None,
+    }
+    if dst.kind == "s3":
+        tuning["s3_config"], _ = _s3_transfer_config(dst_conn, {**props, "max_concurrency": props.get("part_concurrency")})
+
+    sources = await _t(list_sources, src, src_conn, props.get("pattern") or None,
+                       _is_true(props.get("recursive", True)))
+    if not sources:
+        nlog.warn(f"Nothing matched {src.uri}")
+    if src.is_multi:
+        pairs = [(loc, dst.join(rel)) for loc, rel, _ in sources]
+    else:
+        pairs = [(loc, dst.join(rel) if dst.is_multi else dst) for loc, rel, _ in sources]
+    known = sum(size or 0 for _, _, size in sources)
+    nlog.info(f"{len(pairs)} file(s){f', {known:,} bytes' if known else ''}; "
+              f"max_concurrency={int(props.get('max_concurrency') or 4)}, checksum={','.join(algos) or 'none'}")
+
+    progress = _TransferProgress(nlog, "transfer", total=known or None)
+    result = await _t(
+        copy_many, pairs, src_conn, dst_conn,
+        max_workers=int(props.get("max_concurrency") or 4),
+        algorithms=algos,
+        buffer_size=_parse_bytes(props.get("buffer_size")) or DEFAULT_BUFFER,
+        progress=progress,
+        tuning=tuning,
+        verify=_is_true(props.get("verify", True)),
+    )
+    for f in result["files"][:20]:
+        sums = " ".join(f"{a}={v}" for a, v in f["checksums"].items())
+        nlog.info(f"  {f['source']} → {f['dest']}  ({f['bytes']:,} bytes, {f['mb_per_s']} MB/s)"
+                  f"{'  ' + sums if sums else ''}{'  verified' if f['verified'] else ''}")
+    for e in result["errors"][:20]:
+        nlog.error(f"  {e['source']}: {e['error']}")
+    nlog.ok(f"Transferred {result['transferred']} file(s), {result['bytes']:,} bytes in "
+            f"{result['duration_s']}s ({result['mb_per_s']} MB/s aggregate)")
+    if result["failed"] and not _is_true(props.get("allow_failures", False)):
+        raise RuntimeError(f"Transfer: {result['failed']} file(s) failed, first: {result['errors'][0]['error']}")
+    out = {"source": src.uri, "destination": dst.uri, "count": result["transferred"], **result}
+    if len(result["files"]) == 1 and result["transferred"] == 1:
+        out["checksums"] = result["files"][0]["checksums"]
+    return out
+
+
+# ── Verify (streamed / server-side checksums) ─────────────────────────────────
+
+def _expected_checksums(value, algos) -> Optional[dict]:
+    """'abc123' (first algorithm) / {"md5": "...", "size": 10} / JSON of the latter → dict."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        value = json.loads(value) if value.startswith("{") else {algos[0]: value}
+    return {str(k).lower().replace("-", ""): v for k, v in value.items()}
+
+
+@node_handler("verify")
+async def handle_verify(node, creds, owner_id, ctx, nlog, **kw):
+    from storage_stream import parse_location, list_sources, verify_many, normalize_algorithms
+    props = node.get("props", {})
+    algos = normalize_algorithms(props.get("checksum") or "md5")
+    paths = props.get("paths") or []
+    if isinstance(paths, str):
+        paths = json.loads(paths) if paths.strip().startswith("[") else re.split(r"[,\n]", paths)
+    paths = [p.strip() for p in paths if p and str(p).strip()]
+    if not paths and not props.get("path"):
+        raise ValueError("Verify node needs path (location, prefix or glob) or paths (list)")
+
+    locs = [parse_location(p) for p in paths] if paths else [parse_location(props["path"])]
+    ref  = parse_location(props["compare_to"]) if props.get("compare_to") else None
+    kinds = {l.kind for l in locs}
+    if len(kinds) > 1:
+        raise ValueError(f"Verify node: paths must share one backend, got {', '.join(sorted(kinds))}")
+    conn     = _storage_connector(creds, owner_id, locs[0], props.get("credential"), "path")
+    ref_conn = _storage_connector(creds, owner_id, ref, props.get("compare_credential") or props.get("credential"),
+                                  "compare") if ref else None
+    nlog.section(f"VERIFY {locs[0].uri if len(locs) == 1 else f'{len(locs)} paths'}"
+                 f"{f' against {ref.uri}' if ref else ''}")
+
+    targets = []
+    for loc in locs:
+        if loc.is_multi:
+            targets += [(l, rel) for l, rel, _ in await _t(list_sources, loc, conn, props.get("pattern") or None,
+                                                              _is_true(props.get("recursive", True)))]
+        else:
+            targets.append((loc, loc.path.rsplit("/", 1)[-1]))
+    batch    = len(targets) != 1 or locs[0].is_multi or bool(paths)
+    manifest = props.get("manifest") or {}
+    if isinstance(manifest, str):
+        manifest = json.loads(manifest) if manifest.strip() else {}
+    single_expected = _expected_checksums(props.get("expected"), algos)
+
+    items = []
+    for loc, rel in targets:
+        expected = _expected_checksums(manifest.get(loc.uri, manifest.get(rel)), algos) if batch else single_expected
+        reference = (ref.join(rel) if ref.is_multi or batch else ref) if ref else None
+        items.append((loc, expected, reference))
+    if not items:
+        nlog.warn("Nothing to verify")
+    nlog.info(f"{len(items)} object(s); checksum={','.join(algos)}, "
+              f"prefer_server={_is_true(props.get('prefer_server', True))}, "
+              f"max_concurrency={int(props.get('max_concurrency') or 8)}")
+
+    progress = _TransferProgress(nlog, "read", total=None)
+    result = await _t(
+        verify_many, items, conn, ref_conn,
+        max_workers=int(props.get("max_concurrency") or 8),
+        algorithms=algos,
+        prefer_server=_is_true(props.get("prefer_server", True)),
+        progress=progress,
+    )
+    for f in result["files"][:20]:
+        sums  = " ".join(f"{a}={v}" for a, v in f["checksums"].items())
+        state = {True: "OK", False: "MISMATCH", None: ""}[f["match"]]
+        nlog.info(f"  {f['path']}  {sums}  [{f['source']}]  {state}".rstrip())
+    for m in result["mismatches"][:20]:
+        nlog.error(f"  {m['path']}: {', '.join(m['mismatch'])} differ{f' from ' + m['reference'] if m.get('reference') else ''}")
+    for e in result["errors"][:20]:
+        nlog.error(f"  {e['path']}: {e['error']}")
+    nlog.info(f"Checked {result['checked']} object(s), {result['server_side']} from server metadata, "
+              f"{result['bytes_read']:,} bytes read in {result['duration_s']}s ({result['mb_per_s']} MB/s)")
+    if result["failed"] and not _is_true(props.get("allow_failures", False)):
+        raise RuntimeError(f"Verify: {result['failed']} object(s) could not be checked, first: {result['errors'][0]['error']}")
+    if result["mismatched"] and _is_true(props.get("assert_match", True)):
+        raise AssertionError(f"Verify: {result['mismatched']} object(s) failed integrity check, "
+                             f"e.g. {result['mismatches'][0]['path']} ({', '.join(result['mismatches'][0]['mismatch'])})")
+    if result["matched"]:
+        nlog.ok(f"PASS: {result['matched']} object(s) verified")
+    out = {"count": result["checked"], **result}
+    if not batch and result["files"]:
+        f = result["files"][0]
+        out.update(path=f["path"], size=f["size"], checksums=f["checksums"], match=f["match"], source=f["source"])
+    return out